@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This program measures the node drawing time of the renderers with and without font cache.
+
+A net with the given count of transitions and places is drawn node by
+node onto a small canvas, so the time is spent in drawing and font
+handling and not in allocating a huge image. Without cache every node
+loads the font file again and measures its label, as the renderers did
+before the font cache. Labels repeat like in real nets: there are
+<count> / 10 different transition and place names.
+
+Usage: python benchmarks/fonts.py [<count>]
+"""
+
+import sys # argv
+import time # timing
+from PIL import Image, ImageDraw # Python image library (Pillow)
+from pntools import petrinet, fonts, petrinet_renderer
+
+def create_nodes(count):
+    """ Create count transitions and places spread over a 250 x 250 area. """
+    nodes = []
+    for i in range(0, count):
+        if i % 2:
+            node = petrinet.Place()
+            node.label = "p%d" % (i % (count // 10 + 1))
+            node.marking = i % 5
+        else:
+            node = petrinet.Transition()
+            node.label = "t%d" % (i % (count // 10 + 1))
+        node.position = (i * 37 % 250, i * 53 % 250)
+        nodes.append(node)
+    return nodes
+
+def draw_nodes(nodes):
+    """ Draw all nodes and return the time in seconds. """
+    image = Image.new('RGB', (1000, 1000), color=(255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    start = time.perf_counter()
+    for node in nodes:
+        if type(node) is petrinet.Place:
+            petrinet_renderer.draw_place(node, draw, (0, 0))
+        else:
+            petrinet_renderer.draw_transition(node, draw, (0, 0))
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    nodes = create_nodes(count)
+
+    load_font, text_size = fonts.load_font, fonts.text_size
+    fonts.load_font, fonts.text_size = load_font.__wrapped__, text_size.__wrapped__
+    uncached = draw_nodes(nodes)
+    fonts.load_font, fonts.text_size = load_font, text_size
+    cached = draw_nodes(nodes)
+
+    print("%d nodes" % count)
+    print("without cache %8.3f s %8.1f us/node" % (uncached, uncached / count * 1e6))
+    print("with cache    %8.3f s %8.1f us/node" % (cached, cached / count * 1e6))
@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This program measures the memory usage of the model classes.
+
+For every element type a number of objects is created the way the
+parsers create them (id, label, position and offset set) and the
+allocated bytes per object are reported. Id and label strings are
+created in advance, they are not part of the measured size.
+
+Usage: python benchmarks/memory.py [<count>]
+"""
+
+import sys # argv
+import tracemalloc # memory measurement
+from pntools import petrinet, partialorder
+
+def measure(create, count):
+    """ Return the allocated bytes per object created by create(i). """
+    objects = [None] * count
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(0, count):
+        objects[i] = create(i)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return (after - before) / count
+
+def node_factory(cls, names):
+    def create(i):
+        node = cls()
+        node.id = names[i]
+        node.label = names[i]
+        node.position = (i, i)
+        node.offset = (0, 0)
+        return node
+    return create
+
+def edge_factory(cls, names):
+    def create(i):
+        edge = cls()
+        edge.id = names[i]
+        edge.source = names[i]
+        edge.target = names[i - 1]
+        return edge
+    return create
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    names = ["Node%d" % i for i in range(0, count)]
+
+    factories = [("Place", node_factory(petrinet.Place, names)),
+                 ("Transition", node_factory(petrinet.Transition, names)),
+                 ("Edge", edge_factory(petrinet.Edge, names)),
+                 ("Event", node_factory(partialorder.Event, names)),
+                 ("Arc", edge_factory(partialorder.Arc, names))]
+
+    for name, create in factories:
+        print("%-10s %6.1f bytes/object" % (name, measure(create, count)))
@@ -1,2 +1,2 @@
-__all__ = ["partialorder", "petrinet", "lpo_viewer", "petrinet_viewer", "partialorder_renderer", "petrinet_renderer"]
+__all__ = ["partialorder", "petrinet", "petrinet_matrix", "ids", "fonts", "geometry", "batch", "lpo_checker", "lpo_dedup", "lpo_viewer", "petrinet_viewer", "partialorder_renderer", "petrinet_renderer", "svg_renderer", "tile_renderer", "renderer_batch"]
 
@@ -0,0 +1,163 @@
+from functools import lru_cache
+from hashlib import blake2b
+from pntools.partialorder import bits
+from pntools.algorithm import lpo_skeleton
+
+DIGEST_SIZE = 16 # bytes of the colour digests
+
+class Colouring:
+    """ This class holds the refined colours of the events of a LPO.
+
+    The colour of an event starts as digest of its label. In every round
+    it is replaced by a digest of the colour and the sorted colours of its
+    direct predecessors and successors in the skeleton, until the count of
+    colours does not grow any more. Isomorphic LPOs get the same colours,
+    independent of event ids, layout and the order of events and arcs.
+
+    colouring.event_ids: Event ids by position.
+    colouring.colours: Colour (bytes) of every position.
+    colouring.successors, colouring.predecessors: Lists of the skeleton
+      neighbours of every position.
+    """
+
+    def __init__(self, lpo):
+        rows, event_ids = lpo_skeleton.skeleton_matrix(lpo)
+        count = len(event_ids)
+        self.event_ids = event_ids
+        self.successors = [list(bits(row)) for row in rows]
+        self.predecessors = [[] for i in range(0, count)]
+        for i in range(0, count):
+            for j in self.successors[i]:
+                self.predecessors[j].append(i)
+
+        colours = [label_colour(lpo.events[id].label) for id in event_ids]
+        classes = len(set(colours))
+        neighbours = list(zip(self.predecessors, self.successors))
+        for round in range(0, count):
+            colours = [digest(b''.join([colours[i], len(predecessors).to_bytes(4, 'little')] +
+                                       sorted([colours[j] for j in predecessors]) +
+                                       sorted([colours[j] for j in successors])))
+                       for i, (predecessors, successors) in enumerate(neighbours)]
+            refined = len(set(colours))
+            if refined == classes:
+                break
+            classes = refined
+        self.colours = colours
+
+    def hash(self):
+        """ Return the canonical hash of the LPO as hex string. """
+        return digest(len(self.colours).to_bytes(8, 'little') + b''.join(sorted(self.colours))).hex()
+
+def digest(data):
+    """ Return the blake2b digest of the bytes. """
+    return blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+@lru_cache(maxsize=4096)
+def label_colour(label):
+    """ Return the initial colour of events with the given label. """
+    return digest(str(label).encode())
+
+def lpo_hash(lpo):
+    """ Return a hash of the LPO which only depends on its labels and order.
+
+    Isomorphic LPOs always have the same hash. Different hashes prove that
+    LPOs are not isomorphic, equal hashes of non isomorphic LPOs are rare
+    (only for highly regular orders) and are ruled out with is_isomorphic.
+    """
+    return Colouring(lpo).hash()
+
+def is_isomorphic(first, second):
+    """ Check if there is a label preserving order isomorphism between the LPOs. """
+    return find_isomorphism(Colouring(first), Colouring(second)) is not None
+
+def find_isomorphism(first, second):
+    """ Search an isomorphism between two colourings of LPOs.
+
+    Events are only mapped to events of the same colour. The events are
+    mapped in order of ascending colour class size, every candidate is
+    checked against the skeleton arcs to the already mapped events.
+
+    return: Map of (event id of first, event id of second) or None.
+    """
+    count = len(first.colours)
+    if count != len(second.colours) or sorted(first.colours) != sorted(second.colours):
+        return None
+
+    classes = {}
+    for j, colour in enumerate(second.colours):
+        classes.setdefault(colour, []).append(j)
+    order = sorted(range(0, count), key=lambda i: (len(classes[first.colours[i]]), i))
+
+    first_neighbours = [(set(first.predecessors[i]), set(first.successors[i])) for i in range(0, count)]
+    second_neighbours = [(set(second.predecessors[j]), set(second.successors[j])) for j in range(0, count)]
+    mapping = [-1] * count # position in second of every position in first
+    inverse = [-1] * count # position in first of every position in second
+
+    def consistent(i, j):
+        """ Check the skeleton arcs between i -> j and the mapped events in both directions. """
+        predecessors, successors = second_neighbours[j]
+        for k in first.predecessors[i]:
+            if mapping[k] >= 0 and mapping[k] not in predecessors:
+                return False
+        for k in first.successors[i]:
+            if mapping[k] >= 0 and mapping[k] not in successors:
+                return False
+        predecessors, successors = first_neighbours[i]
+        for k in second.predecessors[j]:
+            if inverse[k] >= 0 and inverse[k] not in predecessors:
+                return False
+        for k in second.successors[j]:
+            if inverse[k] >= 0 and inverse[k] not in successors:
+                return False
+        return True
+
+    # depth first search without recursion, candidates[d] are the untried events for order[d]
+    candidates = [list(classes[first.colours[order[0]]])] if count else []
+    depth = 0
+    while 0 <= depth < count:
+        i = order[depth]
+        if mapping[i] >= 0:
+            inverse[mapping[i]] = -1
+            mapping[i] = -1
+        while candidates[depth]:
+            j = candidates[depth].pop()
+            if inverse[j] < 0 and consistent(i, j):
+                mapping[i] = j
+                inverse[j] = i
+                break
+        if mapping[i] < 0:
+            candidates.pop()
+            depth -= 1
+        else:
+            depth += 1
+            if depth < count:
+                candidates.append(list(classes[first.colours[order[depth]]]))
+
+    if depth < 0:
+        return None
+    return {first.event_ids[i]: second.event_ids[mapping[i]] for i in range(0, count)}
+
+def deduplicate(lpos):
+    """ Collapse the LPOs to the isomorphism classes.
+
+    The LPOs are grouped by their hash, LPOs with equal hash are compared
+    with the representatives of this hash.
+
+    lpos: Iterable of LPOs, e.g. partialorder.iter_lpo_file(file).
+    return: List of [representative LPO, count] in order of first occurrence.
+    """
+    unique = []
+    buckets = {} # Map of (hash, list of (colouring, entry of unique))
+    for lpo in lpos:
+        colouring = Colouring(lpo)
+        bucket = buckets.setdefault(colouring.hash(), [])
+        for representative, entry in bucket:
+            if find_isomorphism(colouring, representative) is not None:
+                entry[1] += 1
+                break
+        else:
+            entry = [lpo, 1]
+            unique.append(entry)
+            bucket.append((colouring, entry))
+
+    return unique
@@ -0,0 +1,191 @@
+import random as random_module
+from collections import OrderedDict
+from pntools.partialorder import bits
+
+DEFAULT_CACHE_SIZE = 1000000 # count of cached downsets
+
+class DownsetCache:
+    """ This class is a least recently used cache of the counts of downsets.
+
+    cache.maxsize: Maximal count of entries, None for no limit.
+    cache.evictions: Count of entries dropped because the cache was full.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self.__entries = OrderedDict()
+
+    def get(self, key):
+        value = self.__entries.get(key)
+        if value is not None:
+            self.__entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.__entries[key] = value
+        self.__entries.move_to_end(key)
+        if self.maxsize is not None and len(self.__entries) > self.maxsize:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.__entries)
+
+class Linearizations:
+    """ This class counts, enumerates and samples the linearizations of a LPO.
+
+    A linearization (linear extension) is a sequence of all events which
+    respects the order of the LPO. A downset is a set of events which
+    contains all events before its members, stored as bitset of the event
+    positions. The count of linearizations of the events after a downset D
+    is the sum of the counts of D + e over all minimal events e outside D.
+    These counts are memoized in a DownsetCache, so the effort depends on
+    the count of downsets (exponential in the width), not on the count of
+    linearizations. Evicted counts are calculated again when needed, a
+    cache much smaller than the count of downsets makes counting slow.
+
+    lin.event_ids: Event ids by position.
+    lin.cache: DownsetCache of the counts.
+    """
+
+    def __init__(self, lpo, cache_size=DEFAULT_CACHE_SIZE):
+        relation = lpo.relation()
+        self.event_ids = relation.event_ids
+        self.cache = DownsetCache(cache_size)
+        self.__relation = relation
+        self.__predecessors = relation.predecessors
+        self.__full = (1 << len(self.event_ids)) - 1
+
+    def minimal(self, downset):
+        """ Return the positions of the events which can follow the downset. """
+        predecessors = self.__predecessors
+        return [i for i in bits(self.__full & ~downset) if not predecessors[i] & ~downset]
+
+    def count(self, downset=0):
+        """ Return the count of linearizations of the events after the downset. """
+        full = self.__full
+        if downset == full:
+            return 1
+        cache = self.cache
+        total = cache.get(downset)
+        if total is not None:
+            return total
+
+        # depth first without recursion: frames of [downset, minimal events, next, sum]
+        stack = [[downset, self.minimal(downset), 0, 0]]
+        while True:
+            frame = stack[-1]
+            current, following, k, total = frame
+            if k == len(following):
+                cache.put(current, total)
+                stack.pop()
+                if not stack:
+                    return total
+                stack[-1][3] += total
+                continue
+
+            frame[2] = k + 1
+            child = current | 1 << following[k]
+            if child == full:
+                frame[3] += 1
+                continue
+            value = cache.get(child)
+            if value is not None:
+                frame[3] += value
+            else:
+                stack.append([child, self.minimal(child), 0, 0])
+
+    def __iter__(self):
+        """ Iterate all linearizations lazily as lists of event ids. """
+        full = self.__full
+        if full == 0:
+            yield []
+            return
+        sequence = []
+        stack = [(0, self.minimal(0))]
+        while stack:
+            downset, following = stack[-1]
+            if not following:
+                stack.pop()
+                if sequence:
+                    sequence.pop()
+                continue
+            i = following.pop()
+            sequence.append(i)
+            child = downset | 1 << i
+            if child == full:
+                yield [self.event_ids[j] for j in sequence]
+                sequence.pop()
+            else:
+                stack.append((child, self.minimal(child)))
+
+    def sample(self, random=None):
+        """ Return a uniformly distributed random linearization.
+
+        Every step chooses the next event with a probability proportional
+        to the count of linearizations which continue with it.
+        random: random.Random object, default is the module generator.
+        """
+        random = random or random_module
+        downset = 0
+        sequence = []
+        remaining = self.count(0)
+        while downset != self.__full:
+            choice = random.randrange(remaining)
+            for i in self.minimal(downset):
+                child = downset | 1 << i
+                value = self.count(child)
+                if choice < value:
+                    break
+                choice -= value
+            sequence.append(i)
+            downset = child
+            remaining = value
+        return [self.event_ids[j] for j in sequence]
+
+    def sample_approximately(self, random=None, steps=None):
+        """ Return an approximately uniform random linearization without counting.
+
+        This is the Markov chain of Karzanov and Khachiyan: starting with a
+        topological order, a random pair of neighbours is swapped in every
+        step if the two events are concurrent. The distribution converges
+        to the uniform one; the chain mixes in O(n^3 log n) steps, which
+        is the default. Fewer steps are faster for large LPOs, but the
+        result is then biased towards the starting order and not close
+        to uniform.
+
+        random: random.Random object, default is the module generator.
+        steps: Count of steps of the Markov chain, default n^3 log n.
+        """
+        random = random or random_module
+        count = len(self.event_ids)
+        if count < 2:
+            return list(self.event_ids)
+        if steps is None:
+            steps = count * count * count * count.bit_length()
+
+        sequence = topological_sequence(self.__predecessors)
+        ids = [self.event_ids[i] for i in sequence]
+        is_before = self.__relation.is_before
+        for step in range(0, steps):
+            k = random.randrange(count - 1)
+            if random.random() < 0.5 and not is_before(ids[k], ids[k + 1]):
+                ids[k], ids[k + 1] = ids[k + 1], ids[k]
+        return ids
+
+def topological_sequence(predecessors):
+    """ Return the positions sorted so that all predecessors come first. """
+    return sorted(range(0, len(predecessors)), key=lambda i: bin(predecessors[i]).count("1"))
+
+def count_linearizations(lpo, cache_size=DEFAULT_CACHE_SIZE):
+    """ Return the count of linearizations of the LPO. """
+    return Linearizations(lpo, cache_size).count()
+
+def iter_linearizations(lpo):
+    """ Iterate all linearizations of the LPO as lists of event ids. """
+    return iter(Linearizations(lpo))
+
+def random_linearization(lpo, random=None, cache_size=DEFAULT_CACHE_SIZE):
+    """ Return a uniformly distributed random linearization of the LPO. """
+    return Linearizations(lpo, cache_size).sample(random)
@@ -1,68 +1,26 @@
-from pntools import partialorder
-
 def skeleton(lpo):
-    incidence = incidence_matrix(lpo)
+    """ Mark all arcs of the LPO which belong to its skeleton (Hasse diagram). """
+    rows, event_ids = skeleton_matrix(lpo)
+    positions = lpo.index().positions
 
     for arc in lpo.arcs:
-        if is_a_skeleton_arc(incidence, arc):
+        source = positions[arc.source]
+        target = positions[arc.target]
+        if rows[source] >> target & 1:
             arc.skeleton = True
         else:
             arc.skeleton = False
 
-def is_a_skeleton_arc(incidence, arc):
-    matrix, events = incidence
-    source = events.index(arc.source)
-    target = events.index(arc.target)
-
-    for i in range(0, len(events)):
-        if i != source and matrix[i][target] == 1:
-            if is_path_to(incidence, source, i):
-                return False
-
-    return True
-
-def is_path_to(incidence, index_to_find, index_to_start):
-    matrix, events = incidence
-    
-    for i in range(0, len(events)):
-        if matrix[i][index_to_start] == 1:
-            if i == index_to_find:
-                return True
-
-    for i in range(0, len(events)):
-        if matrix[i][index_to_start] == 1:
-            if is_path_to(incidence, index_to_find, i):
-                return True
-
-    return False
-
-    
-def incidence_matrix(lpo):
-    event_ids = tuple(lpo.events.keys())
-
-    incidence = []
-    for id in event_ids:
-        line = []
-        for id in event_ids:
-            line.append(0)
-        incidence.append(line)
-
-    for arc in lpo.arcs:
-        if arc.user_drawn:
-            source = event_ids.index(arc.source)
-            target = event_ids.index(arc.target)
-            incidence[source][target] = 1
-
-    return incidence, event_ids
-
-
-
-
-
-
-
-
+def skeleton_matrix(lpo):
+    """ Calculate the skeleton of the user drawn arcs as bitsets.
 
+    An event v is a skeleton successor of u if v occurs after u and after no
+    other event which occurs after u: row[u] & ~union(closure of direct successors).
+    The rows are shared with lpo.relation() and must not be changed.
 
+    return: (rows, event_ids)
+      rows[i] is an int, bit j is set if (event_ids[i], event_ids[j]) is a skeleton arc.
+    """
+    relation = lpo.relation()
 
-    
+    return relation.skeleton(), relation.event_ids
@@ -1,102 +1,156 @@
-from pntools import partialorder
-from pntools.partialorder import LPO, Event, Arc
+from pntools.partialorder import Arc, bits
 
 def transitive_closure(lpo):
-    incidence = incidence_matrix(lpo)
-    minimal = minimal_event_ids(lpo)
+    """ Replace all calculated arcs of the LPO with its transitive closure.
 
-    for event_id in minimal:
-        recursive_add_transitive_arcs(incidence, event_id)
-
-    matrix, event_ids = incidence
+    The closure is calculated from the user drawn arcs. Calculated arcs
+    which are not part of the closure are removed, missing arcs are added
+    with user_drawn = False.
+    """
+    rows, event_ids = closure_matrix(lpo)
+    positions = lpo.index().positions
+    missing = list(rows)
 
     invalid_arcs = []
-    
+
     for arc in lpo.arcs:
-        source = event_ids.index(arc.source)
-        target = event_ids.index(arc.target)
-        if matrix[source][target] == 0:
+        source = positions[arc.source]
+        bit = 1 << positions[arc.target]
+        if missing[source] & bit:
+            missing[source] &= ~bit
+        else:
             invalid_arcs.append(arc)
-        elif matrix[source][target] == 1:
-            matrix[source][target] = 0
 
-    for arc in invalid_arcs:
-        lpo.arcs.remove(arc)
+    lpo.remove_arcs(invalid_arcs)
 
     for i in range(0, len(event_ids)):
-        for j in range(0, len(event_ids)):
-            if matrix[i][j] == 1:
-                arc = Arc()
-                arc.lpo = lpo
-                arc.source = event_ids[i]
-                arc.target = event_ids[j]
-                arc.user_drawn = False
-                lpo.arcs.append(arc)
-
-def recursive_add_transitive_arcs(incidence, event_id):
-    pre_ids = preset(incidence, event_id)
-    post_ids = postset(incidence, event_id)
-
-    matrix, event_ids = incidence
-
-    for pre_id in pre_ids:
-        for post_id in post_ids:
-            matrix[event_ids.index(pre_id)][event_ids.index(post_id)] = 1
-
-    for post_id in post_ids:
-        recursive_add_transitive_arcs(incidence, post_id)
-    
-    
-def minimal_event_ids(lpo):
-    event_ids = set()
-    arc_target_ids = set()
-    
-    for id, event in lpo.events.items():
-        event_ids.add(id)
-
-    for arc in lpo.arcs:
-        arc_target_ids.add(arc.target)
-
-    return event_ids - arc_target_ids
-        
-def incidence_matrix(lpo):
-    event_ids = tuple(lpo.events.keys())
+        for j in bits(missing[i]):
+            arc = Arc()
+            arc.source = event_ids[i]
+            arc.target = event_ids[j]
+            arc.user_drawn = False
+            lpo.add_arc(arc)
+
+def insert_arc(lpo, arc):
+    """ Add a user drawn arc to a transitively closed LPO.
+
+    Only the calculated arcs of the new ordered pairs are added and only
+    the skeleton flags of changed skeleton pairs are set, see
+    transitive_closure and lpo_skeleton. The rows of the events before the
+    source of the arc are updated, the arcs of other pairs are not visited.
+    Raises ValueError if the arc would close a cycle, the LPO is not
+    changed then.
+    """
+    relation = lpo.relation()
+    index = lpo.index()
+    positions = relation.positions
+    source = positions[arc.source]
+    target = positions[arc.target]
+    ancestors = relation.predecessors[source] | 1 << source
+    old_rows = [(i, relation.successors[i]) for i in bits(ancestors)]
+    skeleton = relation.skeleton()
+    previous = dict((i, skeleton[i]) for i in bits(ancestors))
+
+    arc.user_drawn = True
+    lpo.add_arc(arc)
+    # the user drawn arc replaces a calculated arc of the same events
+    lpo.remove_arcs([other for other in index.arcs_between(source, arc.target) if not other.user_drawn])
+
+    event_ids = relation.event_ids
+    for i, row in old_rows:
+        for j in bits(relation.successors[i] & ~row):
+            if (i, j) != (source, target):
+                calculated = Arc()
+                calculated.source = event_ids[i]
+                calculated.target = event_ids[j]
+                calculated.user_drawn = False
+                lpo.add_arc(calculated)
+
+    update_skeleton(lpo, previous)
+    # the skeleton bit of the pair is unchanged if a parallel user drawn arc exists
+    arc.skeleton = bool(relation.skeleton()[source] >> target & 1)
+
+def delete_arc(lpo, arc):
+    """ Remove a user drawn arc from a transitively closed LPO.
+
+    The calculated arcs of the pairs which are not ordered any more are
+    removed. If the events of the arc are still ordered by other arcs, a
+    calculated arc replaces it. See insert_arc.
+    """
+    relation = lpo.relation()
+    index = lpo.index()
+    positions = relation.positions
+    source = positions[arc.source]
+    target = positions[arc.target]
+    ancestors = relation.predecessors[source] | 1 << source
+    old_rows = dict((i, relation.successors[i]) for i in bits(ancestors))
+    skeleton = relation.skeleton()
+    previous = dict((i, skeleton[i]) for i in bits(ancestors))
+
+    lpo.remove_arc(arc)
+
+    event_ids = relation.event_ids
+    unordered = []
+    for i, row in old_rows.items():
+        for j in bits(row & ~relation.successors[i]):
+            unordered.extend(other for other in index.arcs_between(i, event_ids[j]) if not other.user_drawn)
+    lpo.remove_arcs(unordered)
+
+    update_skeleton(lpo, previous)
+    if relation.is_before(arc.source, arc.target) and not index.arcs_between(source, arc.target):
+        calculated = Arc()
+        calculated.source = arc.source
+        calculated.target = arc.target
+        calculated.user_drawn = False
+        calculated.skeleton = bool(relation.skeleton()[source] >> target & 1)
+        lpo.add_arc(calculated)
+
+def update_skeleton(lpo, previous):
+    """ Set the skeleton flags of the arcs of changed skeleton pairs.
+
+    previous: Map of (position, skeleton row before the change) of all
+      events whose skeleton row may have changed. Only the arcs of pairs
+      whose skeleton bit changed are visited.
+    """
+    relation = lpo.relation()
+    rows = relation.skeleton()
+    index = lpo.index()
+    event_ids = relation.event_ids
+
+    for i, row in previous.items():
+        for j in bits(row ^ rows[i]):
+            flag = bool(rows[i] >> j & 1)
+            for arc in index.arcs_between(i, event_ids[j]):
+                arc.skeleton = flag
+
+def closure_matrix(lpo):
+    """ Return the transitive closure of the user drawn arcs as bitsets.
+
+    The rows are shared with lpo.relation() and must not be changed.
+
+    return: (rows, event_ids)
+      rows[i] is an int, bit j is set if event_ids[j] occurs after event_ids[i].
+    """
+    relation = lpo.relation()
+
+    return relation.successors, relation.event_ids
+
+def is_ordered(lpo, rows, source_id, target_id):
+    """ Check with the closure rows if the target event occurs after the source event. """
+    positions = lpo.index().positions
+    return bool(rows[positions[source_id]] >> positions[target_id] & 1)
+
+def adjacency(lpo):
+    """ Successor sets of the user drawn arcs, indexed by event position.
+
+    The sets are shared with lpo.index() and must not be changed.
+    """
+    index = lpo.index()
+
+    return index.successors, index.event_ids
 
-    incidence = []
-    for id in event_ids:
-        line = []
-        for id in event_ids:
-            line.append(0)
-        incidence.append(line)
+def minimal_event_ids(lpo):
+    """ Ids of all events without user drawn arcs to them. """
+    index = lpo.index()
 
-    for arc in lpo.arcs:
-        if arc.user_drawn:
-            source = event_ids.index(arc.source)
-            target = event_ids.index(arc.target)
-            incidence[source][target] = 1
-
-    return incidence, event_ids
-
-def preset(incidence, event_id):
-    preset = set()
-    
-    matrix, events = incidence
-    index = events.index(event_id)
-    
-    for i in range(0, len(events)):
-        if matrix[i][index] == 1:
-            preset.add(events[i])
-
-    return preset
-
-def postset(incidence, event_id):
-    postset = set()
-    
-    matrix, events = incidence
-    index = events.index(event_id)
-    
-    for i in range(0, len(events)):
-        if matrix[index][i] == 1:
-            postset.add(events[i])
-
-    return postset
+    return set(index.event_ids[i] for i in range(0, len(index)) if not index.predecessors[i])
@@ -0,0 +1,208 @@
+from pntools import petrinet_matrix
+from pntools.algorithm import lpo_skeleton
+from pntools.partialorder import bits, topological_order
+
+SOURCE = 0 # node numbers of the flow network
+SINK = 1
+INITIAL = 2
+
+class RunChecker:
+    """ This class checks if LPOs are runs (enabled) of a Petri net.
+
+    An LPO is enabled in a marked P/T net if and only if every place has
+    a valid token flow (Juhas, Lorenz, Desel): the tokens consumed by every
+    event are produced by the initial marking or by events before it.
+    This is decided per place with a maximum flow along the skeleton of
+    the LPO, so the check is polynomial and never enumerates
+    linearizations.
+
+    Events are mapped to transitions by label (the id for transitions
+    without label). The transition data of the net is prepared once, so a
+    checker should be reused for all LPOs of one net.
+
+    checker.net: ArrayNet of the Petri net.
+    checker.transitions: Map of (label, transition index).
+    """
+
+    def __init__(self, net):
+        if not isinstance(net, petrinet_matrix.ArrayNet):
+            net = petrinet_matrix.from_petrinet(net)
+        self.net = net
+
+        self.transitions = {}
+        for t, id in enumerate(net.transition_ids):
+            label = net.transition_labels[t]
+            if label is None:
+                label = id
+            if label in self.transitions:
+                raise ValueError("transition label " + repr(label) + " is not unique")
+            self.transitions[label] = t
+
+        self.__pre = [dict(zip(*(a.tolist() for a in net.pre.row(t)))) for t in range(0, len(net.transition_ids))]
+        self.__post = [dict(zip(*(a.tolist() for a in net.post.row(t)))) for t in range(0, len(net.transition_ids))]
+        self.__marking = net.marking.tolist()
+
+    def violated_places(self, lpo):
+        """ Return the ids of all places without valid token flow for the LPO.
+
+        The LPO is a run of the net if the list is empty.
+        Raises ValueError for events without transition and for cyclic LPOs.
+        """
+        rows, event_ids = lpo_skeleton.skeleton_matrix(lpo)
+        count = len(event_ids)
+        transitions = []
+        for id in event_ids:
+            label = lpo.events[id].label
+            if label not in self.transitions:
+                raise ValueError("no transition with label " + repr(label) + " for event " + str(id))
+            transitions.append(self.transitions[label])
+
+        # demand and supply of every place, only places consumed by an event need a check
+        consumers = {}
+        producers = {}
+        for i, t in enumerate(transitions):
+            for p, weight in self.__pre[t].items():
+                consumers.setdefault(p, []).append((i, weight))
+            for p, weight in self.__post[t].items():
+                producers.setdefault(p, []).append((i, weight))
+
+        order = None
+        violated = []
+        for p in sorted(consumers):
+            demand = sum(weight for i, weight in consumers[p])
+            initial = self.__marking[p]
+            if initial >= demand:
+                continue # the initial tokens reach every event
+            if initial + sum(weight for i, weight in producers.get(p, ())) < demand:
+                violated.append(self.net.place_ids[p])
+                continue
+
+            if order is None:
+                successors = [list(bits(row)) for row in rows]
+                order = topological_order(successors)
+                minimal = [i for i in range(0, count) if not lpo.index().predecessors[i]]
+            network = TokenFlowNetwork(successors, order, minimal, initial,
+                                       producers.get(p, ()), consumers[p])
+            if network.max_flow(demand) < demand:
+                violated.append(self.net.place_ids[p])
+
+        return violated
+
+    def is_executable(self, lpo):
+        """ Check if the LPO is a run of the net. """
+        return not self.violated_places(lpo)
+
+class TokenFlowNetwork:
+    """ This class represents the flow network of the token flows of one place.
+
+    Only the events which consume or produce tokens in the place (relevant
+    events) get nodes: event k of the network has the nodes 3 + 2 * k (in)
+    and 4 + 2 * k (out). Tokens arriving at an event are consumed
+    (in -> sink) or passed on (in -> out), produced tokens enter at out
+    (source -> out), the initial tokens at the node INITIAL.
+
+    Tokens are passed on from a relevant event to the first relevant events
+    after it on every skeleton path (out -> in), the initial tokens to the
+    first relevant events of all paths. A token can reach every later event
+    through a chain of these arcs, so the network allows exactly the valid
+    token flows with much fewer nodes and arcs than the whole skeleton.
+    """
+
+    def __init__(self, successors, order, minimal, initial, producers, consumers):
+        nodes = {} # Map of (event position, network event)
+        for i, tokens in list(producers) + list(consumers):
+            nodes.setdefault(i, len(nodes))
+
+        # first[i]: bitset of the first relevant events after event i
+        first = [0] * len(successors)
+        for i in reversed(order):
+            row = 0
+            for j in successors[i]:
+                row |= 1 << j if j in nodes else first[j]
+            first[i] = row
+
+        self.heads = [[] for i in range(0, 3 + 2 * len(nodes))]
+        self.to = []
+        self.capacity = []
+        unlimited = initial + sum(tokens for i, tokens in consumers)
+
+        self.add_edge(SOURCE, INITIAL, initial)
+        for i, tokens in producers:
+            self.add_edge(SOURCE, 4 + 2 * nodes[i], tokens)
+        for i, tokens in consumers:
+            self.add_edge(3 + 2 * nodes[i], SINK, tokens)
+
+        targets = 0
+        for i in minimal:
+            targets |= 1 << i if i in nodes else first[i]
+        for j in bits(targets):
+            self.add_edge(INITIAL, 3 + 2 * nodes[j], unlimited)
+        for i, k in nodes.items():
+            self.add_edge(3 + 2 * k, 4 + 2 * k, unlimited)
+            for j in bits(first[i]):
+                self.add_edge(4 + 2 * k, 3 + 2 * nodes[j], unlimited)
+
+    def add_edge(self, source, target, capacity):
+        """ Add an edge and its reverse edge (number ^ 1). """
+        edge = len(self.to)
+        self.heads[source].append(edge)
+        self.to.append(target)
+        self.capacity.append(capacity)
+        self.heads[target].append(edge + 1)
+        self.to.append(source)
+        self.capacity.append(0)
+
+    def max_flow(self, demand):
+        """ Calculate the maximum token flow (Dinic), stop at the demand. """
+        capacity = self.capacity
+        heads = self.heads
+        to = self.to
+        flow = 0
+        while flow < demand:
+            level = [-1] * len(heads)
+            level[SOURCE] = 0
+            queue = [SOURCE]
+            for v in queue:
+                for edge in heads[v]:
+                    w = to[edge]
+                    if capacity[edge] > 0 and level[w] < 0:
+                        level[w] = level[v] + 1
+                        queue.append(w)
+            if level[SINK] < 0:
+                break
+
+            # augment along shortest paths, pointer[v] skips exhausted edges of v
+            pointer = [0] * len(heads)
+            path = []
+            v = SOURCE
+            while True:
+                if v == SINK:
+                    tokens = min(capacity[edge] for edge in path)
+                    for edge in path:
+                        capacity[edge] -= tokens
+                        capacity[edge ^ 1] += tokens
+                    flow += tokens
+                    path = []
+                    v = SOURCE
+                    continue
+
+                edges = heads[v]
+                i = pointer[v]
+                while i < len(edges) and not (capacity[edges[i]] > 0 and level[to[edges[i]]] == level[v] + 1):
+                    i += 1
+                pointer[v] = i
+                if i < len(edges):
+                    path.append(edges[i])
+                    v = to[edges[i]]
+                elif path:
+                    level[v] = -1 # dead end in this phase
+                    v = to[path.pop() ^ 1]
+                    pointer[v] += 1
+                else:
+                    break
+
+        return flow
+
+def is_executable(net, lpo):
+    """ Check if the LPO is a run of the Petri net. """
+    return RunChecker(net).is_executable(lpo)
@@ -0,0 +1,173 @@
+from pntools.partialorder import bits, topological_order
+
+def height(lpo):
+    """ Return the count of events of the longest chain of the LPO. """
+    return len(longest_chain(lpo))
+
+def longest_chain(lpo):
+    """ Return the ids of the events of a longest chain of the LPO in order. """
+    index = lpo.index()
+    successors = index.successors
+    length = [1] * len(index) # length of the longest chain starting at an event
+    following = [-1] * len(index)
+
+    for i in reversed(topological_order(successors)):
+        for j in successors[i]:
+            if length[j] + 1 > length[i]:
+                length[i] = length[j] + 1
+                following[i] = j
+
+    if not length:
+        return []
+    i = max(range(0, len(length)), key=length.__getitem__)
+    chain = []
+    while i >= 0:
+        chain.append(index.event_ids[i])
+        i = following[i]
+    return chain
+
+def width(lpo):
+    """ Return the count of events of a maximum antichain of the LPO. """
+    return len(dilworth(lpo)[0])
+
+def maximum_antichain(lpo):
+    """ Return the ids of a maximum set of pairwise concurrent events. """
+    return dilworth(lpo)[0]
+
+def chain_cover(lpo):
+    """ Return a minimum list of chains (lists of event ids) covering all events. """
+    return dilworth(lpo)[1]
+
+def dilworth(lpo):
+    """ Calculate a maximum antichain and a minimum chain cover of the LPO.
+
+    By Dilworth's theorem both have the same size, the width of the LPO.
+    Every event i is split into a left and a right copy, left i and right j
+    are connected if i occurs before j. A maximum matching of this graph
+    links the events to n - width chains, the antichain is derived from a
+    minimum vertex cover (Koenig).
+
+    return: (antichain, chains)
+      antichain: Set of event ids.
+      chains: List of chains, every chain is a list of event ids in order.
+    """
+    relation = lpo.relation()
+    rows = relation.successors
+    event_ids = relation.event_ids
+    count = len(event_ids)
+    partner, matched = maximum_matching(rows)
+
+    # Koenig: left copies reachable from free left copies by alternating paths
+    reached_left = 0
+    reached_right = 0
+    pending = [i for i in range(0, count) if partner[i] < 0]
+    for i in pending:
+        reached_left |= 1 << i
+    while pending:
+        following = []
+        for i in pending:
+            new = rows[i] & ~reached_right
+            reached_right |= new
+            for j in bits(new):
+                k = matched[j] # every reached right copy is matched in a maximum matching
+                if not reached_left >> k & 1:
+                    reached_left |= 1 << k
+                    following.append(k)
+        pending = following
+
+    antichain = set(event_ids[i] for i in bits(reached_left & ~reached_right))
+
+    chains = []
+    for i in range(0, count):
+        if matched[i] < 0: # no predecessor in its chain
+            chain = []
+            while i >= 0:
+                chain.append(event_ids[i])
+                i = partner[i]
+            chains.append(chain)
+
+    return antichain, chains
+
+def maximum_matching(rows):
+    """ Calculate a maximum matching of the bipartite graph given by bitset rows (Hopcroft-Karp).
+
+    Left vertex i is connected to right vertex j if bit j of rows[i] is set.
+    The neighbours of a vertex are found by intersecting its row with the
+    bitset of the right vertices still allowed in the current phase, so
+    every right vertex is visited at most once per phase.
+
+    return: (partner, matched)
+      partner[i]: Right vertex matched to left vertex i, -1 if free.
+      matched[j]: Left vertex matched to right vertex j, -1 if free.
+    """
+    count = len(rows)
+    partner = [-1] * count
+    matched = [-1] * count
+
+    # greedy start matching
+    free_right = (1 << count) - 1
+    for i in range(0, count):
+        candidates = rows[i] & free_right
+        if candidates:
+            j = (candidates & -candidates).bit_length() - 1
+            partner[i] = j
+            matched[j] = i
+            free_right &= ~(1 << j)
+
+    while True:
+        # BFS: layers of left vertices, right vertices by the layer they are reached from
+        layer = [i for i in range(0, count) if partner[i] < 0]
+        visited_right = 0
+        layers = [] # right vertices reached from every layer
+        found = False
+        while layer and not found:
+            reached = 0
+            following = []
+            for i in layer:
+                new = rows[i] & ~visited_right & ~reached
+                reached |= new
+            for j in bits(reached):
+                if matched[j] < 0:
+                    found = True
+                else:
+                    following.append(matched[j])
+            visited_right |= reached
+            layers.append(reached)
+            layer = following
+        if not found:
+            break
+
+        # DFS along the layers, allowed[k] holds the unused right vertices of layer k
+        allowed = layers
+        last = len(layers) - 1
+        augmented = False
+        for start in range(0, count):
+            if partner[start] >= 0:
+                continue
+            path = [] # (left vertex, right vertex) pairs
+            i = start
+            while True:
+                depth = len(path)
+                candidates = rows[i] & allowed[depth]
+                if depth == last:
+                    candidates &= free_right
+                if candidates:
+                    j = (candidates & -candidates).bit_length() - 1
+                    allowed[depth] &= ~(1 << j)
+                    path.append((i, j))
+                    if matched[j] < 0:
+                        for k, v in path:
+                            partner[k] = v
+                            matched[v] = k
+                        free_right &= ~(1 << j)
+                        augmented = True
+                        break
+                    i = matched[j]
+                elif path:
+                    i, j = path.pop() # dead end, j stays excluded in this phase
+                else:
+                    break
+        if not augmented:
+            break
+
+    return partner, matched
@@ -0,0 +1,176 @@
+from array import array
+import numpy as np
+from pntools import petrinet_matrix
+
+OMEGA = 2 ** 62 # token count of an unbounded place (omega)
+OMEGA_LIMIT = 2 ** 61 # counts above this limit are omega, so omega +- weights stays omega
+
+class CoverabilityGraph:
+    """ This class represents the Karp-Miller coverability graph of a Petri net.
+
+    Markings are NumPy vectors in which unbounded places have the token
+    count OMEGA. Nodes with the same marking are merged, so the graph has
+    one node per distinct omega-marking.
+
+    graph.net: ArrayNet of the analysed Petri net.
+    graph.markings: List of the omega-marking of every node, node 0 is the
+      initial marking.
+    graph.index: Map of (marking bytes, node) of all nodes.
+    graph.sources, graph.transitions, graph.targets: Arrays of the edges; edge i
+      fires transition index transitions[i] in node sources[i] and reaches
+      node targets[i].
+    graph.complete: False if the construction was stopped by max_nodes.
+    """
+
+    def __init__(self, net):
+        self.net = net
+        self.markings = []
+        self.index = {}
+        self.sources = array('q')
+        self.transitions = array('q')
+        self.targets = array('q')
+        self.complete = True
+
+    def add_node(self, marking):
+        """ Add a node with the given omega-marking and return its number. """
+        node = len(self.markings)
+        self.markings.append(marking)
+        self.index[marking.tobytes()] = node
+        return node
+
+    def add_edge(self, source, transition, target):
+        self.sources.append(source)
+        self.transitions.append(transition)
+        self.targets.append(target)
+
+    def place_marking(self, node):
+        """ Return the marking of the node as map of (place id, tokens), None is omega. """
+        marking = self.markings[node]
+        return {id: (int(marking[i]) if marking[i] < OMEGA_LIMIT else None)
+                for i, id in enumerate(self.net.place_ids)}
+
+    def edges(self):
+        """ Iterate (source node, transition id, target node) of all edges. """
+        ids = self.net.transition_ids
+        for source, transition, target in zip(self.sources, self.transitions, self.targets):
+            yield source, ids[transition], target
+
+    def maxima(self):
+        """ Return a vector of the maximal token count of every place, OMEGA if unbounded. """
+        if not self.markings:
+            return np.zeros(len(self.net.place_ids), dtype=np.int64)
+        return np.max(self.markings, axis=0)
+
+    def bounds(self):
+        """ Return a map of (place id, maximal token count), None for unbounded places. """
+        maxima = self.maxima()
+        return {id: (int(maxima[i]) if maxima[i] < OMEGA_LIMIT else None)
+                for i, id in enumerate(self.net.place_ids)}
+
+    def unbounded_places(self):
+        """ Return the ids of all unbounded places. """
+        maxima = self.maxima()
+        return [id for i, id in enumerate(self.net.place_ids) if maxima[i] >= OMEGA_LIMIT]
+
+    def is_bounded(self):
+        """ Check if all places are bounded. """
+        return bool((self.maxima() < OMEGA_LIMIT).all())
+
+    def __len__(self):
+        return len(self.markings)
+
+def coverability_graph(net, max_nodes=None):
+    """ Build the Karp-Miller coverability graph of a PetriNet or ArrayNet.
+
+    The graph is built depth first. The omega-markings of the current path
+    are kept as rows of a matrix together with a key (omega count, finite
+    token count) per row. An ancestor strictly covered by a new marking has
+    a smaller key, so the key column selects the candidates and only those
+    are compared place by place. Every place in which the new marking
+    strictly exceeds a covered ancestor is accelerated to omega. Markings
+    already in the graph are looked up in a hash index and not expanded
+    again.
+
+    max_nodes: Stop after this count of nodes, graph.complete is False then.
+    return: CoverabilityGraph
+    """
+    if not isinstance(net, petrinet_matrix.ArrayNet):
+        net = petrinet_matrix.from_petrinet(net)
+
+    pre = net.pre.to_dense()
+    effect = net.effect.to_dense()
+    graph = CoverabilityGraph(net)
+
+    initial = net.marking.astype(np.int64)
+    graph.add_node(initial)
+    path = np.empty((16, len(initial)), dtype=np.int64) # omega-markings of the stack
+    keys = np.empty((16, 2), dtype=np.int64) # coverage keys of the path
+    path[0] = initial
+    keys[0] = coverage_key(initial)
+    stack = [(0, enabled_transitions(pre, initial))]
+
+    while stack:
+        node, transitions = stack[-1]
+        transition = next(transitions, None)
+        if transition is None:
+            stack.pop()
+            continue
+
+        marking = graph.markings[node] + effect[transition]
+        marking[marking >= OMEGA_LIMIT] = OMEGA
+        accelerate(path[:len(stack)], keys[:len(stack)], marking)
+
+        target = graph.index.get(marking.tobytes())
+        if target is None:
+            if max_nodes is not None and len(graph.markings) >= max_nodes:
+                graph.complete = False
+                break
+            target = graph.add_node(marking)
+            if len(stack) == len(path):
+                path = np.concatenate((path, np.empty_like(path)))
+                keys = np.concatenate((keys, np.empty_like(keys)))
+            path[len(stack)] = marking
+            keys[len(stack)] = coverage_key(marking)
+            stack.append((target, enabled_transitions(pre, marking)))
+        graph.add_edge(node, transition, target)
+
+    return graph
+
+def accelerate(ancestors, keys, marking):
+    """ Set all places of the marking to omega which grow against a covered ancestor.
+
+    ancestors: (ancestors x places) array of the omega-markings on the path.
+    keys: (ancestors x 2) array of the coverage keys of the ancestors.
+    marking: Omega-marking, changed in place.
+    """
+    while True:
+        omegas, tokens = coverage_key(marking)
+        candidates = np.flatnonzero((keys[:, 0] < omegas) | ((keys[:, 0] == omegas) & (keys[:, 1] < tokens)))
+        if len(candidates) == 0:
+            return
+        selected = ancestors[candidates]
+        covered = (selected <= marking).all(axis=1)
+        if not covered.any():
+            return
+        increased = (selected[covered] < marking).any(axis=0) & (marking < OMEGA_LIMIT)
+        if not increased.any():
+            return
+        # new omegas may cover further ancestors, so check again
+        marking[increased] = OMEGA
+
+def coverage_key(marking):
+    """ Return (omega count, finite token count) of the omega-marking.
+
+    If an omega-marking a is strictly covered by b, the key of a is
+    lexicographically smaller than the key of b.
+    """
+    finite = marking < OMEGA_LIMIT
+    return len(marking) - int(finite.sum()), int(marking[finite].sum())
+
+def enabled_transitions(pre, marking):
+    """ Return an iterator of the transition indices enabled in the omega-marking. """
+    return iter(np.flatnonzero((marking >= pre).all(axis=1)).tolist())
+
+def bounds(net):
+    """ Return a map of (place id, maximal token count) of a Petri net, None for unbounded places. """
+    return coverability_graph(net).bounds()
@@ -0,0 +1,379 @@
+import multiprocessing
+import multiprocessing.connection # wait for worker results
+from array import array
+import numpy as np
+from pntools import petrinet_matrix
+from pntools.algorithm.pn_simulation import add_rows
+
+BLOCK_SIZE = 4096 # states expanded with one vectorized enabledness check
+STATE_OVERHEAD = 200 # estimated bytes per state for the hash sets and maps
+EDGE_SIZE = 24 # bytes per edge (three int64 values)
+STOP_TIMEOUT = 5 # seconds to wait for a worker to stop before it is terminated
+# odd multipliers of the marking hash, fixed so that all processes agree
+HASH_MULTIPLIERS = np.random.default_rng(0x5EED).integers(1, 2 ** 63, 64, dtype=np.uint64) | np.uint64(1)
+
+class ReachabilityGraph:
+    """ This class represents the (partial) reachability graph of a Petri net.
+
+    Markings are stored packed as bytes of a NumPy vector with the given dtype.
+
+    graph.net: ArrayNet of the explored Petri net.
+    graph.initial: State id of the initial marking.
+    graph.markings: Map of (state id, packed marking) of all reached states.
+    graph.sources, graph.transitions, graph.targets: Arrays of the edges; edge i
+      fires transition index transitions[i] in state sources[i] and reaches
+      state targets[i].
+    graph.complete: False if the exploration was stopped by a limit.
+    """
+
+    def __init__(self, net, dtype):
+        self.net = net
+        self.dtype = np.dtype(dtype)
+        self.initial = None
+        self.markings = {}
+        self.sources = array('q')
+        self.transitions = array('q')
+        self.targets = array('q')
+        self.complete = True
+
+    def marking(self, state):
+        """ Return the marking of the given state as NumPy vector. """
+        return np.frombuffer(self.markings[state], dtype=self.dtype)
+
+    def place_marking(self, state):
+        """ Return the marking of the given state as map of (place id, tokens). """
+        marking = self.marking(state)
+        return {id: int(marking[i]) for i, id in enumerate(self.net.place_ids)}
+
+    def edges(self):
+        """ Iterate (source state, transition id, target state) of all edges. """
+        ids = self.net.transition_ids
+        for source, transition, target in zip(self.sources, self.transitions, self.targets):
+            yield source, ids[transition], target
+
+    def deadlocks(self):
+        """ Return the ids of all explored states without outgoing edges. """
+        return set(self.markings) - set(self.sources)
+
+    def __len__(self):
+        return len(self.markings)
+
+class Shard:
+    """ This class owns the states of one hash partition.
+
+    A state belongs to shard hash_markings(marking) % count. The shard numbers
+    its states with local index * count + shard number, so state ids are
+    unique without coordination between the shards.
+
+    Reached states are passed as records (sources, transitions, markings):
+    arrays of the source state ids (-1 for the initial marking), the fired
+    transition indices and a (records x places) array of the reached markings.
+    """
+
+    def __init__(self, net, number, count, dtype):
+        self.net = net
+        self.number = number
+        self.count = count
+        self.dtype = np.dtype(dtype)
+        self.visited = {} # Map of (packed marking, state id)
+        self.limit = np.iinfo(self.dtype).max
+
+    def process(self, records, budget=None):
+        """ Insert the reached states and expand the new ones.
+
+        records: List of records reached in this shard.
+        budget: Maximal count of new states, None for no limit.
+        return: (edges, count, outgoing, truncated)
+          edges: (sources, transitions, targets) arrays of the inserted edges.
+          count: Count of the new states, the shard keeps their markings.
+          outgoing: List per shard of the successor records owned by that shard.
+          truncated: True if states were dropped because of the budget.
+        """
+        sources = np.concatenate([record[0] for record in records])
+        transitions = np.concatenate([record[1] for record in records])
+        markings = np.concatenate([record[2] for record in records])
+
+        # look up every distinct marking only once
+        size = markings.shape[1] * self.dtype.itemsize
+        keys = np.ascontiguousarray(markings).view(np.dtype((np.void, max(size, 1))))
+        keys, first, inverse = np.unique(keys.ravel(), return_index=True, return_inverse=True)
+        distinct = markings[first]
+        data = distinct.tobytes()
+
+        visited = self.visited
+        ids = np.empty(len(distinct), dtype=np.int64)
+        new = []
+        truncated = False
+        for i in range(0, len(distinct)):
+            packed = data[i * size:(i + 1) * size]
+            state = visited.get(packed)
+            if state is None:
+                if budget is not None and len(new) >= budget:
+                    truncated = True
+                    ids[i] = -1
+                    continue
+                state = len(visited) * self.count + self.number
+                visited[packed] = state
+                new.append(i)
+            ids[i] = state
+
+        targets = ids[inverse.ravel()]
+        inserted = (sources >= 0) & (targets >= 0)
+        edges = (sources[inserted], transitions[inserted], targets[inserted])
+        ids, distinct = ids[new], distinct[new]
+
+        outgoing = [[] for i in range(0, self.count)]
+        for i in range(0, len(new), BLOCK_SIZE):
+            self.expand(ids[i:i + BLOCK_SIZE], distinct[i:i + BLOCK_SIZE], outgoing)
+
+        return edges, len(new), outgoing, truncated
+
+    def states(self):
+        """ Return the map of (state id, packed marking) of the states of this shard. """
+        return {state: packed for packed, state in self.visited.items()}
+
+    def expand(self, ids, markings, outgoing):
+        """ Add the successor records of the given states to outgoing. """
+        net = self.net
+        markings = markings.astype(np.int64)
+        rows, fired = np.nonzero(net.enabled(markings))
+        if len(rows) == 0:
+            return
+
+        successors = markings[rows]
+        add_rows(successors, net.effect, np.arange(len(rows)), fired)
+        if successors.size and successors.max() > self.limit:
+            raise OverflowError("token count exceeds " + str(self.dtype) + ", use a larger dtype")
+        successors = successors.astype(self.dtype)
+
+        sources = ids[rows]
+        owners = hash_markings(successors) % self.count
+        for owner in range(0, self.count):
+            selected = owners == owner
+            if selected.any():
+                outgoing[owner].append((sources[selected], fired[selected], successors[selected]))
+
+def hash_markings(markings):
+    """ Return a uint64 hash of every row of the (markings x places) array.
+
+    The hash only depends on the token counts, so all processes agree on
+    the owner of a state.
+    """
+    places = markings.shape[1]
+    multipliers = np.resize(HASH_MULTIPLIERS, places) + np.arange(places, dtype=np.uint64) * np.uint64(2)
+    with np.errstate(over='ignore'):
+        hashes = (markings.astype(np.uint64) * multipliers).sum(axis=1, dtype=np.uint64)
+        hashes ^= hashes >> np.uint64(31)
+        hashes *= np.uint64(0x9E3779B97F4A7C15)
+        hashes ^= hashes >> np.uint64(29)
+    return hashes
+
+def shard_worker(connection, inboxes, net, number, count, dtype):
+    """ Process loop of a worker process owning one shard.
+
+    The parent sends (level, budget, expected) to process a level, 'states'
+    to send the states of the shard and None to stop. The records of a
+    level are the records the shard kept for itself and the expected count
+    of record messages of the other shards, which put them directly into
+    the inbox queue of this shard. The result of a level is (edges, count,
+    sent, truncated), sent[i] is True if records were sent to shard i. An
+    exception is sent to the parent instead of a result and stops the worker.
+    """
+    shard = Shard(net, number, count, dtype)
+    inbox = inboxes[number]
+    for queue in inboxes:
+        queue.cancel_join_thread() # records still queued at a stop are dropped
+    kept = [] # own successor records of the last level
+    early = {} # record messages of later levels. Key: level
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        try:
+            if message == 'states':
+                connection.send(shard.states())
+                continue
+
+            level, budget, expected = message
+            records = kept
+            received = early.pop(level, [])
+            while len(received) < expected:
+                item = inbox.get()
+                if item is None: # the parent stops after an error of another shard
+                    return
+                if item[0] == level:
+                    received.append(item[1])
+                else:
+                    early.setdefault(item[0], []).append(item[1])
+            for other in received:
+                records.extend(other)
+
+            edges, new, outgoing, truncated = shard.process(records, budget)
+            kept = outgoing[number]
+            for owner in range(0, count):
+                if owner != number and outgoing[owner]:
+                    inboxes[owner].put((level + 1, outgoing[owner]))
+            connection.send((edges, new, [bool(part) for part in outgoing], truncated))
+        except Exception as error: # re-raised by the parent
+            connection.send(error)
+            break
+    connection.close()
+
+def receive_all(connections):
+    """ Receive the next result of every connection and re-raise the first exception of a worker. """
+    results = {}
+    waiting = list(connections)
+    while waiting:
+        for connection in multiprocessing.connection.wait(waiting):
+            result = connection.recv()
+            if isinstance(result, Exception):
+                raise result
+            results[connection] = result
+            waiting.remove(connection)
+    return [results[connection] for connection in connections]
+
+def share(budget, pending):
+    """ Split the budget among the shards with pending records.
+
+    return: List of the budget of every shard, None for no limit.
+    """
+    if budget is None:
+        return [None] * len(pending)
+    active = [number for number in range(0, len(pending)) if pending[number]]
+    budgets = [0] * len(pending)
+    for i, number in enumerate(active):
+        # the first budget % len(active) shards get the leftover states
+        budgets[number] = budget // len(active) + (i < budget % len(active))
+    return budgets
+
+def explore(net, workers=1, max_states=None, max_memory=None, progress=None, dtype=np.int32):
+    """ Build the reachability graph of the given PetriNet or ArrayNet.
+
+    The graph is explored breadth first from the initial marking. The
+    states are partitioned by the hash of their marking; with more than
+    one worker every partition is owned by a worker process which keeps
+    its hash set, expands its states and sends the successor records
+    directly to the owning workers. The workers only return the edges
+    and counts of every level, the markings are merged into the graph at
+    the end.
+
+    workers: Count of worker processes, 1 explores in this process.
+    max_states: Stop after this count of states.
+    max_memory: Stop if the estimated memory of states and edges exceeds
+      this count of bytes.
+    progress: Function called after every level with (states, edges, level).
+    dtype: NumPy integer type of the packed markings.
+    return: ReachabilityGraph, graph.complete is False if a limit was reached.
+      If not even the initial state fits, the graph is empty and
+      graph.initial is None.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1, got " + str(workers))
+    if not isinstance(net, petrinet_matrix.ArrayNet):
+        net = petrinet_matrix.from_petrinet(net)
+
+    graph = ReachabilityGraph(net, dtype)
+    state_size = len(net.place_ids) * graph.dtype.itemsize + STATE_OVERHEAD
+
+    connections = []
+    inboxes = []
+    processes = []
+    if workers > 1:
+        inboxes = [multiprocessing.Queue() for number in range(0, workers)]
+        for number in range(0, workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=shard_worker, daemon=True,
+                                              args=(child, inboxes, net, number, workers, dtype))
+            process.start()
+            child.close()
+            connections.append(parent)
+            processes.append(process)
+    else:
+        shard = Shard(net, 0, 1, dtype)
+
+    try:
+        initial = net.marking.astype(graph.dtype).reshape(1, -1)
+        owner = int(hash_markings(initial)[0] % np.uint64(workers))
+        records = [(np.array([-1]), np.array([-1]), initial)]
+        expected = [0] * workers # record messages of other shards per shard
+        if workers > 1:
+            inboxes[owner].put((0, records))
+            expected[owner] = 1
+        pending = [number == owner for number in range(0, workers)]
+        states = 0
+        level = 0
+
+        while any(pending):
+            budget = None
+            if max_states is not None:
+                budget = max(0, max_states - states)
+            if max_memory is not None:
+                used = states * state_size + len(graph.sources) * EDGE_SIZE
+                memory_budget = max(0, (max_memory - used) // state_size)
+                budget = memory_budget if budget is None else min(budget, memory_budget)
+            budgets = share(budget, pending)
+
+            active = [number for number in range(0, workers) if pending[number]]
+            if workers > 1:
+                for number in active:
+                    connections[number].send((level, budgets[number], expected[number]))
+                results = receive_all([connections[number] for number in active])
+            else:
+                edges, count, outgoing, truncated = shard.process(records, budgets[0])
+                records = outgoing[0]
+                results = [(edges, count, [bool(records)], truncated)]
+
+            expected = [0] * workers
+            pending = [False] * workers
+            for number, (edges, count, sent, truncated) in zip(active, results):
+                graph.sources.frombytes(edges[0].astype(np.int64).tobytes())
+                graph.transitions.frombytes(edges[1].astype(np.int64).tobytes())
+                graph.targets.frombytes(edges[2].astype(np.int64).tobytes())
+                states += count
+                for other in range(0, workers):
+                    if sent[other]:
+                        pending[other] = True
+                        expected[other] += other != number
+                if truncated:
+                    graph.complete = False
+
+            if level == 0 and states:
+                graph.initial = owner # first state of its shard, see Shard
+            level += 1
+            if progress is not None:
+                progress(states, len(graph.sources), level)
+            if not graph.complete:
+                break
+
+        if workers > 1:
+            for connection in connections:
+                connection.send('states')
+            for markings in receive_all(connections):
+                graph.markings.update(markings)
+        else:
+            graph.markings = shard.states()
+    finally:
+        stop_workers(connections, inboxes, processes)
+
+    return graph
+
+def stop_workers(connections, inboxes, processes):
+    """ Stop the worker processes, also after an error of a worker.
+
+    Workers waiting for records are woken up by None in their inbox,
+    workers blocked otherwise are terminated after STOP_TIMEOUT seconds.
+    """
+    for connection in connections:
+        try:
+            connection.send(None)
+        except OSError: # the worker already stopped after an exception
+            pass
+        connection.close()
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+        inbox.put(None)
+    for process in processes:
+        process.join(STOP_TIMEOUT)
+        if process.is_alive():
+            process.terminate()
+            process.join()
@@ -0,0 +1,235 @@
+import numpy as np
+from pntools import petrinet_matrix
+
+POLICIES = ('random', 'priority', 'maximal')
+REJECTION_ROUNDS = 32 # rounds of rejection sampling before the full random choice
+
+class Simulator:
+    """ Token game of a Petri net for a batch of independent runs.
+
+    All runs start in the initial marking of the net. Every step fires in
+    all runs at once according to the policy:
+
+    'random': one enabled transition per run, chosen uniformly.
+    'priority': one enabled transition per run with the highest priority,
+      ties are broken uniformly.
+    'maximal': a maximal step per run. The enabled transitions are visited in
+      random order (or by priority, if priorities are given) and every
+      transition which is still enabled by the remaining tokens is added to
+      the step. All transitions of the step fire concurrently.
+
+    The enabledness of all transitions in all runs is kept as bool matrix.
+    After a step only the transitions consuming from places changed by the
+    fired transitions are checked again.
+
+    sim.net: ArrayNet of the simulated Petri net.
+    sim.markings: (runs x places) array with the current marking of every run.
+      Use reset() after changing it directly.
+    sim.firings: Count of all transition occurrences so far.
+    """
+
+    def __init__(self, net, runs=1, policy='random', priorities=None, seed=None):
+        """ Create a simulator for a PetriNet or ArrayNet.
+
+        priorities: Integer priority of every transition, as sequence in
+          transition index order or as map of (transition id, priority).
+        seed: Seed of the random number generator for reproducible runs.
+        """
+        if policy not in POLICIES:
+            raise ValueError("unknown policy " + repr(policy))
+
+        if not isinstance(net, petrinet_matrix.ArrayNet):
+            net = petrinet_matrix.from_petrinet(net)
+        self.net = net
+        self.policy = policy
+        self.firings = 0
+        self.__random = np.random.default_rng(seed)
+
+        count = len(net.transition_ids)
+        if priorities is None:
+            self.__priorities = None
+        elif isinstance(priorities, dict):
+            self.__priorities = np.zeros(count, dtype=np.float64)
+            for id, priority in priorities.items():
+                self.__priorities[net.transition_index[id]] = priority
+        else:
+            self.__priorities = np.asarray(priorities, dtype=np.float64).reshape(count)
+
+        self.__affected = affected_transitions(net)
+
+        self.reset(np.tile(net.marking, (runs, 1)))
+
+    def reset(self, markings):
+        """ Continue all runs from the given (runs x places) markings. """
+        self.markings = np.array(markings, dtype=np.int64).reshape(-1, len(self.net.place_ids))
+        self.__enabled = self.enabled()
+
+    def enabled(self):
+        """ Return a (runs x transitions) bool array of the enabled transitions. """
+        return self.net.enabled(self.markings)
+
+    def step(self):
+        """ Execute one step in every run.
+
+        return: For 'random' and 'priority' a vector with the fired transition
+          index of every run, -1 for runs without enabled transitions. For
+          'maximal' a (runs x transitions) bool array of the fired steps.
+        """
+        if self.policy == 'maximal':
+            return self.__fire_maximal_step()
+
+        if self.policy == 'priority' and self.__priorities is not None:
+            fired = self.__choose_by_priority()
+        else:
+            fired = self.__choose_uniformly()
+
+        runs = np.flatnonzero(fired >= 0)
+        transitions = fired[runs]
+        add_rows(self.markings, self.net.effect, runs, transitions)
+        self.__update_enabled(runs, transitions)
+        self.firings += len(runs)
+        return fired
+
+    def run(self, steps):
+        """ Execute the given count of steps or stop early if all runs are dead.
+
+        return: Count of transition occurrences in these steps.
+        """
+        before = self.firings
+        for i in range(0, steps):
+            fired = self.step()
+            if fired.ndim == 1 and (fired < 0).all() or fired.ndim == 2 and not fired.any():
+                break
+        return self.firings - before
+
+    def dead(self):
+        """ Return a bool vector of the runs without enabled transitions. """
+        return ~self.__enabled.any(axis=1)
+
+    def petrinet(self, run=0):
+        """ Return a PetriNet with the current marking of the given run. """
+        return petrinet_matrix.to_petrinet(self.net, self.markings[run])
+
+    def __choose_uniformly(self):
+        """ Choose one enabled transition per run, -1 for dead runs.
+
+        Rounds of rejection sampling handle most runs without building
+        random keys for the whole enabledness matrix.
+        """
+        enabled = self.__enabled
+        runs, count = enabled.shape
+        fired = np.full(runs, -1, dtype=np.int64)
+        if count == 0:
+            return fired
+
+        pending = np.flatnonzero(enabled.any(axis=1))
+        for i in range(0, REJECTION_ROUNDS):
+            if len(pending) == 0:
+                return fired
+            guess = self.__random.integers(0, count, len(pending))
+            hit = enabled[pending, guess]
+            fired[pending[hit]] = guess[hit]
+            pending = pending[~hit]
+
+        keys = self.__random.random((len(pending), count))
+        keys[~enabled[pending]] = -1.0
+        fired[pending] = keys.argmax(axis=1)
+        return fired
+
+    def __choose_by_priority(self):
+        """ Choose the enabled transition with the highest priority per run. """
+        enabled = self.__enabled
+        # random part < 1 only breaks ties between equal integer priorities
+        keys = self.__random.random(enabled.shape) + self.__priorities
+        keys[~enabled] = -np.inf
+        fired = keys.argmax(axis=1)
+        fired[~enabled.any(axis=1)] = -1
+        return fired
+
+    def __fire_maximal_step(self):
+        """ Fire a greedy maximal step in every run. """
+        net = self.net
+        enabled = self.__enabled
+        candidates = np.flatnonzero(enabled.any(axis=0))
+        if self.__priorities is not None:
+            keys = self.__priorities[candidates] + self.__random.random(len(candidates))
+            candidates = candidates[np.argsort(-keys, kind='stable')]
+        else:
+            candidates = self.__random.permutation(candidates)
+
+        remaining = self.markings
+        fired = np.zeros(enabled.shape, dtype=bool)
+        for t in candidates:
+            places, weights = net.pre.row(t)
+            ok = enabled[:, t].copy()
+            if len(places):
+                ok &= (remaining[:, places] >= weights).all(axis=1)
+                remaining[np.ix_(ok, places)] -= weights
+            fired[:, t] = ok
+
+        runs, transitions = np.nonzero(fired)
+        add_rows(self.markings, net.post, runs, transitions)
+        self.__update_enabled(runs, transitions)
+        self.firings += len(runs)
+        return fired
+
+    def __update_enabled(self, runs, transitions):
+        """ Check the transitions affected by the fired (run, transition) pairs again. """
+        affected = self.__affected
+        runs, checked = expand_rows(affected, runs, transitions)
+        if len(checked) == 0:
+            return
+
+        pre = self.net.pre
+        starts = pre.indptr[checked]
+        lengths = pre.indptr[checked + 1] - starts
+        entry_runs, entries = expand_entries(runs, starts, lengths)
+        ok = self.markings[entry_runs, pre.indices[entries]] >= pre.data[entries]
+        # affected transitions consume from a place, so no segment is empty
+        offsets = np.cumsum(lengths) - lengths
+        self.__enabled[runs, checked] = np.logical_and.reduceat(ok, offsets)
+
+def affected_transitions(net):
+    """ Map every transition to the transitions whose enabledness it may change.
+
+    return: (indptr, indices) in compressed row format. The row of t contains
+      all transitions consuming from a place whose marking t changes.
+    """
+    pre = net.pre
+    consumers = [[] for p in net.place_ids]
+    for t, p in zip(pre.rows.tolist(), pre.indices.tolist()):
+        consumers[p].append(t)
+
+    effect = net.effect
+    indptr = [0]
+    indices = []
+    for t in range(0, len(net.transition_ids)):
+        places, weights = effect.row(t)
+        row = set()
+        for p in places.tolist():
+            row.update(consumers[p])
+        indices.extend(sorted(row))
+        indptr.append(len(indices))
+
+    return np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64)
+
+def expand_entries(runs, starts, lengths):
+    """ Return (run, entry) for all entries of the segments starts[i]:starts[i] + lengths[i]. """
+    total = int(lengths.sum())
+    ends = np.cumsum(lengths)
+    entries = np.repeat(starts - (ends - lengths), lengths) + np.arange(total)
+    return np.repeat(runs, lengths), entries
+
+def expand_rows(rows, runs, transitions):
+    """ Return (run, column) for all entries of the given rows (indptr, indices). """
+    indptr, indices = rows
+    starts = indptr[transitions]
+    entry_runs, entries = expand_entries(runs, starts, indptr[transitions + 1] - starts)
+    return entry_runs, indices[entries]
+
+def add_rows(markings, matrix, runs, transitions):
+    """ Add the rows of the IncidenceMatrix for all (run, transition) pairs to the markings. """
+    starts = matrix.indptr[transitions]
+    rows, entries = expand_entries(runs, starts, matrix.indptr[transitions + 1] - starts)
+    # (run, place) pairs repeat in maximal steps, so accumulate with add.at
+    np.add.at(markings, (rows, matrix.indices[entries]), matrix.data[entries])
@@ -0,0 +1,236 @@
+from collections import deque
+import numpy as np
+from pntools import petrinet_matrix
+from pntools.partialorder import bits
+from pntools.algorithm.pn_reachability import ReachabilityGraph
+
+class DependencyIndex:
+    """ This class holds the transition dependencies of a Petri net as bitsets.
+
+    The sets are derived once from the incidence matrices, bit t of a set
+    stands for transition index t.
+
+    index.conflicts[t]: Transitions which may disable t or may be disabled
+      by t, i.e. both consume from a place and one of them decreases it.
+    index.increasing[p]: Transitions which increase the marking of place p.
+    index.decreasing[p]: Transitions which decrease the marking of place p.
+    index.pre[t]: List of (place index, weight) consumed by transition t.
+    """
+
+    def __init__(self, net):
+        places = len(net.place_ids)
+        transitions = len(net.transition_ids)
+        self.increasing = [0] * places
+        self.decreasing = [0] * places
+        self.pre = [[] for t in range(0, transitions)]
+        self.conflicts = [0] * transitions
+
+        consumers = [0] * places
+        for t, p, weight in zip(net.pre.rows.tolist(), net.pre.indices.tolist(), net.pre.data.tolist()):
+            self.pre[t].append((p, weight))
+            consumers[p] |= 1 << t
+        for t, p, weight in zip(net.effect.rows.tolist(), net.effect.indices.tolist(), net.effect.data.tolist()):
+            if weight > 0:
+                self.increasing[p] |= 1 << t
+            else:
+                self.decreasing[p] |= 1 << t
+
+        for t in range(0, transitions):
+            conflicts = 0
+            for p, weight in self.pre[t]:
+                if self.decreasing[p] >> t & 1:
+                    conflicts |= consumers[p] # t may disable every consumer of p
+                else:
+                    conflicts |= self.decreasing[p] # only decreasing consumers may disable t
+            self.conflicts[t] = conflicts & ~(1 << t)
+
+class ReducedGraph(ReachabilityGraph):
+    """ This class represents a reduced reachability graph of a Petri net.
+
+    In addition to the attributes of ReachabilityGraph:
+
+    graph.target: State id of the target marking, None if it is not reachable
+      or no target was given.
+    graph.enabled_count: Sum of the enabled transitions over all expanded states.
+    graph.fired_count: Sum of the fired transitions over all expanded states.
+    graph.full_expansions: Count of states expanded with all enabled
+      transitions because the reduced set was not smaller or the proviso
+      required it.
+    """
+
+    def __init__(self, net, dtype):
+        super().__init__(net, dtype)
+        self.target = None
+        self.enabled_count = 0
+        self.fired_count = 0
+        self.full_expansions = 0
+
+    def reduction_ratio(self):
+        """ Return the ratio of fired to enabled transitions, 1.0 is no reduction. """
+        if self.enabled_count == 0:
+            return 1.0
+        return self.fired_count / self.enabled_count
+
+    def statistics(self):
+        """ Return a map with the statistics of the reduced exploration. """
+        return {'states': len(self.markings),
+                'edges': len(self.sources),
+                'enabled': self.enabled_count,
+                'fired': self.fired_count,
+                'full_expansions': self.full_expansions,
+                'reduction_ratio': self.reduction_ratio(),
+                'complete': self.complete}
+
+def explore(net, target=None, max_states=None, dtype=np.int32):
+    """ Build a reachability graph reduced with stubborn sets.
+
+    All deadlocks of the full reachability graph are states of the reduced
+    graph. If a target marking is given, it is reached in the reduced graph
+    if and only if it is reachable in the net.
+
+    The graph is explored breadth first. Every state is expanded with the
+    enabled transitions of a stubborn set. Deadlocks need no further
+    condition. For a target marking transitions must not be ignored on
+    cycles: a state is expanded fully if a reduced successor was reached on
+    the same or a lower breadth first level. Every cycle contains such an
+    edge, so every cycle contains a fully expanded state.
+
+    target: Target marking as map of (place id, tokens) or vector in place
+      index order.
+    max_states: Stop after this count of states.
+    dtype: NumPy integer type of the packed markings.
+    return: ReducedGraph
+    """
+    if not isinstance(net, petrinet_matrix.ArrayNet):
+        net = petrinet_matrix.from_petrinet(net)
+
+    if isinstance(target, dict):
+        vector = np.zeros(len(net.place_ids), dtype=np.int64)
+        for id, tokens in target.items():
+            vector[net.place_index[id]] = tokens
+        target = vector
+    elif target is not None:
+        target = np.asarray(target, dtype=np.int64).reshape(len(net.place_ids))
+
+    index = DependencyIndex(net)
+    effect = net.effect.to_dense()
+    graph = ReducedGraph(net, dtype)
+    limit = np.iinfo(graph.dtype).max
+
+    initial = net.marking.astype(graph.dtype)
+    graph.initial = 0
+    graph.markings[0] = initial.tobytes()
+    visited = {initial.tobytes(): 0}
+    levels = [0] # breadth first level of every state
+    queue = deque([0])
+
+    while queue:
+        state = queue.popleft()
+        marking = graph.marking(state).astype(np.int64)
+        if target is not None and graph.target is None and np.array_equal(marking, target):
+            graph.target = state
+
+        enabled = np.flatnonzero(net.enabled(marking))
+        if len(enabled) == 0:
+            continue
+        fired = stubborn_set(index, marking, enabled, target)
+        successors = marking + effect[fired]
+
+        if target is not None and len(fired) < len(enabled):
+            # proviso: a reduced successor closing a cycle requires a full expansion
+            level = levels[state]
+            for i in range(0, len(fired)):
+                successor = visited.get(successors[i].astype(graph.dtype).tobytes())
+                if successor is not None and levels[successor] <= level:
+                    fired = enabled
+                    successors = marking + effect[fired]
+                    break
+        if len(fired) == len(enabled):
+            graph.full_expansions += 1
+        graph.enabled_count += len(enabled)
+        graph.fired_count += len(fired)
+
+        if successors.size and successors.max() > limit:
+            raise OverflowError("token count exceeds " + str(graph.dtype) + ", use a larger dtype")
+        successors = successors.astype(graph.dtype)
+
+        for i, transition in enumerate(fired.tolist()):
+            packed = successors[i].tobytes()
+            successor = visited.get(packed)
+            if successor is None:
+                if max_states is not None and len(visited) >= max_states:
+                    graph.complete = False
+                    continue
+                successor = len(visited)
+                visited[packed] = successor
+                levels.append(levels[state] + 1)
+                graph.markings[successor] = packed
+                queue.append(successor)
+            graph.sources.append(state)
+            graph.transitions.append(transition)
+            graph.targets.append(successor)
+
+    return graph
+
+def stubborn_set(index, marking, enabled, target=None):
+    """ Return the enabled transitions of a small stubborn set in the marking.
+
+    Every enabled transition is tried as seed and the set with the fewest
+    enabled transitions is chosen. With a target marking the seed also
+    contains all transitions which move a place towards its target count.
+
+    index: DependencyIndex of the net.
+    enabled: Vector of the enabled transition indices, not empty.
+    return: Vector of transition indices.
+    """
+    enabled_bits = 0
+    for t in enabled.tolist():
+        enabled_bits |= 1 << t
+
+    seed = 0
+    if target is not None:
+        differing = np.flatnonzero(marking != target)
+        if len(differing):
+            place = int(differing[0])
+            if marking[place] < target[place]:
+                seed = index.increasing[place]
+            else:
+                seed = index.decreasing[place]
+
+    best = None
+    for t in enabled.tolist():
+        if seed >> t & 1 and best is not None:
+            continue # the closure of the target seed already contains t
+        closure = stubborn_closure(index, marking, enabled_bits, seed | (1 << t))
+        count = bin(closure & enabled_bits).count("1")
+        if best is None or count < best[0]:
+            best = (count, closure)
+            if count == 1:
+                break
+
+    return np.array(list(bits(best[1] & enabled_bits)), dtype=np.int64)
+
+def stubborn_closure(index, marking, enabled_bits, seed):
+    """ Close the seed set of transitions under the stubborn set rules.
+
+    An enabled transition adds its conflicting transitions. A disabled
+    transition adds all transitions which increase its first insufficiently
+    marked place.
+
+    return: Bitset of the stubborn set.
+    """
+    closure = seed
+    pending = seed
+    while pending:
+        added = 0
+        for t in bits(pending):
+            if enabled_bits >> t & 1:
+                added |= index.conflicts[t]
+            else:
+                for p, weight in index.pre[t]:
+                    if marking[p] < weight:
+                        added |= index.increasing[p]
+                        break
+        pending = added & ~closure
+        closure |= pending
+    return closure
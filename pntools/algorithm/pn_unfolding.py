@@ -0,0 +1,255 @@
+import heapq
+import numpy as np
+from pntools import petrinet_matrix
+from pntools.partialorder import LPO, Event, Arc, bits
+
+LAYOUT_ORIGIN = 50 # position of the first event of an exported LPO
+LAYOUT_DISTANCE = (70, 60) # distance of the events by depth and within a depth
+
+class Prefix:
+    """ This class represents a finite prefix of the unfolding of a safe Petri net.
+
+    Conditions and events are numbered in the order they are added. All
+    relations are stored as lists indexed by these numbers, sets of events
+    or conditions as int bitsets.
+
+    prefix.net: ArrayNet of the unfolded Petri net.
+    prefix.condition_places: Place index of every condition.
+    prefix.condition_producers: Event of every condition, -1 for the initial cut.
+    prefix.event_transitions: Transition index of every event.
+    prefix.event_presets, prefix.event_postsets: Tuples of the conditions
+      consumed and produced by every event.
+    prefix.event_depths: Length of the longest causal chain ending with every event.
+    prefix.configurations: Bitset of the local configuration [e] of every event.
+    prefix.cutoffs: Bitset of the cut-off events.
+    prefix.complete: False if the construction was stopped by max_events.
+    """
+
+    def __init__(self, net):
+        self.net = net
+        self.condition_places = []
+        self.condition_producers = []
+        self.event_transitions = []
+        self.event_presets = []
+        self.event_postsets = []
+        self.event_depths = []
+        self.configurations = []
+        self.cutoffs = 0
+        self.complete = True
+
+    def add_condition(self, place, producer):
+        condition = len(self.condition_places)
+        self.condition_places.append(place)
+        self.condition_producers.append(producer)
+        return condition
+
+    def is_cutoff(self, event):
+        return bool(self.cutoffs >> event & 1)
+
+    def configuration(self, event):
+        """ Return the events of the local configuration of the event in causal order. """
+        return list(bits(self.configurations[event]))
+
+    def to_lpo(self, events, name=None):
+        """ Create an LPO of the given events, which should form a configuration.
+
+        Events are labelled with the transition labels. The direct causal
+        dependencies become user drawn arcs, the events are placed by depth.
+        """
+        lpo = LPO()
+        lpo.name = name if name is not None else str(self.net.name)
+        net = self.net
+        events = sorted(events)
+        selected = set(events)
+
+        nodes = {}
+        ranks = {}
+        for e in events:
+            depth = self.event_depths[e]
+            rank = ranks.get(depth, 0)
+            ranks[depth] = rank + 1
+
+            node = Event()
+            transition = self.event_transitions[e]
+            label = net.transition_labels[transition]
+            node.label = label if label is not None else net.transition_ids[transition]
+            node.position = (LAYOUT_ORIGIN + (depth - 1) * LAYOUT_DISTANCE[0],
+                             LAYOUT_ORIGIN + rank * LAYOUT_DISTANCE[1])
+            nodes[e] = node
+            lpo.add_event(node)
+
+        for e in events:
+            sources = set(self.condition_producers[c] for c in self.event_presets[e])
+            for source in sorted(sources):
+                if source in selected:
+                    arc = Arc()
+                    arc.source = nodes[source].id
+                    arc.target = nodes[e].id
+                    arc.user_drawn = True
+                    lpo.add_arc(arc)
+
+        return lpo
+
+    def iter_lpos(self):
+        """ Iterate the LPOs of the local configurations of all events. """
+        for e in range(0, len(self.event_transitions)):
+            yield self.to_lpo(bits(self.configurations[e]), str(self.net.name) + " [e" + str(e) + "]")
+
+    def __len__(self):
+        return len(self.event_transitions)
+
+def unfold(net, max_events=None):
+    """ Build a complete finite prefix of the unfolding of a safe Petri net.
+
+    This is the algorithm of Esparza, Roemer and Vogler with their total
+    adequate order: local configurations are compared by size, then by the
+    sorted transition sequence (Parikh vector) and then by the Foata normal
+    form. Possible extensions are kept in a heap ordered by this key, an
+    event is a cut-off if an event added before has the same marking. The
+    postset of a cut-off event is not extended.
+
+    Possible extensions are searched when a condition is added: for every
+    transition consuming from its place, the remaining preset conditions
+    are picked from the conditions of the other places which are
+    concurrent to all conditions picked so far. The co-relation and the
+    conditions of every place are bitsets, so every step of this search is
+    an intersection of ints.
+
+    max_events: Stop after this count of events, prefix.complete is False then.
+    return: Prefix
+    Raises ValueError if the net is not safe.
+    """
+    if not isinstance(net, petrinet_matrix.ArrayNet):
+        net = petrinet_matrix.from_petrinet(net)
+
+    if (net.pre.data > 1).any() or (net.post.data > 1).any() or (net.marking > 1).any():
+        raise ValueError("net is not safe, arc weights and initial marking must be 0 or 1")
+
+    places = len(net.place_ids)
+    presets = [net.pre.row(t)[0].tolist() for t in range(0, len(net.transition_ids))]
+    postsets = [net.post.row(t)[0].tolist() for t in range(0, len(net.transition_ids))]
+    consumers = [[] for p in range(0, places)]
+    for t, preset in enumerate(presets):
+        for p in preset:
+            consumers[p].append(t)
+    effect = net.effect.to_dense()
+
+    prefix = Prefix(net)
+    place_conditions = [0] * places # bitset of the extendable conditions of every place
+    co = [] # co[c]: bitset of the conditions concurrent to c
+    seen = {net.marking.astype(np.int64).tobytes()} # markings of the added non cut-off configurations
+    queue = [] # heap of (key, counter, transition, preset conditions)
+    counter = 0
+
+    def extensions(condition):
+        """ Push all possible extensions which consume the given condition. """
+        nonlocal counter
+        place = prefix.condition_places[condition]
+        for t in consumers[place]:
+            others = [p for p in presets[t] if p != place]
+            for preset in pick_conditions(others, co[condition], place_conditions, co):
+                preset = tuple(sorted(preset + [condition]))
+                heapq.heappush(queue, (order_key(prefix, t, preset), counter, t, preset))
+                counter += 1
+
+    def add_conditions(concurrent, producer, indexed):
+        """ Add the postset conditions of the event (or the initial cut) and update co.
+
+        concurrent: Bitset of the existing conditions concurrent to the new ones.
+        indexed: Index the new conditions and search their extensions.
+        """
+        new = []
+        for p in (postsets[prefix.event_transitions[producer]] if producer >= 0 else
+                  np.flatnonzero(net.marking).tolist()):
+            new.append(prefix.add_condition(p, producer))
+            co.append(0)
+        siblings = 0
+        for c in new:
+            siblings |= 1 << c
+        for c in new:
+            co[c] = (concurrent | siblings) & ~(1 << c)
+        for c in bits(concurrent):
+            co[c] |= siblings
+        if indexed:
+            for c in new:
+                place_conditions[prefix.condition_places[c]] |= 1 << c
+                extensions(c)
+        return new
+
+    add_conditions(0, -1, True)
+
+    while queue:
+        if max_events is not None and len(prefix.event_transitions) >= max_events:
+            prefix.complete = False
+            break
+
+        key, count, t, preset = heapq.heappop(queue)
+        event = len(prefix.event_transitions)
+        producers = set(prefix.condition_producers[c] for c in preset if prefix.condition_producers[c] >= 0)
+        configuration = 1 << event
+        for e in producers:
+            configuration |= prefix.configurations[e]
+
+        parikh = np.bincount([prefix.event_transitions[e] for e in bits(configuration & ~(1 << event))] + [t],
+                             minlength=len(net.transition_ids))
+        marking = net.marking.astype(np.int64) + parikh @ effect
+        if (marking > 1).any():
+            raise ValueError("net is not safe, a reachable marking has more than one token in a place")
+        packed = marking.tobytes()
+
+        prefix.event_transitions.append(t)
+        prefix.event_presets.append(preset)
+        prefix.event_depths.append(1 + max([prefix.event_depths[e] for e in producers], default=0))
+        prefix.configurations.append(configuration)
+
+        cutoff = packed in seen
+        if cutoff:
+            prefix.cutoffs |= 1 << event
+        else:
+            seen.add(packed)
+
+        # conditions concurrent to the postset are those concurrent to the whole preset
+        concurrent = -1
+        for c in preset:
+            concurrent &= co[c]
+        prefix.event_postsets.append(tuple(add_conditions(concurrent if not cutoff else 0, event, not cutoff)))
+
+    return prefix
+
+def pick_conditions(places, candidates, place_conditions, co):
+    """ Iterate all lists of pairwise concurrent conditions for the given places.
+
+    candidates: Bitset of the conditions concurrent to all conditions picked so far.
+    place_conditions: Bitset of the extendable conditions of every place.
+    co: Bitset of the concurrent conditions of every condition.
+    """
+    if not places:
+        yield []
+        return
+    place = places[0]
+    for c in bits(place_conditions[place] & candidates):
+        for rest in pick_conditions(places[1:], candidates & co[c], place_conditions, co):
+            yield [c] + rest
+
+def order_key(prefix, transition, preset):
+    """ Return the adequate order key (size, Parikh vector, Foata normal form) of a new event. """
+    configuration = 0
+    for c in preset:
+        producer = prefix.condition_producers[c]
+        if producer >= 0:
+            configuration |= prefix.configurations[producer]
+
+    events = list(bits(configuration))
+    depths = prefix.event_depths
+    transitions = prefix.event_transitions
+    depth = 1 + max([depths[prefix.condition_producers[c]] for c in preset
+                     if prefix.condition_producers[c] >= 0], default=0)
+
+    levels = [[] for i in range(0, depth)]
+    for e in events:
+        levels[depths[e] - 1].append(transitions[e])
+    levels[depth - 1].append(transition)
+
+    parikh = tuple(sorted([transitions[e] for e in events] + [transition]))
+    foata = tuple(tuple(sorted(level)) for level in levels)
+    return (len(events) + 1, parikh, foata)
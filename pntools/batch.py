@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This module implements the helpers of the batch programs.
+
+The batch programs (lpo_checker, renderer_batch, tile_renderer) split
+their input into chunks, run the chunks as tasks of a pool of worker
+processes and write a result line (JSON) for every result as soon as
+its task is done:
+
+    with ProcessPoolExecutor() as pool:
+        tasks = batch.chunks(batch.input_files(paths, ('.lpo',)), 4)
+        batch.run_tasks(pool, check_files, tasks, limit=16, counts=counts, count=count_result)
+"""
+
+import json # result lines
+import os # directory listing
+import sys # stdin, stdout
+from concurrent.futures import wait, FIRST_COMPLETED # bounded submission
+
+def chunks(items, size):
+    """ Group the items of an iterable (may be a stream) into lists of the given size. """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def input_files(paths, extensions):
+    """ Iterate (path, name) of the files with the given extensions of the paths.
+
+    With the path - the paths of the files are read from stdin, one per
+    line. Directories are listed recursively, the name of a file found in
+    a directory is its path relative to this directory. The name of a file
+    given directly or on stdin is its path, see path_name. Files given
+    directly are not filtered by extension.
+    """
+    for path in paths:
+        if path == '-':
+            for line in sys.stdin:
+                if line.strip():
+                    yield line.strip(), path_name(line.strip())
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(tuple(extensions)):
+                        file = os.path.join(root, name)
+                        yield file, os.path.relpath(file, path)
+        else:
+            yield path, path_name(path)
+
+def path_name(path):
+    """ Return the name of a file: its path relative to the current directory.
+
+    A file outside of the current directory is named by its absolute path
+    without root, so different files never get the same name.
+    """
+    path = os.path.abspath(path)
+    try:
+        name = os.path.relpath(path)
+    except ValueError: # other drive
+        name = os.pardir
+    if name == os.pardir or name.startswith(os.pardir + os.sep):
+        name = os.path.splitdrive(path)[1].lstrip(os.sep + (os.altsep or ''))
+    return name
+
+def run_tasks(pool, function, tasks, args=(), limit=16, output=sys.stdout, counts=None, count=None):
+    """ Run function(task, *args) for every task in the pool and write the results.
+
+    Every task returns a list of result maps. At most limit tasks are in
+    flight, so tasks may be a stream of unknown length.
+    counts, count: count(result, counts) is called for every result.
+    """
+    pending = set()
+    for task in tasks:
+        pending.add(pool.submit(function, task, *args))
+        if len(pending) >= limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            write_results(done, output, counts, count)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        write_results(done, output, counts, count)
+
+def write_results(futures, output, counts=None, count=None):
+    """ Write the results of the finished tasks as JSON lines and update the counts. """
+    for future in futures:
+        for result in future.result():
+            if count is not None:
+                count(result, counts)
+            output.write(json.dumps(result) + '\n')
+    output.flush()
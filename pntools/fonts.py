@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This module caches the fonts and label metrics of the renderers.
+
+Loading a TrueType font parses the whole font file, so every font is
+loaded once per path and size and shared by all drawing calls. Labels
+repeat a lot in nets and LPOs (transition names, event labels, token
+counts), their sizes are kept in a least recently used cache.
+
+The default font is the Sawasdee font shipped in pntools/font, so the
+renderers work independently of the current directory.
+"""
+
+import os # font path
+from functools import lru_cache # caches
+from PIL import ImageFont # Python image library (Pillow)
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'font', 'Sawasdee.ttf')
+TEXT_CACHE_SIZE = 65536 # count of cached label sizes
+
+@lru_cache(maxsize=None)
+def load_font(size, path=FONT_PATH):
+    """ Return the TrueType font of the given path and size, loaded only once. """
+    return ImageFont.truetype(path, size)
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def text_size(text, size, path=FONT_PATH):
+    """ Return the size (width, height) of the text drawn with the font.
+
+    Same as font.getsize of older Pillow versions: the size of the text
+    box starting at the drawing position.
+    """
+    font = load_font(size, path)
+    if hasattr(font, 'getbbox'):
+        left, top, right, bottom = font.getbbox(text)
+        return right, bottom
+    return font.getsize(text)
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This module calculates the geometry of the arcs of Petri nets and LPOs.
+
+An arc is drawn from the border of its source node to the border of its
+target node and ends with an arrow head. Transitions and events are
+squares, places are circles. The geometry of all arcs of a net or LPO
+is calculated at once with NumPy array operations, the renderers and
+viewers only draw the resulting points.
+
+    arrows = geometry.node_arrows(pairs, halfside=16, tipsize=10, circle=is_place)
+    for start, end in zip(arrows.starts.tolist(), arrows.ends.tolist()):
+        ...
+"""
+
+import math
+import numpy as np
+
+ARROW_ANGLE = math.radians(30) # angle between arc and arrow head side
+
+class Arrows:
+    """ This class holds the geometry of a batch of arrows between nodes.
+
+    All nodes have the same size, halfside is half of the side length of
+    a square and the radius of a circle. Arrows between nodes at the same
+    position have no length, all their points are the node position.
+
+    arrows.starts: Array (n, 2), start points on the border of the source nodes.
+    arrows.ends: Array (n, 2), end points on the border of the target nodes,
+      the tips of the arrow heads.
+    arrows.line_ends: Array (n, 2), middle of the back of the arrow heads.
+      A line drawn to this point does not stick out of a thin arrow head.
+    arrows.heads: Array (n, 3, 2), arrow head polygons: tip and back corners.
+    """
+
+    def __init__(self, sources, targets, source_circles, target_circles, halfside, tipsize, angle=ARROW_ANGLE):
+        """ Calculate the arrows from the source to the target points.
+
+        sources, targets: Sequences of (x, y) centers of the nodes.
+        source_circles, target_circles: Sequences of bools, True for circle nodes.
+        """
+        sources = np.asarray(sources, dtype=float).reshape(-1, 2)
+        targets = np.asarray(targets, dtype=float).reshape(-1, 2)
+        vector = targets - sources
+        length = np.hypot(vector[:, 0], vector[:, 1])
+        longest = np.abs(vector).max(axis=1) # square border: scale the larger component to halfside
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            circle_factor = np.where(length > 0, halfside / length, 0.0)
+            square_factor = np.where(longest > 0, halfside / longest, 0.0)
+            unit = np.where(length[:, None] > 0, vector / length[:, None], 0.0)
+        start_factor = np.where(np.asarray(source_circles, dtype=bool), circle_factor, square_factor)
+        end_factor = np.where(np.asarray(target_circles, dtype=bool), circle_factor, square_factor)
+
+        self.starts = sources + vector * start_factor[:, None]
+        self.ends = targets - vector * end_factor[:, None]
+
+        back = -unit * tipsize # from the tip back along the arc
+        self.line_ends = self.ends + back / 2
+        cos, sin = math.cos(angle), math.sin(angle)
+        left = np.stack([back[:, 0] * cos - back[:, 1] * sin, back[:, 0] * sin + back[:, 1] * cos], axis=1)
+        right = np.stack([back[:, 0] * cos + back[:, 1] * sin, -back[:, 0] * sin + back[:, 1] * cos], axis=1)
+        self.heads = np.stack([self.ends, self.ends + left, self.ends + right], axis=1)
+
+    def __len__(self):
+        return len(self.starts)
+
+def node_arrows(pairs, halfside, tipsize, circle=None, angle=ARROW_ANGLE):
+    """ Calculate the arrows between the nodes of the (source node, target node) pairs.
+
+    The nodes need a position (x, y). circle is a function which returns
+    True for nodes drawn as circle, without it all nodes are squares.
+    return: Arrows in the order of the pairs.
+    """
+    sources = []
+    targets = []
+    source_circles = []
+    target_circles = []
+    for source, target in pairs:
+        sources.append(source.position)
+        targets.append(target.position)
+        if circle is not None:
+            source_circles.append(circle(source))
+            target_circles.append(circle(target))
+    if circle is None:
+        source_circles = target_circles = np.zeros(len(sources), dtype=bool)
+
+    return Arrows(sources, targets, source_circles, target_circles, halfside, tipsize, angle)
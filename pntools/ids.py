@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This module implements the id generation for Petri net and LPO objects.
+
+Objects get their id lazily: an id is generated by the current allocator
+on the first read of obj.id. Parsers which set the id of an object never
+pay for a generated id.
+
+The allocator is pluggable. Every callable which maps a prefix to a new
+unique id string can be installed with set_allocator. For reproducible
+ids, e.g. in benchmarks, install an allocator with a fixed session stamp:
+
+    ids.set_allocator(ids.IdAllocator(session="0"))
+
+A forked child process gets a new session stamp for the default
+allocator, so worker processes never generate the ids of their parent
+or of each other.
+"""
+
+import itertools # counter
+import os # process id, fork hook
+import time # session stamp
+
+class IdAllocator:
+    """ This class generates unique ids from a monotonic counter.
+
+    An id consists of a prefix, a session stamp and the counter value,
+    e.g. "Arc1697530000000000000-4711.42". The session stamp keeps the ids
+    of different program runs and processes apart. It defaults to the
+    current time in nanoseconds and the process id; with a fixed stamp
+    the generated ids are deterministic.
+
+    allocator.session: Session stamp of the generated ids.
+    allocator.automatic: True if the session stamp was generated.
+    """
+
+    def __init__(self, session=None):
+        self.automatic = session is None
+        if session is None:
+            session = new_session()
+        self.session = session
+        self.__counter = itertools.count(1)
+
+    def renew(self):
+        """ Start a new session with a generated stamp and a new counter. """
+        self.automatic = True
+        self.session = new_session()
+        self.__counter = itertools.count(1)
+
+    def __call__(self, prefix):
+        return prefix + self.session + "." + str(next(self.__counter))
+
+def new_session():
+    """ Return a session stamp of the current time and process id. """
+    return str(time.time_ns()) + "-" + str(os.getpid())
+
+allocator = IdAllocator() # allocator used for all generated ids
+
+def renew_after_fork():
+    """ Give the default allocator of a forked child process a new session. """
+    if isinstance(allocator, IdAllocator) and allocator.automatic:
+        allocator.renew()
+
+if hasattr(os, 'register_at_fork'): # not available on Windows, which does not fork
+    os.register_at_fork(after_in_child=renew_after_fork)
+
+def set_allocator(new_allocator):
+    """ Install a new allocator and return the previous one. """
+    global allocator
+    previous = allocator
+    allocator = new_allocator
+    return previous
+
+def new_id(prefix):
+    """ Generate a new id with the current allocator. """
+    return allocator(prefix)
+
+class LazyId:
+    """ Mixin for classes with a lazily generated id.
+
+    obj.id: Unique ID of this object, generated on first access.
+    id_prefix: Prefix of generated ids, set by the subclass.
+    """
+
+    __slots__ = ('__id',)
+
+    id_prefix = "Node"
+
+    @property
+    def id(self):
+        try:
+            return self.__id
+        except AttributeError:
+            self.__id = allocator(self.id_prefix)
+            return self.__id
+
+    @id.setter
+    def id(self, value):
+        self.__id = value
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This program checks if the LPOs of many .lpo-files are runs of a Petri net.
+
+The LPO files are validated in parallel by a pool of worker processes.
+Every worker parses the Petri net once and keeps its RunChecker, the
+tasks only transfer file names and results. A result line (JSON) is
+written for every LPO as soon as its file is checked, so the output is
+in completion order:
+
+    {"file": ..., "lpo": ..., "executable": true, "violated": [], "seconds": ...}
+
+Files which can not be parsed or checked give a line with an "error".
+
+Usage: python lpo_checker.py [-w <workers>] <pnml-file> <lpo-file or directory>... | -
+  With - the paths of the LPO files are read from stdin, one per line.
+"""
+
+import argparse # command line
+import os # cpu count
+import sys # stdout
+import time # timing per file
+from concurrent.futures import ProcessPoolExecutor # worker pool
+from pntools import petrinet, partialorder # parsers
+from pntools import batch # file listing, bounded submission, result lines
+from pntools.algorithm import lpo_validation # run check
+
+checker = None # RunChecker of the worker process, see init_worker
+
+def init_worker(pnml_file, net_number):
+    """ Parse the Petri net and prepare the RunChecker of this worker process. """
+    global checker
+    nets = petrinet.parse_pnml_file(pnml_file)
+    checker = lpo_validation.RunChecker(nets[net_number])
+
+def check_files(files):
+    """ Check all LPOs of the given files with the checker of this worker.
+
+    return: List of result maps, one per LPO or one per failed file.
+    """
+    results = []
+    for file in files:
+        start = time.perf_counter()
+        found = []
+        try:
+            for lpo in partialorder.iter_lpo_file(file):
+                violated = checker.violated_places(lpo)
+                found.append({'file': file, 'lpo': lpo.name,
+                              'executable': not violated, 'violated': violated})
+        except Exception as error: # one broken file must not stop the batch
+            found = [{'file': file, 'error': type(error).__name__ + ": " + str(error)}]
+
+        seconds = time.perf_counter() - start
+        for result in found:
+            result['seconds'] = seconds
+        results.extend(found)
+
+    return results
+
+def check_all(pnml_file, paths, workers=None, chunk_size=4, net_number=0, output=sys.stdout):
+    """ Check all LPO files of the paths and write the results as JSON lines.
+
+    workers: Count of worker processes, default is the count of CPUs.
+    chunk_size: Count of files per task.
+    return: (count of LPOs, count of executable LPOs, count of errors)
+    """
+    workers = workers or os.cpu_count() or 1
+    counts = [0, 0, 0]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(pnml_file, net_number)) as pool:
+        files = (file for file, name in batch.input_files(paths, ('.lpo',)))
+        batch.run_tasks(pool, check_files, batch.chunks(files, chunk_size), limit=4 * workers,
+                        output=output, counts=counts, count=count_result)
+
+    return tuple(counts)
+
+def count_result(result, counts):
+    """ Count a result in the (LPOs, executable LPOs, errors) counts. """
+    if 'error' in result:
+        counts[2] += 1
+    else:
+        counts[0] += 1
+        counts[1] += result['executable']
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check if LPOs are runs of a Petri net.")
+    parser.add_argument('pnml', help="PNML file of the Petri net")
+    parser.add_argument('lpos', nargs='+', help="LPO files or directories, - reads paths from stdin")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="count of worker processes")
+    parser.add_argument('-c', '--chunk', type=int, default=4, help="count of files per task")
+    parser.add_argument('-n', '--net', type=int, default=0, help="number of the net in the PNML file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    lpos, executable, errors = check_all(args.pnml, args.lpos, args.workers, args.chunk, args.net)
+    print("%d LPOs, %d executable, %d errors in %.2f s" %
+          (lpos, executable, errors, time.perf_counter() - start), file=sys.stderr)
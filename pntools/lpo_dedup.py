@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This program collapses the LPOs of a file to the unique runs.
+
+Two LPOs are the same run if they are isomorphic: there is a mapping
+of the events which preserves the labels and the order. Event ids and
+layout do not matter. The LPOs are read one by one, so only the unique
+runs are kept in memory.
+
+For every unique run the count of its occurrences, the canonical hash
+and the name of its first LPO are printed, most frequent runs first.
+With an output file the unique runs are written to this file.
+
+Usage: python lpo_dedup.py <lpo-file> [<output-lpo-file>]
+"""
+
+import sys # argv
+from pntools import partialorder # LPO parser and writer
+from pntools.algorithm import lpo_isomorphism # canonical hash and isomorphism test
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        unique = lpo_isomorphism.deduplicate(partialorder.iter_lpo_file(sys.argv[1]))
+        unique.sort(key=lambda entry: -entry[1])
+
+        for lpo, count in unique:
+            print("%8d %s %s" % (count, lpo_isomorphism.lpo_hash(lpo), lpo.name))
+        print("%d LPOs, %d unique runs" % (sum(count for lpo, count in unique), len(unique)),
+              file=sys.stderr)
+
+        if len(sys.argv) > 2:
+            partialorder.write_lpos_file([lpo for lpo, count in unique], sys.argv[2])
@@ -10,9 +10,9 @@ event a to an event b this means event b occurs after event a.
 Usage: python lpo_viewer.py [<lpo-file>]
 """
 
-import math # calculation of intersection point (fabs, ...)
 import sys # sys.argv
 import partialorder # LPO parser and data structure
+import geometry # calculation of arc end points and tips
 import os # demo file
 from PyQt5.QtWidgets import QApplication, QWidget, QMainWindow, QAction, qApp, QFileDialog, QTabWidget
 from PyQt5.QtCore import Qt, QPoint
@@ -64,9 +64,7 @@ class LpoWidget(QWidget):
 
     def __drawLpo(self, qp):
         """ Draw LPO. """
-        for arc in self.__lpo.arcs:
-            if arc.user_drawn == True:
-                self.__drawArc(qp, arc)
+        self.__drawArcs(qp, [arc for arc in self.__lpo.arcs if arc.user_drawn == True])
 
         for id, event in self.__lpo.events.items():
             self.__drawEvent(qp, event)
@@ -104,82 +102,21 @@ class LpoWidget(QWidget):
 
         qp.setRenderHint(QPainter.HighQualityAntialiasing)
 
-    def __drawArc(self, qp, arc):
-        """ Draw the given arc. """
-        self.__setArcPen(qp)
-        
-        start_event = self.__lpo.events[arc.source]
-        end_event = self.__lpo.events[arc.target]
-
-        intersections = self.__calculateIntersections(start_event, end_event)
-
-        start = start_event.position[0] + intersections[0][0], start_event.position[1] + intersections[0][1]
-        end = end_event.position[0] + intersections[1][0], end_event.position[1] + intersections[1][1]
-        
-        qp.drawLine(start[0], start[1], end[0], end[1])
-
-        tip = self.__calculateTip(start_event, end_event)
-
-        self.__setTipPen(qp)
-       
-        qp.drawPolygon(QPoint(end[0], end[1]),
-                       QPoint(end[0] + tip[0][0], end[1] + tip[0][1]),
-                       QPoint(end[0] + tip[1][0], end[1] + tip[1][1]))
-
-
-    def __calculateTip(self, start, end):
-        vector = float(start.position[0] - end.position[0]), float(start.position[1] - end.position[1])
-        vector_length = math.sqrt(vector[0] ** 2 + vector[1] ** 2)
-        vector_sized = vector[0] * 10 / vector_length, vector[1] * 10 / vector_length
-
-        alpha = 30 * 2 * math.pi / 360
-
-        sin_alpha = math.sin(alpha)
-        cos_alpha = math.cos(alpha)
+    def __drawArcs(self, qp, arcs):
+        """ Draw the given arcs, their end points and tips are calculated at once. """
+        pairs = [(self.__lpo.events[arc.source], self.__lpo.events[arc.target]) for arc in arcs]
+        arrows = geometry.node_arrows(pairs, 10, 10)
 
-        tip1 = (vector_sized[0] * cos_alpha - vector_sized[1] * sin_alpha,
-                vector_sized[0] * sin_alpha + vector_sized[1] * cos_alpha)
+        for start, head in zip(arrows.starts.tolist(), arrows.heads.tolist()):
+            end = head[0]
+            self.__setArcPen(qp)
+            qp.drawLine(start[0], start[1], end[0], end[1])
 
-        sin_alpha = math.sin(-alpha)
-        cos_alpha = math.cos(-alpha)
+            self.__setTipPen(qp)
+            qp.drawPolygon(QPoint(end[0], end[1]),
+                           QPoint(head[1][0], head[1][1]),
+                           QPoint(head[2][0], head[2][1]))
 
-        tip2 = (vector_sized[0] * cos_alpha - vector_sized[1] * sin_alpha,
-                vector_sized[0] * sin_alpha + vector_sized[1] * cos_alpha)
-
-        return tip1, tip2
-
-    def __calculateIntersections(self, start, end):
-        """ Calculate intersection point of start and end events with the arc.
-
-        This method calculates two vectors which describe the intersection point of the arc from the
-        given start event to the given end event.
-        """
-
-        # vector from the center of the start event to the center of the end event
-        vector = float(end.position[0] - start.position[0]), float(end.position[1] - start.position[1])
-        #calculate a factor to scale the x-component to 10px (half of side length)
-        fact = 1
-        if vector[0] != 0:
-            fact = 10 / math.fabs(vector[0])
-        # scale the vector
-        start_vector = vector[0] * fact, vector[1] * fact
-
-        # if y-component of vector is larger than 10px or x-component is 0, scale with y-component
-        if math.fabs(start_vector[1]) > 10 or vector[0] == 0:
-            fact = 10 / math.fabs(vector[1])
-            start_vector = vector[0] * fact, vector[1] * fact
-        #calculate intersection for arc end
-        if vector[0] != 0:
-            fact = 10 / math.fabs(vector[0])
-
-        end_vector = -vector[0] * fact, -vector[1] * fact
-
-        if math.fabs(end_vector[1]) > 10 or vector[0] == 0:
-            fact = 10 / math.fabs(vector[1])
-            end_vector = -vector[0] * fact, -vector[1] * fact
-
-        return start_vector, end_vector
-        
 class LpoViewer(QMainWindow):
     """ This class implements the window of the Lpo viewer.
 
@@ -10,9 +10,9 @@ event a to an event b this means event b occurs after event a.
 Usage: python lpo_viewer_tk.py [<lpo-file>]
 """
 
-import math # calculation of intersection point (fabs, ...)
 import sys # sys.argv
 import partialorder # LPO parser and data structure
+import geometry # calculation of arc end points
 import os # demo file
 from tkinter import Tk, Frame, Menu, Canvas, BOTH, LAST, filedialog # UI
 from tkinter.ttk import Notebook # Tabs
@@ -58,10 +58,8 @@ class LpoView(Frame):
     def __drawLpo(self):
         """ This method draws the LPO. """
         # draw LPO arcs (arc layer is behind event layer)
-        for arc in self.__lpo.arcs:
-            # LPOs consists of all transitive arcs, the view shows only user defined arcs.
-            if arc.user_drawn == True: 
-                self.__drawArc(arc)
+        # LPOs consists of all transitive arcs, the view shows only user defined arcs.
+        self.__drawArcs([arc for arc in self.__lpo.arcs if arc.user_drawn == True])
 
         # draw events
         for id, event in self.__lpo.events.items():
@@ -73,52 +71,14 @@ class LpoView(Frame):
         self.__canvas.create_text(event.position[0], event.position[1] + 20, text=event.label)
 
 
-    def __drawArc(self, arc):
-        """ Draw the given arc. """
-        start_event = self.__lpo.events[arc.source] # get start event
-        end_event = self.__lpo.events[arc.target] # get end event
+    def __drawArcs(self, arcs):
+        """ Draw the given arcs, their end points are calculated at once. """
+        pairs = [(self.__lpo.events[arc.source], self.__lpo.events[arc.target]) for arc in arcs]
+        arrows = geometry.node_arrows(pairs, 10, 10)
 
-        intersections = self.__calculateIntersections(start_event, end_event) # calculate intersection points
-
-        # start point of arc
-        start = start_event.position[0] + intersections[0][0], start_event.position[1] + intersections[0][1]
-        # end point of arc
-        end = end_event.position[0] + intersections[1][0], end_event.position[1] + intersections[1][1]
-        # create line with arrow head as end
-        self.__canvas.create_line(start[0], start[1], end[0], end[1], arrow=LAST, arrowshape=(8.6, 10, 5), width=2)
-
-
-    def __calculateIntersections(self, start, end):
-        """ Calculate intersection point of start and end events with the arc.
-
-        This method calculates two vectors which describe the intersection point of the arc from the
-        given start event to the given end event.
-        """
-
-        # vector from the center of the start event to the center of the end event
-        vector = float(end.position[0] - start.position[0]), float(end.position[1] - start.position[1])
-        #calculate a factor to scale the x-component to 10px (half of side length)
-        fact = 1
-        if vector[0] != 0:
-            fact = 10 / math.fabs(vector[0])
-        # scale the vector
-        start_vector = vector[0] * fact, vector[1] * fact
-
-        # if y-component of vector is larger than 10px or x-component is 0, scale with y-component
-        if math.fabs(start_vector[1]) > 10 or vector[0] == 0:
-            fact = 10 / math.fabs(vector[1])
-            start_vector = vector[0] * fact, vector[1] * fact
-        #calculate intersection for arc end
-        if vector[0] != 0:
-            fact = 10 / math.fabs(vector[0])
-
-        end_vector = -vector[0] * fact, -vector[1] * fact
-
-        if math.fabs(end_vector[1]) > 10 or vector[0] == 0:
-            fact = 10 / math.fabs(vector[1])
-            end_vector = -vector[0] * fact, -vector[1] * fact
-
-        return start_vector, end_vector
+        for start, end in zip(arrows.starts.tolist(), arrows.ends.tolist()):
+            # create line with arrow head as end
+            self.__canvas.create_line(start[0], start[1], end[0], end[1], arrow=LAST, arrowshape=(8.6, 10, 5), width=2)
 
 
 class LpoViewer(Frame):
@@ -9,10 +9,14 @@ labelled partial order files created with VipTool or MoPeBs.
 
 import sys # argv for test file path
 import xml.etree.ElementTree as ET # XML parser
-import time # timestamp for id generation
-from random import randint # random number for id generation
+try:
+    from pntools.ids import LazyId # lazy id generation
+except ImportError: # run as script from the pntools directory, like the viewers
+    from ids import LazyId
 
-class LPO:
+ORIGIN = (0, 0) # shared default position and offset
+
+class LPO(LazyId):
     """ This class represents a LPO.
 
     This class represents a labelled partial order. A labelled
@@ -21,12 +25,131 @@ class LPO:
 
     lpo.arcs: List of all arcs of this LPO
     lpo.events: Map of (id, event) of all events of this LPO
+
+    The algorithms share an index of the events and arcs, see lpo.index(),
+    and the order relation calculated from it, see lpo.relation(). Use the
+    add_/remove_ methods to change events and arcs, they keep the index up
+    to date. Changes of user drawn arcs update the relation incrementally,
+    changes of events drop it. Call lpo.reset_index() after changing
+    lpo.arcs or lpo.events directly. Removing a few arcs takes constant
+    time per arc, the last arcs of lpo.arcs take their positions then.
     """
     
+    id_prefix = "Lpo" # prefix of generated ids
+
     def __init__(self):
-        self.id = ("Lpo" + str(time.time())) + str(randint(0, 1000)) # generate a unique id
         self.arcs = [] # List or arcs (arcs order events)
         self.events = {} # Map of events. Key: event id, Value: event
+        self.__index = None # LpoIndex, created on demand
+        self.__relation = None # LpoRelation, created on demand
+
+    def index(self):
+        """ Return the index of events and user drawn arcs of this LPO.
+
+        The index is created on the first call and updated incrementally
+        by the add_/remove_ methods afterwards.
+        """
+        if self.__index is None:
+            self.__index = LpoIndex(self)
+        return self.__index
+
+    def relation(self):
+        """ Return the order relation of the events of this LPO.
+
+        The relation is calculated from the user drawn arcs on the first
+        call, kept up to date when user drawn arcs are added or removed and
+        dropped when the events change.
+        Raises ValueError if the user drawn arcs contain a cycle.
+        """
+        if self.__relation is None:
+            self.__relation = LpoRelation(self.index())
+        return self.__relation
+
+    def reset_index(self):
+        """ Drop the index and relation, they are rebuilt on demand. """
+        self.__index = None
+        self.__relation = None
+
+    def add_event(self, event):
+        """ Add the given event to this LPO.
+
+        Raises ValueError if the LPO already has an event with this id.
+        """
+        if event.id in self.events:
+            raise ValueError("event " + str(event.id) + " already exists")
+        self.events[event.id] = event
+        self.__relation = None
+        if self.__index is not None:
+            self.__index.add_event(event.id)
+
+    def remove_event(self, event_id):
+        """ Remove the event with the given id and all its arcs from this LPO. """
+        self.__relation = None
+        self.remove_arcs([arc for arc in self.arcs
+                          if arc.source == event_id or arc.target == event_id])
+        del self.events[event_id]
+        if self.__index is not None:
+            self.__index.remove_event(event_id)
+
+    def add_arc(self, arc):
+        """ Add the given arc to this LPO.
+
+        If the relation is calculated, a user drawn arc is checked and added
+        to it incrementally. Raises ValueError if the arc would close a cycle,
+        the LPO is not changed then.
+        """
+        if arc.user_drawn and self.__relation is not None:
+            self.__relation.add_arc(arc.source, arc.target)
+        arc.lpo = self
+        arc.list_position = len(self.arcs)
+        self.arcs.append(arc)
+        if self.__index is not None:
+            self.__index.insert(arc)
+            if arc.user_drawn:
+                self.__index.add_arc(arc.source, arc.target)
+
+    def remove_arc(self, arc):
+        """ Remove the given arc from this LPO. """
+        self.remove_arcs([arc])
+
+    def remove_arcs(self, arcs):
+        """ Remove all given arcs of this LPO.
+
+        The arcs are found with the index and taken out of lpo.arcs by
+        their list positions, the other arcs are not visited. If many arcs
+        are removed, lpo.arcs is built again in the old order.
+        """
+        removed = {} # the given arcs of this LPO
+        if arcs:
+            index = self.index()
+            for arc in arcs:
+                if id(arc) not in removed and index.discard(arc):
+                    removed[id(arc)] = arc
+        for arc in removed.values():
+            if arc.user_drawn:
+                index.remove_arc(arc.source, arc.target)
+                if self.__relation is not None:
+                    self.__relation.remove_arc(arc.source, arc.target)
+
+        if not removed:
+            return
+        all_arcs = self.arcs
+        if len(removed) * 4 < len(all_arcs) and all(self.__listed(arc) for arc in removed.values()):
+            for arc in removed.values():
+                # the last arc takes the position of the removed arc
+                last = all_arcs.pop()
+                if last is not arc:
+                    all_arcs[arc.list_position] = last
+                    last.list_position = arc.list_position
+        else:
+            all_arcs[:] = [arc for arc in all_arcs if id(arc) not in removed]
+            for position, arc in enumerate(all_arcs):
+                arc.list_position = position
+
+    def __listed(self, arc):
+        """ Check if the list position of the arc is its position in lpo.arcs. """
+        position = arc.list_position
+        return position is not None and position < len(self.arcs) and self.arcs[position] is arc
 
     def __str__(self):
         text = '--- LPO: ' + self.name + '\n'
@@ -40,7 +163,324 @@ class LPO:
         
         return text
 
-class Event:
+class LpoIndex:
+    """ This class represents an index of the events and arcs of a LPO.
+
+    Every event has an int position, the algorithms work with these
+    positions instead of event ids.
+
+    index.event_ids: List of event ids, the position of an id is the position of the event.
+    index.positions: Map of (id, position) of all events.
+    index.successors: List of sets of positions. successors[i] contains the targets
+      of all user drawn arcs with source event_ids[i].
+    index.predecessors: List of sets of positions. predecessors[i] contains the sources
+      of all user drawn arcs with target event_ids[i].
+    index.arcs: List of maps. arcs[i] maps the target id of every arc (user drawn
+      or calculated) with source event_ids[i] to the arc. Further arcs with
+      the same events are kept aside, see arcs_between and arcs_from.
+    """
+
+    def __init__(self, lpo):
+        self.event_ids = []
+        self.positions = {}
+        self.successors = []
+        self.predecessors = []
+        self.arcs = []
+        self.__arc_count = {} # number of user drawn arcs. Key: (source id, target id)
+        self.__parallel = {} # further arcs with the same events. Key: (source id, target id)
+
+        for id in lpo.events:
+            self.add_event(id)
+
+        for position, arc in enumerate(lpo.arcs):
+            arc.list_position = position
+            self.insert(arc)
+            if arc.user_drawn:
+                self.add_arc(arc.source, arc.target)
+
+    def __len__(self):
+        return len(self.event_ids)
+
+    def add_event(self, event_id):
+        """ Add an event to the index. """
+        self.positions[event_id] = len(self.event_ids)
+        self.event_ids.append(event_id)
+        self.successors.append(set())
+        self.predecessors.append(set())
+        self.arcs.append({})
+
+    def remove_event(self, event_id):
+        """ Remove an event and its arcs from the index.
+
+        The last event takes the position of the removed event.
+        """
+        position = self.positions.pop(event_id)
+
+        for j in self.successors[position]:
+            self.predecessors[j].discard(position)
+            self.__arc_count.pop((event_id, self.event_ids[j]), None)
+        for j in self.predecessors[position]:
+            self.successors[j].discard(position)
+            self.__arc_count.pop((self.event_ids[j], event_id), None)
+
+        last = len(self.event_ids) - 1
+        if position != last:
+            moved_id = self.event_ids[last]
+            self.event_ids[position] = moved_id
+            self.positions[moved_id] = position
+            self.successors[position] = self.successors[last]
+            self.predecessors[position] = self.predecessors[last]
+            self.arcs[position] = self.arcs[last]
+            for j in self.successors[position]:
+                self.predecessors[j].discard(last)
+                self.predecessors[j].add(position)
+            for j in self.predecessors[position]:
+                self.successors[j].discard(last)
+                self.successors[j].add(position)
+
+        self.event_ids.pop()
+        self.successors.pop()
+        self.predecessors.pop()
+        self.arcs.pop()
+
+    def add_arc(self, source_id, target_id):
+        """ Add a user drawn arc to the index. """
+        key = (source_id, target_id)
+        self.__arc_count[key] = self.__arc_count.get(key, 0) + 1
+        source = self.positions[source_id]
+        target = self.positions[target_id]
+        self.successors[source].add(target)
+        self.predecessors[target].add(source)
+
+    def remove_arc(self, source_id, target_id):
+        """ Remove a user drawn arc from the index. """
+        key = (source_id, target_id)
+        count = self.__arc_count[key] - 1
+        if count > 0:
+            self.__arc_count[key] = count
+            return
+
+        del self.__arc_count[key]
+        source = self.positions[source_id]
+        target = self.positions[target_id]
+        self.successors[source].discard(target)
+        self.predecessors[target].discard(source)
+
+    def insert(self, arc):
+        """ Add an arc (user drawn or calculated) to the arcs of its source. """
+        row = self.arcs[self.positions[arc.source]]
+        if arc.target in row:
+            self.__parallel.setdefault((arc.source, arc.target), []).append(arc)
+        else:
+            row[arc.target] = arc
+
+    def discard(self, arc):
+        """ Remove an arc from the arcs of its source.
+
+        return: True if the arc was found.
+        """
+        position = self.positions.get(arc.source)
+        if position is None:
+            return False
+        row = self.arcs[position]
+        key = (arc.source, arc.target)
+        parallel = self.__parallel.get(key, [])
+        if row.get(arc.target) is arc:
+            if parallel:
+                row[arc.target] = parallel.pop()
+            else:
+                del row[arc.target]
+        elif any(other is arc for other in parallel):
+            parallel.remove(arc)
+        else:
+            return False
+        if key in self.__parallel and not parallel:
+            del self.__parallel[key]
+        return True
+
+    def arcs_between(self, position, target_id):
+        """ List of all arcs from the event at the position to the target event. """
+        arc = self.arcs[position].get(target_id)
+        if arc is None:
+            return []
+        return [arc] + self.__parallel.get((self.event_ids[position], target_id), [])
+
+    def arcs_from(self, position):
+        """ Iterate all arcs starting at the event at the position. """
+        source_id = self.event_ids[position]
+        for target_id, arc in self.arcs[position].items():
+            yield arc
+            yield from self.__parallel.get((source_id, target_id), ())
+
+    def preset(self, event_id):
+        """ Ids of all events with a user drawn arc to the given event. """
+        return set(self.event_ids[j] for j in self.predecessors[self.positions[event_id]])
+
+    def postset(self, event_id):
+        """ Ids of all events with a user drawn arc from the given event. """
+        return set(self.event_ids[j] for j in self.successors[self.positions[event_id]])
+
+class LpoRelation:
+    """ This class represents the order relation of the events of a LPO.
+
+    The relation is the transitive closure of the user drawn arcs. Every
+    event position has a row of bits, bit j of a row stands for the event
+    at position j (see LpoIndex). The rows are also packed into bytes, so
+    a single pair is tested with one byte lookup.
+
+    Added and removed user drawn arcs are applied incrementally, see
+    add_arc and remove_arc. Only the rows of the events before the source
+    of the arc can change, all other rows are kept.
+
+    relation.event_ids, relation.positions: Shared with the LpoIndex.
+    relation.successors: List of ints, bit j of successors[i] is set if
+      event j occurs after event i.
+    relation.predecessors: List of ints, bit j of predecessors[i] is set if
+      event j occurs before event i.
+    """
+
+    def __init__(self, index):
+        self.event_ids = index.event_ids
+        self.positions = index.positions
+        self.successors = closure_rows(index.successors)
+        self.predecessors = closure_rows(index.predecessors)
+        self.__direct = index.successors # user drawn arcs, shared with the index
+        self.__stride = (len(self.event_ids) + 7) // 8
+        self.__after = None # packed successor rows, created on the first pair test
+        self.__skeleton = None # skeleton rows, created on demand
+        self.__outdated = 0 # bits of the skeleton rows to calculate again
+
+    def __len__(self):
+        return len(self.event_ids)
+
+    def add_arc(self, source_id, target_id):
+        """ Add a user drawn arc to the relation.
+
+        All events before the source (and the source) get the target and
+        all events after it as successors, the predecessors are updated the
+        other way round. Call this before the arc is added to the index.
+        Raises ValueError if the arc would close a cycle.
+        """
+        source = self.positions[source_id]
+        target = self.positions[target_id]
+        successors = self.successors
+        predecessors = self.predecessors
+        if source == target or successors[target] >> source & 1:
+            raise ValueError("arc " + str(source_id) + " --> " + str(target_id) + " would close a cycle")
+
+        ancestors = predecessors[source] | 1 << source
+        self.__outdated |= ancestors
+        if successors[source] >> target & 1:
+            return # already ordered
+
+        descendants = successors[target] | 1 << target
+        for i in bits(ancestors):
+            if descendants & ~successors[i]:
+                successors[i] |= descendants
+                self.__pack_row(i)
+        for j in bits(descendants):
+            predecessors[j] |= ancestors
+
+    def remove_arc(self, source_id, target_id):
+        """ Update the relation after a user drawn arc was removed from the index.
+
+        Only the source and the events before it can lose successors. Their
+        rows are calculated again from the user drawn arcs, the events after
+        them first. Call this after the arc is removed from the index.
+        """
+        source = self.positions[source_id]
+        target = self.positions[target_id]
+        direct = self.__direct
+        if target in direct[source]:
+            return # another user drawn arc with the same events is left
+
+        successors = self.successors
+        predecessors = self.predecessors
+        ancestors = predecessors[source] | 1 << source
+        self.__outdated |= ancestors
+        # more predecessors means later in every topological order
+        for i in sorted(bits(ancestors), key=lambda i: -bin(predecessors[i]).count("1")):
+            row = 0
+            for j in direct[i]:
+                row |= successors[j] | 1 << j
+            lost = successors[i] & ~row
+            if lost:
+                successors[i] = row
+                self.__pack_row(i)
+                for j in bits(lost):
+                    predecessors[j] &= ~(1 << i)
+
+    def __pack_row(self, position):
+        """ Copy the changed successor row into the packed rows. """
+        if self.__after is not None:
+            start = position * self.__stride
+            self.__after[start:start + self.__stride] = self.successors[position].to_bytes(self.__stride, 'little')
+
+    def skeleton(self):
+        """ Return the skeleton (Hasse diagram) of the relation as rows of bits.
+
+        Bit j of skeleton[i] is set if event j occurs after event i and
+        after no other event which occurs after event i. The rows are kept
+        and only the rows changed by added or removed arcs are calculated
+        again. They must not be changed.
+        """
+        if self.__skeleton is None:
+            self.__skeleton = [0] * len(self.event_ids)
+            self.__outdated = (1 << len(self.event_ids)) - 1
+
+        skeleton = self.__skeleton
+        successors = self.successors
+        for i in bits(self.__outdated):
+            covered = 0
+            for j in self.__direct[i]:
+                covered |= successors[j]
+            skeleton[i] = successors[i] & ~covered
+        self.__outdated = 0
+
+        return skeleton
+
+    def is_before(self, source_id, target_id):
+        """ Check if the source event occurs before the target event. """
+        if self.__after is None:
+            self.__after = bytearray(b''.join(row.to_bytes(self.__stride, 'little') for row in self.successors))
+        i = self.positions[source_id]
+        j = self.positions[target_id]
+        return bool(self.__after[i * self.__stride + (j >> 3)] >> (j & 7) & 1)
+
+    def is_after(self, source_id, target_id):
+        """ Check if the source event occurs after the target event. """
+        return self.is_before(target_id, source_id)
+
+    def is_ordered(self, first_id, second_id):
+        """ Check if one of the events occurs before the other. """
+        return self.is_before(first_id, second_id) or self.is_before(second_id, first_id)
+
+    def is_concurrent(self, first_id, second_id):
+        """ Check if the events are different and not ordered. """
+        return first_id != second_id and not self.is_ordered(first_id, second_id)
+
+    def concurrent_row(self, position):
+        """ Return the bits of all events concurrent to the event at the position. """
+        everything = (1 << len(self.event_ids)) - 1
+        return everything & ~(self.successors[position] | self.predecessors[position] | 1 << position)
+
+    def events_before(self, event_id):
+        """ Ids of all events which occur before the given event. """
+        return self.ids(self.predecessors[self.positions[event_id]])
+
+    def events_after(self, event_id):
+        """ Ids of all events which occur after the given event. """
+        return self.ids(self.successors[self.positions[event_id]])
+
+    def concurrent_events(self, event_id):
+        """ Ids of all events concurrent to the given event. """
+        return self.ids(self.concurrent_row(self.positions[event_id]))
+
+    def ids(self, row):
+        """ Ids of all events in the row of bits. """
+        return set(self.event_ids[j] for j in bits(row))
+
+class Event(LazyId):
     """ This class represents a labelled event of a LPO. 
 
     An event represents a occurence of an activity and is labeled
@@ -49,7 +489,7 @@ class Event:
     event.id: Unique ID of this event.
     event.label: Label of this event.
 
-    Layout information:
+    Layout information (stored as (x, y) tuples):
       event.position: Position to display the event in graphical representations.
         Usually an event is drawn as a filled square. The position is the center
         of this square.
@@ -60,17 +500,19 @@ class Event:
         usual position.
     """
     
+    __slots__ = ('label', 'offset', 'position')
+
+    id_prefix = "Event" # prefix of generated ids
+
     def __init__(self):
         self.label = "Event" # default label of event
-        # generate a unique id
-        self.id = ("Event" + str(time.time())) + str(randint(0, 1000))
-        self.offset = [0, 0]
-        self.position = [0, 0]
+        self.offset = ORIGIN
+        self.position = ORIGIN
 
     def __str__(self):
         return self.label + "@(" + str(self.position[0]) + ", " + str(self.position[1]) + ")"
 
-class Arc:
+class Arc(LazyId):
     """ This class represents an arc of a LPO. 
 
     An arc represents an order between two events.
@@ -86,22 +528,74 @@ class Arc:
     arc.lpo: The LPO which contains this arc.
       This reference is used for the label resolution of the source and target events.
       See __str__ method.
+    arc.list_position: Position of this arc in lpo.arcs, kept by the LPO to
+      remove the arc without searching the list.
     """
     
+    __slots__ = ('source', 'target', 'user_drawn', 'skeleton', 'lpo', 'list_position')
+
+    id_prefix = "Arc" # prefix of generated ids
+
     def __init__(self):
-        #generate a unique id
-        self.id = ("Arc" + str(time.time())) + str(randint(0, 1000))
         self.source = None # id of the source event of this arc
         self.target = None # id of the target event of this arc
         self.user_drawn = False # True if the edge was defined from the user
         self.skeleton = False # True if the arc is a skeleton arc
         self.lpo = None # Reference to LPO object for label resolution of source an target
+        self.list_position = None # position in lpo.arcs, see LPO.remove_arcs
 
     def __str__(self):
         return str(self.lpo.events[self.source]) + " --> " + str(self.lpo.events[self.target])
     
 
 
+def closure_rows(successors):
+    """ Calculate the transitive closure of a relation of positions as bitsets.
+
+    successors: List of sets, successors[i] contains the positions related to i.
+    return: List of ints, bit j of rows[i] is set if j is reachable from i.
+    Raises ValueError if the relation contains a cycle.
+    """
+    rows = [0] * len(successors)
+
+    for i in reversed(topological_order(successors)):
+        row = 0
+        for j in successors[i]:
+            row |= rows[j] | (1 << j)
+        rows[i] = row
+
+    return rows
+
+def topological_order(successors):
+    """ Sort the positions of a relation topologically (Kahn).
+
+    Raises ValueError if the relation contains a cycle.
+    """
+    count = len(successors)
+    indegree = [0] * count
+    for targets in successors:
+        for j in targets:
+            indegree[j] += 1
+
+    order = [i for i in range(0, count) if indegree[i] == 0]
+    for i in order:
+        for j in successors[i]:
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                order.append(j)
+
+    if len(order) != count:
+        raise ValueError("arcs of LPO contain a cycle")
+
+    return order
+
+def bits(row):
+    """ Iterate the indices of all set bits of the given int in ascending order. """
+    while row:
+        low = row & -row
+        yield low.bit_length() - 1
+        row ^= low
+
 def parse_lpo_file(file):
     """ This method parse all LPOs of the given file.
 
@@ -135,48 +629,86 @@ def parse_lpo_file(file):
       ...
     </pnml>
     """
-    tree = ET.parse(file) # parse XML with ElementTree
-    root = tree.getroot()
-
-    lpos = [] # list for parsed LPO objects
-
-    for lpo_node in root.iter('lpo'):
-        # create LPO object
-        lpo = LPO()
-        lpos.append(lpo)
-        lpo.id = lpo_node.get('id')
-        lpo.name = lpo_node.find('./name/value').text
-
-        # and parse events
-        for event_node in lpo_node.iter('event'):
-            event = Event()
-            event.id = event_node.get('id')
-            event.label = event_node.find('./name/value').text
-            off_node = event_node.find('./name/graphics/offset')
-            event.offset = [int(off_node.get('x')), int(off_node.get('y'))]
-            position_node = event_node.find('./graphics/position')
-            event.position[0] = int(position_node.get('x'))
-            event.position[1] = int(position_node.get('y'))
-
-            lpo.events[event.id] = event
-
-        # and arcs
-        for arc_node in lpo_node.iter('lpoArc'):
-            arc = Arc()
-            lpo.arcs.append(arc)
-
-            arc.id = arc_node.get('id')
-            arc.source = arc_node.get('source')
-            arc.target = arc_node.get('target')
-            # user drawn means the user defined this arc
-            arc.user_drawn = bool(arc_node.find('graphics').get('userDrawn') == "true")
-
-            arc.lpo = lpo
-    
-    return lpos
+    return list(iter_lpo_file(file))
+
+def iter_lpo_file(file):
+    """ This generator parses the LPOs of the given file one by one.
+
+    The file is parsed incrementally. Every <lpo> is yielded as LPO object
+    as soon as its end tag is read, the XML elements of events and arcs
+    are discarded directly after they are converted. So the memory usage
+    depends on the size of one LPO and not on the size of the file.
+    See parse_lpo_file for the XML format.
+    """
+    lpo = None # LPO of the current <lpo> element
+    path = [] # currently open XML elements
+
+    for event, node in ET.iterparse(file, events=('start', 'end')):
+        if event == 'start':
+            if node.tag == 'lpo':
+                lpo = LPO()
+                lpo.id = node.get('id')
+            path.append(node)
+            continue
+
+        path.pop()
+        if lpo is None:
+            continue
+
+        if node.tag == 'event':
+            lpo.add_event(create_event(node))
+        elif node.tag == 'lpoArc':
+            lpo.add_arc(create_arc(node))
+        elif node.tag == 'lpo':
+            lpo.name = node.find('./name/value').text
+            yield lpo
+            lpo = None
+        else:
+            continue
+
+        # node is completely parsed, free its memory
+        node.clear()
+        if path:
+            path[-1].remove(node)
+
+def create_event(node):
+    """ Create an Event object from an <event> element. """
+    event = Event()
+    event.id = node.get('id')
+    event.label = node.find('./name/value').text
+    off_node = node.find('./name/graphics/offset')
+    event.offset = (int(off_node.get('x')), int(off_node.get('y')))
+    position_node = node.find('./graphics/position')
+    event.position = (int(position_node.get('x')), int(position_node.get('y')))
+
+    return event
+
+def create_arc(node):
+    """ Create an Arc object from a <lpoArc> element. """
+    arc = Arc()
+    arc.id = node.get('id')
+    arc.source = node.get('source')
+    arc.target = node.get('target')
+    # user drawn means the user defined this arc
+    arc.user_drawn = bool(node.find('graphics').get('userDrawn') == "true")
+
+    return arc
 
 def write_lpo_file(l, filename):
+    """ Write the LPO to a VipTool XML file. See parse_lpo_file for the format. """
+    write_lpos_file([l], filename)
+
+def write_lpos_file(lpos, filename):
+    """ Write all given LPOs to one VipTool XML file. """
     pnml = ET.Element('pnml')
+    for l in lpos:
+        create_lpo_element(pnml, l)
+
+    tree = ET.ElementTree(element=pnml)
+    tree.write(filename, encoding="utf-8", xml_declaration=True, method="xml")
+
+def create_lpo_element(pnml, l):
+    """ Add a <lpo> element for the LPO to the <pnml> element. """
     lpo = ET.SubElement(pnml, 'lpo', id=l.id)
     lpo_name = ET.SubElement(lpo, 'name')
     lpo_name_value = ET.SubElement(lpo_name, 'value')
@@ -204,16 +736,13 @@ def write_lpo_file(l, filename):
         else:
             arc_graphics.attrib['userDrawn'] = "false"
 
-    tree = ET.ElementTree(element=pnml)
-    tree.write(filename, encoding="utf-8", xml_declaration=True, method="xml")
+    return lpo
 
 
 if __name__ == "__main__":
     
     if len(sys.argv) > 1:
-        lpos = parse_lpo_file(sys.argv[1])
-
-        for lpo in lpos:
+        for lpo in iter_lpo_file(sys.argv[1]):
             print(lpo)
 
 
@@ -3,9 +3,10 @@
 
 """ This program implements a renderer for LPO files. """
 
-from PIL import Image, ImageDraw, ImageFont, ImageFilter # Python image library (Pillow)
+from PIL import Image, ImageDraw, ImageFilter # Python image library (Pillow)
 from pntools import partialorder # LPO data structure
-import math
+from pntools import fonts # font and label size cache
+from pntools import geometry # arc geometry
 import sys
 import os
 
@@ -63,110 +64,43 @@ def draw_event(event, draw, doffset):
     offset = event.offset[0] * scale, event.offset[1] * scale
     
 
-    font = ImageFont.truetype('Pillow/Tests/fonts/FreeMono.ttf', 12 * scale)
+    fontsize = 12 * scale
+    font = fonts.load_font(fontsize)
 
     draw.rectangle([x - halfside, y - halfside, x + halfside, y + halfside],
                    fill=(0, 0, 0), outline=(0, 0, 0))
     draw.rectangle([x - halfside + linewidth, y - halfside + linewidth,
                     x + halfside - linewidth, y + halfside - linewidth],
                    fill=(255, 255, 255), outline=(255, 255, 255))
-    fontsize = font.getsize(event.label)
-    draw.text((x - fontsize[0] / 2 + offset[0], y + halfside + distance + offset[1]),
+    textsize = fonts.text_size(event.label, fontsize)
+    draw.text((x - textsize[0] / 2 + offset[0], y + halfside + distance + offset[1]),
               event.label, font=font, fill=(0, 0, 0))
 
 
 def draw_arc(arc, draw, doffset, color):
     """ Helper method for arc drawing. """
-    scale = 4
-    width = 2 * scale
-    tipsize = 10 * scale
-    
-    halfside = 8
-
-    start_event = arc.lpo.events[arc.source] # get start event
-    end_event = arc.lpo.events[arc.target] # get end event
-
-    intersections = calculate_intersections(start_event, end_event, halfside) # calculate intersection points
-
-    # start point of arc
-    start = start_event.position[0] + intersections[0][0], start_event.position[1] + intersections[0][1]
-    # end point of arc
-    end = end_event.position[0] + intersections[1][0], end_event.position[1] + intersections[1][1]
-
-    vector = (float(start_event.position[0] - end_event.position[0]),
-              float(start_event.position[1] - end_event.position[1]))
-    vector_length = math.sqrt(vector[0] ** 2 + vector[1] ** 2)
-    tipcenter = (vector[0] * (tipsize / 2) / vector_length,
-                 vector[1] * (tipsize / 2) / vector_length)
-
-    start = (start[0] + doffset[0]) * scale, (start[1] + doffset[1]) * scale
-    end = (end[0] + doffset[0]) * scale, (end[1] + doffset[1]) * scale
-
-    draw.line([start[0], start[1], end[0] + tipcenter[0], end[1] + tipcenter[1]],
-              fill=color, width=width)
-
-    tip = calculate_tip(start_event, end_event, tipsize)
-
-    draw.polygon([end, (end[0] + tip[0][0], end[1] + tip[0][1]),
-                  (end[0] + tip[1][0], end[1] + tip[1][1])], outline=color, fill=color)
-    
-
-def calculate_tip(start, end, tipsize):
-    """ Helper function for tip point calculation.
-
-    return ((vektor1_x, vektor1_y), (vektor2_x, vektor2_y))
-    """
-    vector = float(start.position[0] - end.position[0]), float(start.position[1] - end.position[1])
-    vector_length = math.sqrt(vector[0] ** 2 + vector[1] ** 2)
-    
-    vector_sized = vector[0] * tipsize / vector_length, vector[1] * tipsize / vector_length
-
-    alpha = 30 * 2 * math.pi / 360
-
-    sin_alpha = math.sin(alpha)
-    cos_alpha = math.cos(alpha)
-
-    tip1 = (vector_sized[0] * cos_alpha - vector_sized[1] * sin_alpha,
-            vector_sized[0] * sin_alpha + vector_sized[1] * cos_alpha)
-
-    sin_alpha = math.sin(-alpha)
-    cos_alpha = math.cos(-alpha)
-
-    tip2 = (vector_sized[0] * cos_alpha - vector_sized[1] * sin_alpha,
-            vector_sized[0] * sin_alpha + vector_sized[1] * cos_alpha)
-
-    return tip1, tip2
+    draw_arrows(arc_arrows([arc]), draw, doffset, color)
 
+def arc_arrows(arcs):
+    """ Calculate the arrows of the given arcs in LPO coordinates, see geometry.Arrows. """
+    halfside = 8
+    tipsize = 10
 
-def calculate_intersections(start, end, halfside):
-    """ Helper function for arc intersection point calculation. """
-    # vector from the center of the start event to the center of the end event
-    vector = float(end.position[0] - start.position[0]), float(end.position[1] - start.position[1])
-
-    start_vector = calculate_intersection_event(vector, halfside)
-            
-    #calculate intersection for arc end
-    end_vector = calculate_intersection_event((-vector[0], -vector[1]), halfside)
-    
-    return start_vector, end_vector
-
-def calculate_intersection_event(vector, halfside):
-    """ Helper function, calculates intersection of arc and edge. """
-    #calculate a factor to scale the x-component to 10px (half of side length)
-    fact = 1
-    if vector[0] != 0:
-        fact = halfside / math.fabs(vector[0])
+    return geometry.node_arrows([(arc.lpo.events[arc.source], arc.lpo.events[arc.target]) for arc in arcs],
+                                halfside, tipsize)
 
-    # scale the vector
-    intersection_vector = vector[0] * fact, vector[1] * fact
+def draw_arrows(arrows, draw, doffset, color):
+    """ Helper method for drawing a batch of arrows. """
+    scale = 4
+    width = 2 * scale
 
-    # if y-component of vector is larger than halfside or
-    # x-component is 0, scale with y-component
-    if math.fabs(intersection_vector[1]) > halfside or vector[0] == 0:
-        fact = halfside / math.fabs(vector[1])
-        intersection_vector = vector[0] * fact, vector[1] * fact
+    starts = ((arrows.starts + doffset) * scale).tolist()
+    line_ends = ((arrows.line_ends + doffset) * scale).tolist()
+    heads = ((arrows.heads + doffset) * scale).tolist()
 
-    return intersection_vector[0], intersection_vector[1]
+    for start, end, head in zip(starts, line_ends, heads):
+        draw.line([start[0], start[1], end[0], end[1]], fill=color, width=width)
+        draw.polygon([tuple(point) for point in head], outline=color, fill=color)
 
 def draw_lpo(lpo, skeleton=False, transitive=False, skeleton_color=(0,0,255), transitive_color=(220, 220, 220)):
     """ This method renders the given labelled partial order as an Image object. """
@@ -177,18 +111,13 @@ def draw_lpo(lpo, skeleton=False, transitive=False, skeleton_color=(0,0,255), tr
     d = ImageDraw.Draw(image)
 
     if transitive:
-        for arc in lpo.arcs:
-            if not arc.user_drawn and not arc.skeleton:
-                draw_arc(arc, d, doffset, transitive_color)
+        arcs = [arc for arc in lpo.arcs if not arc.user_drawn and not arc.skeleton]
+        draw_arrows(arc_arrows(arcs), d, doffset, transitive_color)
 
-    for arc in lpo.arcs:
-        if arc.user_drawn:
-            draw_arc(arc, d, doffset, (0, 0, 0))
+    draw_arrows(arc_arrows([arc for arc in lpo.arcs if arc.user_drawn]), d, doffset, (0, 0, 0))
 
     if skeleton:
-        for arc in lpo.arcs:
-            if arc.skeleton:
-                draw_arc(arc, d, doffset, skeleton_color)
+        draw_arrows(arc_arrows([arc for arc in lpo.arcs if arc.skeleton]), d, doffset, skeleton_color)
             
     for id, event in lpo.events.items():
         draw_event(event, d, doffset)
@@ -200,7 +129,7 @@ def antialias(image, factor):
     the image size is reduced by the given factor.
     """
     x, y = image.size
-    img = image.resize((int(x / factor), int(y / factor)), Image.ANTIALIAS)
+    img = image.resize((int(x / factor), int(y / factor)), Image.LANCZOS)
     
     return img
     
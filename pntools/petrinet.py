@@ -9,10 +9,14 @@ Petri nets/PNML created with VipTool or MoPeBs.
 
 import sys # argv for test file path
 import xml.etree.ElementTree as ET # XML parser
-import time # timestamp for id generation
-from random import randint # random number for id generation
+try:
+    from pntools.ids import LazyId # lazy id generation
+except ImportError: # run as script from the pntools directory, like the viewers
+    from ids import LazyId
 
-class PetriNet:
+ORIGIN = (0, 0) # shared default position and offset
+
+class PetriNet(LazyId):
     """ This class represents a Petri net.
 
     This class represents a Petri net. A Petri net consists of
@@ -24,9 +28,9 @@ class PetriNet:
     net.places: Map of (id, place) of all places of this Petri net
     """
     
+    id_prefix = "PetriNet" # prefix of generated ids
+
     def __init__(self):
-        #generate a unique id
-        self.id = ("PetriNet" + str(time.time())) + str(randint(0, 1000))
         self.edges = [] # List or arcs
         self.transitions = {} # Map of transitions. Key: transition id, Value: event
         self.places = {} # Map of places. Key: place id, Value: place
@@ -45,7 +49,7 @@ class PetriNet:
         
         return text
 
-class Transition:
+class Transition(LazyId):
     """ This class represents a labelled transition of a Petri net. 
 
     A transition represents an activity.
@@ -53,7 +57,7 @@ class Transition:
     transition.id: Unique ID of this transition.
     transition.label: Label of this transition.
 
-    Layout information:
+    Layout information (stored as (x, y) tuples):
       transition.position: Position to display the transition in graphical representations.
         Usually a transition is drawn as a square. The position is the center of this square.
       transition.offset: Offest of the transition label.
@@ -63,17 +67,19 @@ class Transition:
         usual position.
     """
     
+    __slots__ = ('label', 'offset', 'position')
+
+    id_prefix = "Transition" # prefix of generated ids
+
     def __init__(self):
         self.label = "Transition" # default label of event
-        #generate a unique id
-        self.id = ("Transition" + str(time.time())) + str(randint(0, 1000))
-        self.offset = [0, 0]
-        self.position = [0, 0]
+        self.offset = ORIGIN
+        self.position = ORIGIN
 
     def __str__(self):
         return self.label
 
-class Place:
+class Place(LazyId):
     """ This class represents a labelled Place of a Petri net. 
 
     A place represents a resource.
@@ -83,7 +89,7 @@ class Place:
     place.marking: Current marking of this place.
       Usually a marking is the count of tokens contained into this place.
 
-    Layout information:
+    Layout information (stored as (x, y) tuples):
       place.position: Position to display the place in graphical representations.
         Usually a place is drawn as a circle. The position is the center of this circel.
       place.offset: Offest of the place label.
@@ -93,19 +99,21 @@ class Place:
         usual position.
     """
     
+    __slots__ = ('label', 'offset', 'position', 'marking')
+
+    id_prefix = "Place" # prefix of generated ids
+
     def __init__(self):
         self.label = "Place" # default label of event
-        #generate a unique id
-        self.id = ("Place" + str(time.time())) + str(randint(0, 1000))
-        self.offset = [0, 0]
-        self.position = [0, 0]
+        self.offset = ORIGIN
+        self.position = ORIGIN
         self.marking = 0
 
     def __str__(self):
         return self.label
 
 
-class Edge:
+class Edge(LazyId):
     """ This class represents an arc of a Petri net. 
 
     An edge represents an relation between a place and a transition or a transition
@@ -122,9 +130,11 @@ class Edge:
       See __str__ method.
     """
     
+    __slots__ = ('source', 'target', 'type', 'inscription', 'net')
+
+    id_prefix = "Arc" # prefix of generated ids
+
     def __init__(self):
-        #generate a unique id
-        self.id = ("Arc" + str(time.time())) + str(randint(0, 1000))
         self.source = None # id of the source event of this arc
         self.target = None # id of the target event of this arc
         self.type = 'normal' # id of the type of this arc
@@ -200,81 +210,113 @@ def parse_pnml_file(file):
       ...
     </pnml>
     """
-    tree = ET.parse(file) # parse XML with ElementTree
-    root = tree.getroot()
-
-    nets = [] # list for parsed PetriNet objects
-
-    #xmlns = '{http://www.pnml.org/version-2009/grammar/pnml}' not working
-    xmlns = ''
-
-    for net_node in root.iter(xmlns+'net'):
-        # create PetriNet object
-        net = PetriNet()
-        nets.append(net)
-        net.id = net_node.get('id')
-        netnmnode = net_node.find('./'+xmlns+'name/'+xmlns+'text')
-        if netnmnode is not None:
-             net.name = netnmnode.text
-        else:
-             net.name = net.id
-
-        # and parse transitions
-        for transition_node in net_node.iter(xmlns+'transition'):
-            transition = Transition()
-            transition.id = transition_node.get('id')
-            transition.label = transition.id if transition_node.find('./name/text')== None else transition_node.find('./name/text').text
-            position_node = transition_node.find('./graphics/position')
-            transition.position = [int(float(position_node.get('x'))), int(float(position_node.get('y')))]
-            off_node = transition_node.find('./'+xmlns+'name/'+xmlns+'graphics/'+xmlns+'offset')
-            if off_node == None :
-                transition.offset = [0,0]
-            else :
-                transition.offset = [int(off_node.get('x')), int(off_node.get('y'))]
-            net.transitions[transition.id] = transition
-
+    return list(iter_pnml_file(file))
 
-        # and parse places
-        for place_node in net_node.iter(xmlns+'place'):
-            place = Place()
-            place.id = place_node.get('id')
-            place.label = place.id if place_node.find('./'+xmlns+'name/'+xmlns+'text')== None else place_node.find('./'+xmlns+'name/'+xmlns+'text').text
-            position_node = place_node.find('./'+xmlns+'graphics/'+xmlns+'position')
-            place.position = [int(float(position_node.get('x'))), int(float(position_node.get('y')))]
+def iter_pnml_file(file):
+    """ This generator parses the Petri nets of the given file one by one.
 
-            off_node = place_node.find('./'+xmlns+'name/'+xmlns+'graphics/'+xmlns+'offset')
-            if off_node == None :
-                place.offset = [0,0]
-            else :
-                place.offset = [int(off_node.get('x')), int(off_node.get('y'))]
-
-            place.marking = 0 if place_node.find('./initialMarking/text')== None else int(place_node.find('./initialMarking/text').text)
+    The file is parsed incrementally. Every <net> is yielded as PetriNet
+    object as soon as its end tag is read, the XML elements of transitions,
+    places and arcs are discarded directly after they are converted. So
+    the memory usage depends on the size of one net and not on the size
+    of the file. See parse_pnml_file for the XML format.
+    """
+    net = None # PetriNet of the current <net> element
+    path = [] # currently open XML elements
+
+    for event, node in ET.iterparse(file, events=('start', 'end')):
+        if event == 'start':
+            # ignore the pnml namespace, e.g. {http://www.pnml.org/...}net
+            node.tag = node.tag.rpartition('}')[2]
+            if node.tag == 'net':
+                net = PetriNet()
+                net.id = node.get('id')
+            path.append(node)
+            continue
+
+        path.pop()
+        if net is None:
+            continue
+
+        if node.tag == 'transition':
+            transition = create_transition(node)
+            net.transitions[transition.id] = transition
+        elif node.tag == 'place':
+            place = create_place(node)
             net.places[place.id] = place
-
-        # and arcs
-        for arc_node in net_node.iter(xmlns+'arc'):
-            edge = Edge()
-            net.edges.append(edge)
-
-            edge.id = arc_node.get('id')
-            edge.source = arc_node.get('source')
-            edge.target = arc_node.get('target')
-            edge.type = arc_node.get('type')
-            if edge.type is None:
-                etp = arc_node.find('./'+xmlns+'type')
-                if etp is not None:
-                    edge.type = etp.get('value')
-                if edge.type is None:
-                    edge.type = 'normal'
-            inscr_txt = arc_node.find('./'+xmlns+'inscription/'+xmlns+'text')
-            if inscr_txt is not None:
-                edge.inscription = inscr_txt.text
-            else:
-                edge.inscription = "1"
-            
+        elif node.tag == 'arc':
+            edge = create_edge(node)
             edge.net = net
-    
-    return nets
+            net.edges.append(edge)
+        elif node.tag == 'net':
+            name_node = node.find('./name/text')
+            net.name = net.id if name_node is None else name_node.text
+            yield net
+            net = None
+        else:
+            continue
+
+        # node is completely parsed, free its memory
+        node.clear()
+        if path:
+            path[-1].remove(node)
+
+def create_transition(node):
+    """ Create a Transition object from a <transition> element. """
+    transition = Transition()
+    transition.id = node.get('id')
+    name_node = node.find('./name/text')
+    transition.label = transition.id if name_node is None else name_node.text
+    transition.position = parse_position(node.find('./graphics/position'))
+    transition.offset = parse_offset(node.find('./name/graphics/offset'))
+
+    return transition
+
+def create_place(node):
+    """ Create a Place object from a <place> element. """
+    place = Place()
+    place.id = node.get('id')
+    name_node = node.find('./name/text')
+    place.label = place.id if name_node is None else name_node.text
+    place.position = parse_position(node.find('./graphics/position'))
+    place.offset = parse_offset(node.find('./name/graphics/offset'))
+    marking_node = node.find('./initialMarking/text')
+    place.marking = 0 if marking_node is None else int(marking_node.text)
+
+    return place
+
+def create_edge(node):
+    """ Create an Edge object from an <arc> element. """
+    edge = Edge()
+    edge.id = node.get('id')
+    edge.source = node.get('source')
+    edge.target = node.get('target')
+    edge.type = node.get('type')
+    if edge.type is None:
+        type_node = node.find('./type')
+        if type_node is not None:
+            edge.type = type_node.get('value')
+        if edge.type is None:
+            edge.type = 'normal'
+    inscription_node = node.find('./inscription/text')
+    if inscription_node is not None:
+        edge.inscription = inscription_node.text
+    else:
+        edge.inscription = "1"
+
+    return edge
+
+def parse_position(node):
+    """ Read a <position> element, positions may be given as float. """
+    if node is None:
+        return ORIGIN
+    return (int(float(node.get('x'))), int(float(node.get('y'))))
+
+def parse_offset(node):
+    """ Read an <offset> element. """
+    if node is None:
+        return ORIGIN
+    return (int(node.get('x')), int(node.get('y')))
 
 def write_pnml_file(n, filename, relative_offset=True):
     pnml = ET.Element('pnml')
@@ -329,9 +371,7 @@ def write_pnml_file(n, filename, relative_offset=True):
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
-        nets = parse_pnml_file(sys.argv[1])
-        
-        for net in nets:
+        for net in iter_pnml_file(sys.argv[1]):
             print(net)
 
 
@@ -0,0 +1,253 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This module implements an array based representation of Petri nets.
+
+An ArrayNet stores the places and transitions of a Petri net as dense
+integer indices, the marking as NumPy vector and the arc weights as
+sparse pre- and post-incidence matrices. Simulation and analysis
+algorithms work on this representation instead of resolving the source
+and target of every edge through the dicts of the PetriNet.
+
+Usage: python petrinet_matrix.py <pnml-file>
+"""
+
+import sys # argv for test file path
+import numpy as np # arrays
+from pntools import petrinet # Petri net data structure
+
+class IncidenceMatrix:
+    """ This class represents a sparse transition x place matrix.
+
+    The entries are stored in compressed row format, sorted by transition
+    and place index. Entries with the same position are summed up.
+
+    matrix.shape: (count of transitions, count of places)
+    matrix.indptr: The entries of transition t are indptr[t]:indptr[t + 1].
+    matrix.indices: Place index of every entry.
+    matrix.data: Weight of every entry.
+    matrix.rows: Transition index of every entry.
+    """
+
+    def __init__(self, shape, rows, columns, weights):
+        transitions, places = shape
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.int64)
+
+        keys, inverse = np.unique(rows * places + columns, return_inverse=True)
+        data = np.bincount(inverse.ravel(), weights=weights, minlength=len(keys)).astype(np.int64)
+        nonzero = data != 0
+        keys = keys[nonzero]
+
+        self.shape = (transitions, places)
+        self.rows = keys // max(places, 1)
+        self.indices = keys % max(places, 1)
+        self.data = data[nonzero]
+        self.indptr = np.zeros(transitions + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.rows, minlength=transitions), out=self.indptr[1:])
+
+    def row(self, transition):
+        """ Return (place indices, weights) of the given transition. """
+        start, end = self.indptr[transition], self.indptr[transition + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def to_dense(self):
+        """ Return the matrix as dense NumPy array. """
+        dense = np.zeros(self.shape, dtype=np.int64)
+        dense[self.rows, self.indices] = self.data
+        return dense
+
+class ArrayNet:
+    """ This class represents a Petri net with integer indices and arrays.
+
+    net.id, net.name: ID and name of the Petri net.
+    net.place_ids: List of place ids, the list position is the place index.
+    net.place_index: Map of (id, index) of all places.
+    net.place_labels: List of place labels.
+    net.place_positions, net.place_offsets: (places x 2) arrays of layout information.
+    net.transition_ids, net.transition_index, net.transition_labels,
+    net.transition_positions, net.transition_offsets: Same for transitions.
+    net.marking: Vector of the token count of every place.
+    net.pre: IncidenceMatrix of the tokens consumed by the transitions.
+    net.post: IncidenceMatrix of the tokens produced by the transitions.
+    net.effect: IncidenceMatrix post - pre, the marking change of a transition.
+
+    The edges are kept as parallel lists (edge_ids, edge_sources, edge_targets,
+    edge_types, edge_inscriptions) for the conversion back to a PetriNet. Only
+    edges of type 'normal' are supported, see from_petrinet.
+    """
+
+    def __init__(self):
+        self.id = None
+        self.name = None
+        self.place_ids = []
+        self.place_index = {}
+        self.place_labels = []
+        self.place_positions = np.zeros((0, 2), dtype=np.int64)
+        self.place_offsets = np.zeros((0, 2), dtype=np.int64)
+        self.transition_ids = []
+        self.transition_index = {}
+        self.transition_labels = []
+        self.transition_positions = np.zeros((0, 2), dtype=np.int64)
+        self.transition_offsets = np.zeros((0, 2), dtype=np.int64)
+        self.marking = np.zeros(0, dtype=np.int64)
+        self.pre = IncidenceMatrix((0, 0), [], [], [])
+        self.post = IncidenceMatrix((0, 0), [], [], [])
+        self.effect = IncidenceMatrix((0, 0), [], [], [])
+        self.edge_ids = []
+        self.edge_sources = []
+        self.edge_targets = []
+        self.edge_types = []
+        self.edge_inscriptions = []
+
+    def enabled(self, marking=None):
+        """ Return a bool vector of all transitions enabled in the marking.
+
+        Default is the initial marking of the net. For a (markings x places)
+        array a (markings x transitions) bool array is returned.
+        """
+        if marking is None:
+            marking = self.marking
+        pre = self.pre
+        enabled = np.ones(marking.shape[:-1] + (len(self.transition_ids),), dtype=bool)
+        consuming = pre.indptr[1:] > pre.indptr[:-1]
+        if consuming.any():
+            missing = marking[..., pre.indices] < pre.data
+            starts = pre.indptr[:-1][consuming]
+            enabled[..., consuming] = ~np.logical_or.reduceat(missing, starts, axis=-1)
+        return enabled
+
+    def is_enabled(self, marking, transition):
+        """ Check if the transition (index) is enabled in the marking. """
+        places, weights = self.pre.row(transition)
+        return bool(np.all(marking[places] >= weights))
+
+    def fire(self, marking, transition):
+        """ Return the marking reached by firing the transition (index). """
+        places, weights = self.effect.row(transition)
+        successor = marking.copy()
+        successor[places] += weights
+        return successor
+
+    def __str__(self):
+        return ("--- ArrayNet: " + str(self.name) + " (" + str(len(self.place_ids)) + " places, " +
+                str(len(self.transition_ids)) + " transitions, " + str(len(self.pre.data)) +
+                " pre entries, " + str(len(self.post.data)) + " post entries)")
+
+def from_petrinet(net):
+    """ Create an ArrayNet from the given PetriNet in one pass.
+
+    Raises ValueError for edges between two places or two transitions,
+    for edges with a non integer inscription and for edges of other types
+    than 'normal' (e.g. inhibitor, read or reset arcs), because the
+    incidence matrices can not express their semantics.
+    """
+    anet = ArrayNet()
+    anet.id = net.id
+    anet.name = getattr(net, 'name', net.id)
+
+    places = list(net.places.values())
+    anet.place_ids = [place.id for place in places]
+    anet.place_index = {id: i for i, id in enumerate(anet.place_ids)}
+    anet.place_labels = [place.label for place in places]
+    anet.place_positions = np.array([tuple(place.position) for place in places],
+                                    dtype=np.int64).reshape(-1, 2)
+    anet.place_offsets = np.array([tuple(place.offset) for place in places],
+                                  dtype=np.int64).reshape(-1, 2)
+    anet.marking = np.array([place.marking for place in places], dtype=np.int64)
+
+    transitions = list(net.transitions.values())
+    anet.transition_ids = [transition.id for transition in transitions]
+    anet.transition_index = {id: i for i, id in enumerate(anet.transition_ids)}
+    anet.transition_labels = [transition.label for transition in transitions]
+    anet.transition_positions = np.array([tuple(transition.position) for transition in transitions],
+                                         dtype=np.int64).reshape(-1, 2)
+    anet.transition_offsets = np.array([tuple(transition.offset) for transition in transitions],
+                                       dtype=np.int64).reshape(-1, 2)
+
+    pre = ([], [], []) # transition, place, weight
+    post = ([], [], [])
+    for edge in net.edges:
+        anet.edge_ids.append(edge.id)
+        anet.edge_sources.append(edge.source)
+        anet.edge_targets.append(edge.target)
+        anet.edge_types.append(edge.type)
+        anet.edge_inscriptions.append(edge.inscription)
+
+        if edge.source in anet.place_index and edge.target in anet.transition_index:
+            matrix = pre
+            transition = anet.transition_index[edge.target]
+            place = anet.place_index[edge.source]
+        elif edge.source in anet.transition_index and edge.target in anet.place_index:
+            matrix = post
+            transition = anet.transition_index[edge.source]
+            place = anet.place_index[edge.target]
+        else:
+            raise ValueError("edge " + str(edge.id) + " does not connect a place and a transition")
+
+        if edge.type not in (None, 'normal'):
+            raise ValueError("edge " + str(edge.id) + " has the unsupported type " + repr(edge.type))
+
+        try:
+            weight = int(edge.inscription)
+        except (TypeError, ValueError):
+            raise ValueError("inscription of edge " + str(edge.id) + " is not an integer: " +
+                             repr(edge.inscription))
+        matrix[0].append(transition)
+        matrix[1].append(place)
+        matrix[2].append(weight)
+
+    shape = (len(transitions), len(places))
+    anet.pre = IncidenceMatrix(shape, *pre)
+    anet.post = IncidenceMatrix(shape, *post)
+    anet.effect = IncidenceMatrix(shape, pre[0] + post[0], pre[1] + post[1],
+                                  [-w for w in pre[2]] + post[2])
+
+    return anet
+
+def to_petrinet(anet, marking=None):
+    """ Create a PetriNet from the given ArrayNet.
+
+    marking: Marking of the created net, default is the marking of anet.
+    """
+    if marking is None:
+        marking = anet.marking
+
+    net = petrinet.PetriNet()
+    net.id = anet.id
+    net.name = anet.name
+
+    for i, id in enumerate(anet.transition_ids):
+        transition = petrinet.Transition()
+        transition.id = id
+        transition.label = anet.transition_labels[i]
+        transition.position = tuple(int(v) for v in anet.transition_positions[i])
+        transition.offset = tuple(int(v) for v in anet.transition_offsets[i])
+        net.transitions[id] = transition
+
+    for i, id in enumerate(anet.place_ids):
+        place = petrinet.Place()
+        place.id = id
+        place.label = anet.place_labels[i]
+        place.position = tuple(int(v) for v in anet.place_positions[i])
+        place.offset = tuple(int(v) for v in anet.place_offsets[i])
+        place.marking = int(marking[i])
+        net.places[id] = place
+
+    for i, id in enumerate(anet.edge_ids):
+        edge = petrinet.Edge()
+        edge.id = id
+        edge.source = anet.edge_sources[i]
+        edge.target = anet.edge_targets[i]
+        edge.type = anet.edge_types[i]
+        edge.inscription = anet.edge_inscriptions[i]
+        edge.net = net
+        net.edges.append(edge)
+
+    return net
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for net in petrinet.iter_pnml_file(sys.argv[1]):
+            print(from_petrinet(net))
@@ -3,9 +3,10 @@
 
 """ This program implements a renderer for Petri net files. """
 
-from PIL import Image, ImageDraw, ImageFont, ImageFilter # Python image library (Pillow)
-import petrinet # Petri net data structure
-import math
+from PIL import Image, ImageDraw, ImageFilter # Python image library (Pillow)
+from pntools import petrinet # Petri net data structure
+from pntools import fonts # font and label size cache
+from pntools import geometry # arc geometry
 import sys
 import os
 
@@ -74,15 +75,16 @@ def draw_transition(transition, draw, doffset):
     offset = transition.offset[0] * scale, transition.offset[1] * scale
     
 
-    font = ImageFont.truetype('./font/Sawasdee.ttf', 12 * scale)
+    fontsize = 12 * scale
+    font = fonts.load_font(fontsize)
 
     draw.rectangle([x - halfside, y - halfside, x + halfside, y + halfside],
                    fill=(0, 0, 0), outline=(0, 0, 0))
     draw.rectangle([x - halfside + linewidth, y - halfside + linewidth,
                     x + halfside - linewidth, y + halfside - linewidth],
                    fill=(255, 255, 255), outline=(255, 255, 255))
-    fontsize = font.getsize(transition.label)
-    draw.text((x - fontsize[0] / 2 + offset[0], y + halfside + distance + offset[1]),
+    textsize = fonts.text_size(transition.label, fontsize)
+    draw.text((x - textsize[0] / 2 + offset[0], y + halfside + distance + offset[1]),
               transition.label, font=font, fill=(0, 0, 0))
 
 def draw_place(place, draw, doffset):
@@ -97,7 +99,8 @@ def draw_place(place, draw, doffset):
     distance = 2 * scale
     offset = place.offset[0] * scale, place.offset[1] * scale
 
-    font = ImageFont.truetype('./font/Sawasdee.ttf', 12 * scale)
+    fontsize = 12 * scale
+    font = fonts.load_font(fontsize)
 
     draw.ellipse([x - halfside, y - halfside, x + halfside, y + halfside],
                    fill=(0, 0, 0), outline=(0, 0, 0))
@@ -105,8 +108,8 @@ def draw_place(place, draw, doffset):
                     x + halfside - linewidth, y + halfside - linewidth],
                    fill=(255, 255, 255), outline=(255, 255, 255))
     
-    fontsize = font.getsize(place.label)
-    draw.text((x - fontsize[0] / 2 + offset[0], y + halfside + distance + offset[1]),
+    textsize = fonts.text_size(place.label, fontsize)
+    draw.text((x - textsize[0] / 2 + offset[0], y + halfside + distance + offset[1]),
               place.label, font=font, fill=(0, 0, 0))
 
     if place.marking == 0:
@@ -124,117 +127,36 @@ def draw_place(place, draw, doffset):
                       x + marksize + markoff, y + marksize + markoff],
                      fill=(0, 0, 0), outline=(0, 0, 0))
     else:
-       fontsize = font.getsize(str(place.marking))
-       draw.text((x - fontsize[0] / 2, y - fonzsize[1] / 2), str(place.marking),
+       textsize = fonts.text_size(str(place.marking), fontsize)
+       draw.text((x - textsize[0] / 2, y - textsize[1] / 2), str(place.marking),
                  font=font, fill=(0, 0, 0)) 
         
         
 
 def draw_edge(edge, draw, doffset):
     """ Helper method for edge drawing. """
-    scale = 4
-    width = 2 * scale
-    tipsize = 10 * scale
-    
-    halfside = 16
-
-    start_node = edge.find_source() # get start event
-    end_node = edge.find_target() # get end event
-
-    intersections = calculate_intersections(start_node, end_node, halfside) # calculate intersection points
-
-    # start point of arc
-    start = start_node.position[0] + intersections[0][0], start_node.position[1] + intersections[0][1]
-    # end point of arc
-    end = end_node.position[0] + intersections[1][0], end_node.position[1] + intersections[1][1]
-
-    vector = (float(start_node.position[0] - end_node.position[0]),
-              float(start_node.position[1] - end_node.position[1]))
-    vector_length = math.sqrt(vector[0] ** 2 + vector[1] ** 2)
-    tipcenter = (vector[0] * (tipsize / 2) / vector_length,
-                 vector[1] * (tipsize / 2) / vector_length)
-
-    start = (start[0] + doffset[0]) * scale, (start[1] + doffset[1]) * scale
-    end = (end[0] + doffset[0]) * scale, (end[1] + doffset[1]) * scale
-
-    draw.line([start[0], start[1], end[0] + tipcenter[0], end[1] + tipcenter[1]],
-              fill=(0, 0, 0), width=width)
-
-    tip = calculate_tip(start_node, end_node, tipsize)
-
-    draw.polygon([end, (end[0] + tip[0][0], end[1] + tip[0][1]),
-                  (end[0] + tip[1][0], end[1] + tip[1][1])], outline=(0, 0, 0), fill=(0, 0, 0))
-    
-
-def calculate_tip(start, end, tipsize):
-    """ Helper function for tip point calculation.
-
-    return ((vektor1_x, vektor1_y), (vektor2_x, vektor2_y))
-    """
-    vector = float(start.position[0] - end.position[0]), float(start.position[1] - end.position[1])
-    vector_length = math.sqrt(vector[0] ** 2 + vector[1] ** 2)
-    
-    vector_sized = vector[0] * tipsize / vector_length, vector[1] * tipsize / vector_length
+    draw_arrows(edge_arrows([edge]), draw, doffset, (0, 0, 0))
 
-    alpha = 30 * 2 * math.pi / 360
-
-    sin_alpha = math.sin(alpha)
-    cos_alpha = math.cos(alpha)
-
-    tip1 = (vector_sized[0] * cos_alpha - vector_sized[1] * sin_alpha,
-            vector_sized[0] * sin_alpha + vector_sized[1] * cos_alpha)
-
-    sin_alpha = math.sin(-alpha)
-    cos_alpha = math.cos(-alpha)
-
-    tip2 = (vector_sized[0] * cos_alpha - vector_sized[1] * sin_alpha,
-            vector_sized[0] * sin_alpha + vector_sized[1] * cos_alpha)
-
-    return tip1, tip2
-
-
-def calculate_intersections(start, end, halfside):
-    """ Helper function for edge intersection point calculation. """
-    # vector from the center of the start event to the center of the end event
-    vector = float(end.position[0] - start.position[0]), float(end.position[1] - start.position[1])
-        
-    if type(start) is petrinet.Transition:
-        start_vector = calculate_intersection_transition(vector, halfside)
-    else:
-        start_vector = calculate_intersection_place(vector, halfside)
-            
-    #calculate intersection for arc end
-    if type(end) is petrinet.Transition:
-        end_vector = calculate_intersection_transition((-vector[0], -vector[1]), halfside)
-    else:
-        end_vector = calculate_intersection_place((-vector[0], -vector[1]), halfside)
-
-    return start_vector, end_vector
-
-def calculate_intersection_transition(vector, halfside):
-    """ Helper function, calculates intersection of edge and transition. """
-    #calculate a factor to scale the x-component to 10px (half of side length)
-    fact = 1
-    if vector[0] != 0:
-        fact = halfside / math.fabs(vector[0])
-
-    # scale the vector
-    intersection_vector = vector[0] * fact, vector[1] * fact
+def edge_arrows(edges):
+    """ Calculate the arrows of the given edges in net coordinates, see geometry.Arrows. """
+    halfside = 16
+    tipsize = 10
 
-    # if y-component of vector is larger than halfside or
-    # x-component is 0, scale with y-component
-    if math.fabs(intersection_vector[1]) > halfside or vector[0] == 0:
-        fact = halfside / math.fabs(vector[1])
-        intersection_vector = vector[0] * fact, vector[1] * fact
+    return geometry.node_arrows([(edge.find_source(), edge.find_target()) for edge in edges],
+                                halfside, tipsize, circle=lambda node: type(node) is petrinet.Place)
 
-    return intersection_vector[0], intersection_vector[1]
+def draw_arrows(arrows, draw, doffset, color):
+    """ Helper method for drawing a batch of arrows. """
+    scale = 4
+    width = 2 * scale
 
-def calculate_intersection_place(vector, halfside):
-    """ Helper function, calculates intersection of edge and place. """
-    fact = halfside / math.sqrt(vector[0] ** 2 + vector[1] ** 2)
-    intersection_vector = vector[0] * fact, vector[1] * fact
+    starts = ((arrows.starts + doffset) * scale).tolist()
+    line_ends = ((arrows.line_ends + doffset) * scale).tolist()
+    heads = ((arrows.heads + doffset) * scale).tolist()
 
-    return intersection_vector[0], intersection_vector[1]
+    for start, end, head in zip(starts, line_ends, heads):
+        draw.line([start[0], start[1], end[0], end[1]], fill=color, width=width)
+        draw.polygon([tuple(point) for point in head], outline=color, fill=color)
 
 def draw_net(petrinet):
     """ This method renders the given Petri net as an Image object. """
@@ -250,8 +172,7 @@ def draw_net(petrinet):
     for id, place in petrinet.places.items():
         draw_place(place, d, doffset)
 
-    for edge in petrinet.edges:
-        draw_edge(edge, d, doffset)
+    draw_arrows(edge_arrows(petrinet.edges), d, doffset, (0, 0, 0))
     
     return image
 
@@ -260,7 +181,7 @@ def antialias(image, factor):
     the image size is reduced by the given factor.
     """
     x, y = image.size
-    img = image.resize((int(x / factor), int(y / factor)), Image.ANTIALIAS)
+    img = image.resize((int(x / factor), int(y / factor)), Image.LANCZOS)
     
     return img
     
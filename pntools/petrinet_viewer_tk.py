@@ -9,9 +9,9 @@ actions and places represent resource containers.
 Usage: python petrinet_viewer_tk.py [<pnml-file>]
 """
 
-import math # calculation of intersection point (fabs, ...)
 import sys # sys.argv
 import petrinet # Petri net parser and data structure
+import geometry # calculation of arc end points
 import os # demo file
 from tkinter import Tk, Frame, Menu, Canvas, BOTH, LAST, filedialog # UI
 from tkinter.ttk import Notebook # Tabs
@@ -69,8 +69,7 @@ class PetriNetView(Frame):
             self.__drawTransition(transition)
 
         # draw Petri net edges (arc layer is behind the other layers)
-        for edge in self.__net.edges:
-            self.__drawEdge(edge)
+        self.__drawEdges(self.__net.edges)
 
     def __drawPlace(self, place):
         """ Draw the given place. """
@@ -87,62 +86,14 @@ class PetriNetView(Frame):
         self.__canvas.create_text(transition.position[0], transition.position[1] + self.__node_size + 10, text=transition.label)
 
 
-    def __drawEdge(self, edge):
-        """ Draw the given edge. """
-        start_node = edge.find_source() # get start event
-        end_node = edge.find_target() # get end event
+    def __drawEdges(self, edges):
+        """ Draw the given edges, their end points are calculated at once. """
+        pairs = [(edge.find_source(), edge.find_target()) for edge in edges]
+        arrows = geometry.node_arrows(pairs, self.__node_size, 10, circle=lambda node: type(node) is petrinet.Place)
 
-        intersections = self.__calculateIntersections(start_node, end_node) # calculate intersection points
-
-        # start point of arc
-        start = start_node.position[0] + intersections[0][0], start_node.position[1] + intersections[0][1]
-        # end point of arc
-        end = end_node.position[0] + intersections[1][0], end_node.position[1] + intersections[1][1]
-        # create line with arrow head as end
-        self.__canvas.create_line(start[0], start[1], end[0], end[1], arrow=LAST, arrowshape=(8.6, 10, 5), width=2)
-
-
-    def __calculateIntersections(self, start, end):
-        """ Calculate intersection point of start and end events with the arc.
-
-        This method calculates two vectors which describe the intersection point of the arc from the
-        given start event to the given end event.
-        """
-
-        # vector from the center of the start event to the center of the end event
-        vector = float(end.position[0] - start.position[0]), float(end.position[1] - start.position[1])
-        
-        if type(start) is petrinet.Transition:
-            #calculate a factor to scale the x-component to 10px (half of side length)
-            fact = 1
-            if vector[0] != 0:
-                fact = self.__node_size / math.fabs(vector[0])
-            # scale the vector
-            start_vector = vector[0] * fact, vector[1] * fact
-
-            # if y-component of vector is larger than 10px or x-component is 0, scale with y-component
-            if math.fabs(start_vector[1]) > self.__node_size or vector[0] == 0:
-                fact = self.__node_size / math.fabs(vector[1])
-                start_vector = vector[0] * fact, vector[1] * fact
-        else:
-            fact = self.__node_size / math.sqrt(vector[0] ** 2 + vector[1] ** 2)
-            start_vector = vector[0] * fact, vector[1] * fact
-            
-        #calculate intersection for arc end
-        if type(end) is petrinet.Transition:
-            if vector[0] != 0:
-                fact = self.__node_size / math.fabs(vector[0])
-
-            end_vector = -vector[0] * fact, -vector[1] * fact
-
-            if math.fabs(end_vector[1]) > self.__node_size or vector[0] == 0:
-                fact = self.__node_size / math.fabs(vector[1])
-                end_vector = -vector[0] * fact, -vector[1] * fact
-        else:
-            fact = self.__node_size / math.sqrt(vector[0] ** 2 + vector[1] ** 2)
-            end_vector = -vector[0] * fact, -vector[1] * fact
-
-        return start_vector, end_vector
+        for start, end in zip(arrows.starts.tolist(), arrows.ends.tolist()):
+            # create line with arrow head as end
+            self.__canvas.create_line(start[0], start[1], end[0], end[1], arrow=LAST, arrowshape=(8.6, 10, 5), width=2)
 
 
 class PetriNetViewer(Frame):
@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This program renders all Petri nets and LPOs of many files to images.
+
+The files are rendered in parallel by a pool of worker processes and
+no viewer is opened. Every net of a .pnml-file and every LPO of a
+.lpo-file is written as image to the output directory:
+
+    <output>/<name of file>-<number>.<format>
+
+The name keeps the extension of the file, so x.pnml and x.lpo do not
+collide. Files of a given directory keep their path relative to this
+directory, files given directly or on stdin their path relative to the
+current directory (the absolute path for files outside of it). A file
+whose name was already used, e.g. equal relative paths in two given
+directories, is not rendered but reported as error. A result line (JSON)
+is written for every file as soon as it is rendered:
+
+    {"file": ..., "images": [...], "seconds": ...}
+
+Files which can not be parsed or rendered give a line with an "error".
+The format svg writes vector images with svg_renderer.
+
+Usage: python renderer_batch.py [-o <output-dir>] [-f <format>] [-s <scale>] [-w <workers>] <pnml/lpo-file or directory>... | -
+  With - the paths of the files are read from stdin, one per line.
+  The scale is the count of pixels per unit of the layout, default 2.
+"""
+
+import argparse # command line
+import json # result lines of collisions
+import os # paths, cpu count
+import sys # stdout
+import time # timing per file
+from concurrent.futures import ProcessPoolExecutor # worker pool
+from pntools import batch # file listing, bounded submission, result lines
+from pntools import petrinet, partialorder # parsers
+from pntools import petrinet_renderer, partialorder_renderer, svg_renderer # renderers
+
+RENDER_SCALE = 4 # pixels per unit of the renderers, see draw_net and draw_lpo
+
+def render_files(files, output, image_format, scale):
+    """ Render all nets and LPOs of the given files.
+
+    files: List of (path, name) pairs, the images are named after name.
+    return: List of result maps, one per file.
+    """
+    results = []
+    for file, name in files:
+        start = time.perf_counter()
+        images = []
+        try:
+            if file.endswith('.lpo'):
+                models = partialorder.iter_lpo_file(file)
+                draw = partialorder_renderer.draw_lpo
+            else:
+                models = petrinet.iter_pnml_file(file)
+                draw = petrinet_renderer.draw_net
+
+            base = os.path.join(output, name)
+            os.makedirs(os.path.dirname(base) or '.', exist_ok=True)
+            for number, model in enumerate(models, 1):
+                path = "%s-%d.%s" % (base, number, image_format)
+                if image_format == 'svg':
+                    svg_renderer.write_svg_file(model, path, scale)
+                else:
+                    image = petrinet_renderer.antialias(draw(model), RENDER_SCALE / scale)
+                    image.save(path)
+                images.append(path)
+            result = {'file': file, 'images': images}
+        except Exception as error: # one broken file must not stop the batch
+            result = {'file': file, 'images': images, 'error': type(error).__name__ + ": " + str(error)}
+
+        result['seconds'] = time.perf_counter() - start
+        results.append(result)
+
+    return results
+
+def render_all(paths, output='.', image_format='png', scale=2, workers=None, chunk_size=8, log=sys.stdout):
+    """ Render all files of the paths and write the results as JSON lines.
+
+    workers: Count of worker processes, default is the count of CPUs.
+    chunk_size: Count of files per task.
+    return: (count of files, count of images, count of errors)
+    """
+    workers = workers or os.cpu_count() or 1
+    counts = [0, 0, 0]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        files = unique_names(batch.input_files(paths, ('.pnml', '.lpo')), log, counts)
+        tasks = batch.chunks(files, chunk_size)
+        batch.run_tasks(pool, render_files, tasks, (output, image_format, scale), limit=4 * workers,
+                        output=log, counts=counts, count=count_result)
+
+    return tuple(counts)
+
+def unique_names(files, log, counts):
+    """ Iterate the (path, name) pairs of the files whose name was not used before.
+
+    A file with a used name would overwrite the images of another file,
+    it gets an error result line instead.
+    """
+    names = set()
+    for file, name in files:
+        key = os.path.normcase(os.path.normpath(name))
+        if key in names:
+            result = {'file': file, 'images': [], 'seconds': 0.0,
+                      'error': "OutputCollision: the images of another file are named " + repr(name)}
+            count_result(result, counts)
+            log.write(json.dumps(result) + '\n')
+            continue
+        names.add(key)
+        yield file, name
+
+def count_result(result, counts):
+    """ Count a result in the (files, images, errors) counts. """
+    counts[0] += 1
+    counts[1] += len(result['images'])
+    counts[2] += 'error' in result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render Petri nets and LPOs to images.")
+    parser.add_argument('files', nargs='+', help="PNML/LPO files or directories, - reads paths from stdin")
+    parser.add_argument('-o', '--output', default='.', help="output directory")
+    parser.add_argument('-f', '--format', default='png', help="image format, e.g. png or jpg")
+    parser.add_argument('-s', '--scale', type=float, default=2, help="pixels per layout unit")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="count of worker processes")
+    parser.add_argument('-c', '--chunk', type=int, default=8, help="count of files per task")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    files, images, errors = render_all(args.files, args.output, args.format, args.scale,
+                                       args.workers, args.chunk)
+    print("%d files, %d images, %d errors in %.2f s" %
+          (files, images, errors, time.perf_counter() - start), file=sys.stderr)
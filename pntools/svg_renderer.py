@@ -0,0 +1,195 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This program renders Petri nets and LPOs as SVG files.
+
+The SVG elements are written to the file as soon as they are calculated,
+there is no image in memory. So the memory usage does not depend on the
+size of the net or LPO. The arcs and arrow tips are calculated in
+batches with the geometry module, like in petrinet_renderer and
+partialorder_renderer. The images look like the PNG images, only in
+vector form. The coordinates are layout units, an image of the net is
+as large as the net in the editor.
+
+Usage: python svg_renderer.py <pnml- or lpo-file> [<output-prefix>]
+  Writes <output-prefix>-<number>.svg for every net or LPO of the file.
+"""
+
+import sys # argv
+from xml.sax.saxutils import escape, quoteattr # XML text and attribute values
+from pntools import petrinet, partialorder # data structures and parsers
+from pntools import petrinet_renderer, partialorder_renderer # size and geometry
+from pntools import batch # batches of arcs
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+FONT_FAMILY = "Sawasdee, sans-serif" # font of the PNG renderers, see fonts.py
+BATCH_SIZE = 4096 # count of arcs calculated at once, keeps the memory usage bounded
+
+class SvgWriter:
+    """ This class writes SVG elements directly to a file.
+
+    The methods correspond to the ImageDraw methods used by the PNG
+    renderers. Colors are RGB tuples, coordinates are translated by the
+    offset given to the constructor. The scale only sets the displayed
+    size of the document, the coordinates stay layout units.
+
+    writer.output: Writable text file.
+    writer.offset: (x, y) added to all coordinates.
+    """
+
+    def __init__(self, output, size, offset=(0, 0), scale=1):
+        self.output = output
+        self.offset = offset
+        width, height = size
+        output.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        output.write('<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+                     'width="%g" height="%g" viewBox="0 0 %d %d">\n' %
+                     (width * scale, height * scale, width, height))
+        output.write('<rect x="0" y="0" width="%d" height="%d" fill="%s"/>\n' % (width, height, color(WHITE)))
+
+    def rectangle(self, center, halfside, linewidth, fill=WHITE, outline=BLACK):
+        """ Write a square with a border inside of its side length. """
+        x, y = self.point(center)
+        inner = halfside - linewidth / 2
+        self.output.write('<rect x="%g" y="%g" width="%g" height="%g" fill="%s" stroke="%s" stroke-width="%g"/>\n' %
+                          (x - inner, y - inner, 2 * inner, 2 * inner, color(fill), color(outline), linewidth))
+
+    def circle(self, center, radius, linewidth=0, fill=WHITE, outline=BLACK):
+        """ Write a circle, the border is inside of its radius. """
+        x, y = self.point(center)
+        if linewidth:
+            self.output.write('<circle cx="%g" cy="%g" r="%g" fill="%s" stroke="%s" stroke-width="%g"/>\n' %
+                              (x, y, radius - linewidth / 2, color(fill), color(outline), linewidth))
+        else:
+            self.output.write('<circle cx="%g" cy="%g" r="%g" fill="%s"/>\n' % (x, y, radius, color(fill)))
+
+    def line(self, start, end, fill=BLACK, width=1):
+        """ Write a line from start to end. """
+        x1, y1 = self.point(start)
+        x2, y2 = self.point(end)
+        self.output.write('<line x1="%g" y1="%g" x2="%g" y2="%g" stroke="%s" stroke-width="%g"/>\n' %
+                          (x1, y1, x2, y2, color(fill), width))
+
+    def polygon(self, points, fill=BLACK):
+        """ Write a filled polygon. """
+        self.output.write('<polygon points="%s" fill="%s"/>\n' %
+                          (" ".join("%g,%g" % self.point(p) for p in points), color(fill)))
+
+    def text(self, position, text, size, fill=BLACK, middle=False):
+        """ Write a text, position is its top center or with middle=True its center. """
+        x, y = self.point(position)
+        baseline = 'central' if middle else 'hanging'
+        self.output.write('<text x="%g" y="%g" font-family=%s font-size="%g" text-anchor="middle" '
+                          'dominant-baseline="%s" fill="%s">%s</text>\n' %
+                          (x, y, quoteattr(FONT_FAMILY), size, baseline, color(fill), escape(str(text))))
+
+    def point(self, point):
+        """ Translate a point by the offset. """
+        return point[0] + self.offset[0], point[1] + self.offset[1]
+
+    def close(self):
+        """ Write the end of the SVG document. """
+        self.output.write('</svg>\n')
+
+def color(rgb):
+    """ Return the SVG notation of a RGB tuple. """
+    return "rgb(%d,%d,%d)" % rgb
+
+def draw_transition(transition, writer):
+    """ Helper method for transition drawing. """
+    halfside = 16
+    x, y = transition.position
+    writer.rectangle((x, y), halfside, 2)
+    writer.text((x + transition.offset[0], y + halfside + 2 + transition.offset[1]), transition.label, 12)
+
+def draw_place(place, writer):
+    """ Helper method for place drawing. """
+    halfside = 16
+    marksize = 3
+    x, y = place.position
+    writer.circle((x, y), halfside, 2)
+    writer.text((x + place.offset[0], y + halfside + 2 + place.offset[1]), place.label, 12)
+
+    if place.marking == 1:
+        writer.circle((x, y), marksize, fill=BLACK)
+    elif place.marking == 2:
+        markoff = halfside / 3
+        writer.circle((x - markoff, y - markoff), marksize, fill=BLACK)
+        writer.circle((x + markoff, y + markoff), marksize, fill=BLACK)
+    elif place.marking != 0:
+        writer.text((x, y), place.marking, 12, middle=True)
+
+def draw_arrows(arrows, writer, fill):
+    """ Helper method for drawing a batch of arrows, see petrinet_renderer.draw_arrows. """
+    for start, end, head in zip(arrows.starts.tolist(), arrows.line_ends.tolist(), arrows.heads.tolist()):
+        writer.line(start, end, fill, 2)
+        writer.polygon(head, fill)
+
+def draw_edges(edges, writer):
+    """ Helper method for edge drawing, the edges are calculated in batches. """
+    for chunk in batch.chunks(edges, BATCH_SIZE):
+        draw_arrows(petrinet_renderer.edge_arrows(chunk), writer, BLACK)
+
+def draw_event(event, writer):
+    """ Helper method for event drawing. """
+    halfside = 8
+    x, y = event.position
+    writer.rectangle((x, y), halfside, 2)
+    writer.text((x + event.offset[0], y + halfside + 2 + event.offset[1]), event.label, 12)
+
+def draw_arcs(arcs, writer, fill):
+    """ Helper method for arc drawing, the arcs are calculated in batches. """
+    for chunk in batch.chunks(arcs, BATCH_SIZE):
+        draw_arrows(partialorder_renderer.arc_arrows(chunk), writer, fill)
+
+def draw_net_svg(net, output, scale=1):
+    """ Write the Petri net as SVG document to the writable text file. """
+    size, off = petrinet_renderer.calculate_size(net)
+    writer = SvgWriter(output, size, (-off[0], -off[1]), scale)
+
+    for transition in net.transitions.values():
+        draw_transition(transition, writer)
+
+    for place in net.places.values():
+        draw_place(place, writer)
+
+    draw_edges(net.edges, writer)
+
+    writer.close()
+
+def draw_lpo_svg(lpo, output, skeleton=False, transitive=False, skeleton_color=(0,0,255), transitive_color=(220, 220, 220), scale=1):
+    """ Write the LPO as SVG document to the writable text file, see partialorder_renderer.draw_lpo. """
+    size, off = partialorder_renderer.calculate_size(lpo)
+    writer = SvgWriter(output, size, (-off[0], -off[1]), scale)
+
+    if transitive:
+        draw_arcs((arc for arc in lpo.arcs if not arc.user_drawn and not arc.skeleton), writer, transitive_color)
+
+    draw_arcs((arc for arc in lpo.arcs if arc.user_drawn), writer, BLACK)
+
+    if skeleton:
+        draw_arcs((arc for arc in lpo.arcs if arc.skeleton), writer, skeleton_color)
+
+    for event in lpo.events.values():
+        draw_event(event, writer)
+
+    writer.close()
+
+def write_svg_file(model, filename, scale=1):
+    """ Write the Petri net or LPO as SVG file. """
+    with open(filename, 'w', encoding='utf-8') as output:
+        if isinstance(model, partialorder.LPO):
+            draw_lpo_svg(model, output, scale=scale)
+        else:
+            draw_net_svg(model, output, scale)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        if sys.argv[1].endswith('.lpo'):
+            models = partialorder.iter_lpo_file(sys.argv[1])
+        else:
+            models = petrinet.iter_pnml_file(sys.argv[1])
+        prefix = sys.argv[2] if len(sys.argv) > 2 else "image"
+        for number, model in enumerate(models, 1):
+            write_svg_file(model, "%s-%d.svg" % (prefix, number))
@@ -0,0 +1,362 @@
+#!/usr/bin/python3
+# -*- coding_ utf-8 -*-
+
+""" This program renders huge Petri nets and LPOs as pyramid of image tiles.
+
+A net spread over a large area does not fit into one image. The nodes
+and edges are put into a grid index (spatial index), so every tile is
+drawn only with the elements which intersect it. The tiles of the most
+detailed zoom level are drawn by a pool of worker processes with the
+drawing functions of petrinet_renderer and partialorder_renderer. Every
+coarser level is built from the four tiles below it, level 0 is one
+tile showing the whole net. The tiles are written in the XYZ layout of
+web maps and deep zoom viewers:
+
+    <output>/<zoom>/<x>/<y>.png
+
+Tiles without elements are not written. With --crop only the given
+region of the layout is rendered into one image.
+
+Usage: python tile_renderer.py [-o <output-dir>] [-s <scale>] [-t <tile-size>] [-w <workers>] <pnml/lpo-file>
+       python tile_renderer.py --crop <x0> <y0> <x1> <y1> [-o <image-file>] [-s <scale>] <pnml/lpo-file>
+  The scale is the count of pixels per layout unit of the most detailed level, default 2.
+"""
+
+import argparse # command line
+import math
+import os # paths, cpu count
+import sys # stderr
+import time # timing
+from concurrent.futures import ProcessPoolExecutor # worker pool
+from PIL import Image, ImageDraw # Python image library (Pillow)
+from pntools import petrinet, partialorder, fonts # data structures and parsers
+from pntools import petrinet_renderer, partialorder_renderer # drawing functions
+from pntools import batch # chunks of tasks
+
+RENDER_SCALE = 4 # pixels per unit of the drawing functions
+CELL_SIZE = 256 # layout units per grid cell of the index
+TILE_SIZE = 256 # pixels per tile side
+
+scene = None # Scene of the worker process, see init_worker
+
+class GridIndex:
+    """ This class is a spatial index of boxes and lines in a uniform grid.
+
+    Every item is stored in all grid cells its box intersects, a line
+    only in the cells along the line. A query returns the items which
+    intersect the box, in the order they were inserted.
+
+    index.cell_size: Side length of the grid cells.
+    index.items: List of all items.
+    index.boxes: List of the boxes of the items.
+    index.lines: List of the (start, end, margin) of line items, None for box items.
+    index.cells: Map of ((column, row), list of item numbers).
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.items = []
+        self.boxes = []
+        self.lines = []
+        self.cells = {}
+
+    def insert(self, box, item):
+        """ Add the item with the box (x0, y0, x1, y1). """
+        number = len(self.items)
+        self.items.append(item)
+        self.boxes.append(box)
+        self.lines.append(None)
+        for cell in box_cells(box, self.cell_size):
+            self.cells.setdefault(cell, []).append(number)
+
+    def insert_line(self, start, end, margin, item):
+        """ Add the item with the line from start to end, widened by the margin. """
+        number = len(self.items)
+        self.items.append(item)
+        self.boxes.append((min(start[0], end[0]) - margin, min(start[1], end[1]) - margin,
+                           max(start[0], end[0]) + margin, max(start[1], end[1]) + margin))
+        self.lines.append((start, end, margin))
+        for cell in line_cells(start, end, margin, self.cell_size):
+            self.cells.setdefault(cell, []).append(number)
+
+    def query(self, box):
+        """ Return the items which intersect the box in insertion order. """
+        numbers = set()
+        for cell in box_cells(box, self.cell_size):
+            numbers.update(self.cells.get(cell, ()))
+        return [self.items[number] for number in sorted(numbers) if self.intersects(number, box)]
+
+    def intersects(self, number, box):
+        """ Return True if the item with the given number intersects the box. """
+        other = self.boxes[number]
+        if other[0] > box[2] or other[2] < box[0] or other[1] > box[3] or other[3] < box[1]:
+            return False
+        if self.lines[number] is None:
+            return True
+        start, end, margin = self.lines[number]
+        return line_intersects(start, end, (box[0] - margin, box[1] - margin, box[2] + margin, box[3] + margin))
+
+def box_cells(box, size, origin=(0, 0)):
+    """ Iterate the (column, row) of the cells of a grid intersecting the box.
+
+    The grid has cells with the given side length, cell (0, 0) starts at origin.
+    """
+    for column in range(math.floor((box[0] - origin[0]) / size), math.floor((box[2] - origin[0]) / size) + 1):
+        for row in range(math.floor((box[1] - origin[1]) / size), math.floor((box[3] - origin[1]) / size) + 1):
+            yield column, row
+
+def line_cells(start, end, margin, size, origin=(0, 0)):
+    """ Iterate the (column, row) of the cells of a grid along the line, see box_cells.
+
+    The line is widened by the margin.
+    """
+    x0, y0 = start[0] - origin[0], start[1] - origin[1]
+    x1, y1 = end[0] - origin[0], end[1] - origin[1]
+    dx = x1 - x0
+    slope = (y1 - y0) / dx if dx else None
+    # per column of cells the part of the line in this column
+    for column in range(math.floor((min(x0, x1) - margin) / size), math.floor((max(x0, x1) + margin) / size) + 1):
+        if slope is None:
+            top, bottom = min(y0, y1) - margin, max(y0, y1) + margin
+        else:
+            left = max(min(x0, x1), column * size - margin)
+            right = min(max(x0, x1), (column + 1) * size + margin)
+            ya = y0 + (left - x0) * slope
+            yb = y0 + (right - x0) * slope
+            top, bottom = min(ya, yb) - margin, max(ya, yb) + margin
+        for row in range(math.floor(top / size), math.floor(bottom / size) + 1):
+            yield column, row
+
+def line_intersects(start, end, box):
+    """ Return True if the line from start to end intersects the box (Liang-Barsky clipping). """
+    low, high = 0.0, 1.0
+    for position, delta, minimum, maximum in ((start[0], end[0] - start[0], box[0], box[2]),
+                                              (start[1], end[1] - start[1], box[1], box[3])):
+        if delta == 0:
+            if position < minimum or position > maximum:
+                return False
+            continue
+        t0, t1 = (minimum - position) / delta, (maximum - position) / delta
+        low, high = max(low, min(t0, t1)), min(high, max(t0, t1))
+        if low > high:
+            return False
+    return True
+
+class Scene:
+    """ This class holds the drawing items of a Petri net or LPO in a grid index.
+
+    The items are drawn in the order of the renderers: transitions,
+    places and edges of a net, arcs and events of a LPO. The geometry of
+    consecutive edges of a region is calculated in one batch.
+
+    scene.size, scene.offset: Size and minimum coordinate, see calculate_size.
+    scene.index: GridIndex of (draw function, element, arguments) items. The
+      draw function of edges is None, their arguments are (arrows function,
+      draw arrows function, color) of the renderer.
+    """
+
+    def __init__(self, model, cell_size=CELL_SIZE):
+        self.index = GridIndex(cell_size)
+        if isinstance(model, partialorder.LPO):
+            self.size, self.offset = partialorder_renderer.calculate_size(model)
+            for arc in model.arcs:
+                if arc.user_drawn:
+                    self.add_edge(arc, model.events[arc.source], model.events[arc.target],
+                                  (partialorder_renderer.arc_arrows, partialorder_renderer.draw_arrows, (0, 0, 0)))
+            for event in model.events.values():
+                self.add_node(partialorder_renderer.draw_event, event, 8)
+        else:
+            self.size, self.offset = petrinet_renderer.calculate_size(model)
+            for transition in model.transitions.values():
+                self.add_node(petrinet_renderer.draw_transition, transition, 16)
+            for place in model.places.values():
+                self.add_node(petrinet_renderer.draw_place, place, 16)
+            for edge in model.edges:
+                self.add_edge(edge, edge.find_source(), edge.find_target(),
+                              (petrinet_renderer.edge_arrows, petrinet_renderer.draw_arrows, (0, 0, 0)))
+
+    def add_node(self, draw, node, halfside):
+        """ Add a node with the box of its shape and label. """
+        x, y = node.position
+        width, height = fonts.text_size(node.label, 12 * RENDER_SCALE)
+        left = x + node.offset[0] - width / RENDER_SCALE / 2
+        top = y + halfside + 2 + node.offset[1]
+        box = (min(x - halfside, left), min(y - halfside, top),
+               max(x + halfside, left + width / RENDER_SCALE), max(y + halfside, top + height / RENDER_SCALE))
+        self.index.insert(box, (draw, node, ()))
+
+    def add_edge(self, edge, start, end, arguments):
+        """ Add an edge with the line between its nodes, widened by the arrow tip. """
+        margin = 10 # arrow tip and line width
+        self.index.insert_line(start.position, end.position, margin, (None, edge, arguments))
+
+    def render_region(self, box, scale, empty=True):
+        """ Render the region (x0, y0, x1, y1) of the layout with scale pixels per unit.
+
+        The elements are drawn at the scale of the drawing functions and
+        reduced with antialiasing (box filter for integer factors). With
+        empty=False None is returned for a region without elements.
+        """
+        if scale > RENDER_SCALE:
+            raise ValueError("scale must not be larger than %d" % RENDER_SCALE)
+        items = self.index.query(box)
+        if not items and not empty:
+            return None
+
+        width, height = box[2] - box[0], box[3] - box[1]
+        image = petrinet_renderer.create_image((round(width * RENDER_SCALE), round(height * RENDER_SCALE)))
+        draw = ImageDraw.Draw(image)
+        doffset = -box[0], -box[1]
+        edges = [] # consecutive edges with the same arguments
+        for i, (function, element, arguments) in enumerate(items):
+            if function is not None:
+                function(element, draw, doffset, *arguments)
+                continue
+            edges.append(element)
+            if i + 1 == len(items) or items[i + 1][0] is not None or items[i + 1][2] != arguments:
+                arrows, draw_arrows, color = arguments
+                draw_arrows(arrows(edges), draw, doffset, color)
+                edges = []
+
+        factor = RENDER_SCALE / scale
+        if factor == int(factor):
+            return image.reduce(int(factor))
+        return image.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+
+    def zoom_levels(self, scale, tile_size=TILE_SIZE):
+        """ Return the count of zoom levels, level 0 shows everything in one tile. """
+        pixels = max(self.size) * scale
+        return max(0, math.ceil(math.log2(pixels / tile_size))) + 1
+
+    def occupied_tiles(self, scale, tile_size=TILE_SIZE):
+        """ Return the sorted (x, y) of all tiles of the most detailed level with elements.
+
+        Nodes occupy the tiles of their box, edges only the tiles along their line.
+        """
+        side = tile_size / scale
+        last = 2 ** (self.zoom_levels(scale, tile_size) - 1) - 1
+        tiles = set()
+        for box, line in zip(self.index.boxes, self.index.lines):
+            if line is None:
+                cells = box_cells(box, side, self.offset)
+            else:
+                cells = line_cells(line[0], line[1], line[2], side, self.offset)
+            tiles.update((x, y) for x, y in cells if 0 <= x <= last and 0 <= y <= last)
+        return sorted(tiles)
+
+    def tile_box(self, x, y, scale, tile_size=TILE_SIZE):
+        """ Return the layout region of a tile of the most detailed level. """
+        side = tile_size / scale
+        left = self.offset[0] + x * side
+        top = self.offset[1] + y * side
+        return left, top, left + side, top + side
+
+def load_model(file, number=0):
+    """ Return the net or LPO with the given number of the file. """
+    if file.endswith('.lpo'):
+        models = partialorder.iter_lpo_file(file)
+    else:
+        models = petrinet.iter_pnml_file(file)
+    for i, model in enumerate(models):
+        if i == number:
+            return model
+    raise ValueError("file %s contains no model %d" % (file, number))
+
+def init_worker(file, number):
+    """ Parse the file and build the scene of this worker process. """
+    global scene
+    scene = Scene(load_model(file, number))
+
+def tile_path(output, zoom, x, y):
+    """ Return the file name of a tile. """
+    return os.path.join(output, str(zoom), str(x), "%d.png" % y)
+
+def render_tiles(tiles, output, zoom, scale, tile_size):
+    """ Render tiles of the most detailed level with the scene of this worker.
+
+    return: List of the (x, y) of the written tiles.
+    """
+    written = []
+    for x, y in tiles:
+        image = scene.render_region(scene.tile_box(x, y, scale, tile_size), scale, empty=False)
+        if image is not None:
+            save_tile(image, output, zoom, x, y)
+            written.append((x, y))
+    return written
+
+def merge_tiles(tiles, output, zoom, tile_size):
+    """ Build tiles of the given level from the four tiles of the level below.
+
+    return: List of the (x, y) of the written tiles.
+    """
+    written = []
+    for x, y in tiles:
+        image = petrinet_renderer.create_image((2 * tile_size, 2 * tile_size))
+        found = False
+        for dx in (0, 1):
+            for dy in (0, 1):
+                path = tile_path(output, zoom + 1, 2 * x + dx, 2 * y + dy)
+                if os.path.exists(path):
+                    with Image.open(path) as child:
+                        image.paste(child, (dx * tile_size, dy * tile_size))
+                    found = True
+        if found:
+            save_tile(image.resize((tile_size, tile_size), Image.LANCZOS), output, zoom, x, y)
+            written.append((x, y))
+    return written
+
+def save_tile(image, output, zoom, x, y):
+    """ Write a tile image, the directories are created if needed. """
+    path = tile_path(output, zoom, x, y)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    image.save(path)
+
+def render_pyramid(file, output, scale=2, tile_size=TILE_SIZE, workers=None, number=0, chunk_size=16):
+    """ Render the net or LPO of the file as XYZ tile pyramid.
+
+    workers: Count of worker processes, default is the count of CPUs.
+    return: List of the count of written tiles per zoom level.
+    """
+    workers = workers or os.cpu_count() or 1
+    main = Scene(load_model(file, number))
+    levels = main.zoom_levels(scale, tile_size)
+    deepest = levels - 1
+    tiles = main.occupied_tiles(scale, tile_size) # only tiles with elements are rendered
+
+    counts = [0] * levels
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(file, number)) as pool:
+        futures = [pool.submit(render_tiles, task, output, deepest, scale, tile_size)
+                   for task in batch.chunks(tiles, chunk_size)]
+        written = [tile for future in futures for tile in future.result()]
+        counts[deepest] = len(written)
+
+        for zoom in range(deepest - 1, -1, -1):
+            parents = sorted(set((x // 2, y // 2) for x, y in written))
+            futures = [pool.submit(merge_tiles, task, output, zoom, tile_size)
+                       for task in batch.chunks(parents, chunk_size)]
+            written = [tile for future in futures for tile in future.result()]
+            counts[zoom] = len(written)
+
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a Petri net or LPO as image tiles.")
+    parser.add_argument('file', help="PNML or LPO file")
+    parser.add_argument('-o', '--output', default='tiles', help="output directory, image file with --crop")
+    parser.add_argument('-s', '--scale', type=float, default=2, help="pixels per layout unit")
+    parser.add_argument('-t', '--tile', type=int, default=TILE_SIZE, help="pixels per tile side")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="count of worker processes")
+    parser.add_argument('-n', '--number', type=int, default=0, help="number of the net or LPO in the file")
+    parser.add_argument('--crop', type=float, nargs=4, metavar=('X0', 'Y0', 'X1', 'Y1'),
+                        help="render only this region of the layout into one image")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.crop:
+        Scene(load_model(args.file, args.number)).render_region(args.crop, args.scale).save(args.output)
+    else:
+        counts = render_pyramid(args.file, args.output, args.scale, args.tile, args.workers, args.number)
+        for zoom, count in enumerate(counts):
+            print("zoom %d: %d tiles" % (zoom, count), file=sys.stderr)
+    print("%.2f s" % (time.perf_counter() - start), file=sys.stderr)
@@ -18,7 +18,8 @@ setup(name = 'pntools',
       author = 'Thomas Irgang',
       author_email = 'pntools@irgang-la.com',
       license = 'MIT',
-      packages = ['pntools'],
+      packages = ['pntools', 'pntools.algorithm'],
+      install_requires = ['numpy', 'Pillow'],
       include_package_data = True,
       zip_safe = False)
 
@@ -1,5 +1,13 @@
-from pntools import partialorder, partialorder_renderer
-from pntools.algorithm import lpo_skeleton, lpo_transitive
+import io
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import numpy as np
+from pntools import ids, petrinet, petrinet_matrix, partialorder, partialorder_renderer, renderer_batch
+from pntools.algorithm import lpo_skeleton, lpo_transitive, lpo_validation
+from pntools.algorithm import pn_reachability, pn_stubborn, pn_unfolding
 
 lpos = partialorder.parse_lpo_file("abcabc.lpo")
 lpo = lpos[0]
@@ -9,3 +17,294 @@ lpo_transitive.transitive_closure(lpo)
 
 image = partialorder_renderer.draw_lpo(lpo, skeleton=True, transitive=True)
 image.show()
+
+def new_ids(queue):
+    """ Generate ids in a worker process. """
+    queue.put([ids.new_id("Event") for i in range(0, 3)])
+
+def test_ids_in_processes():
+    """ Ids generated in two child processes and their parent must differ. """
+    parent = [ids.new_id("Event") for i in range(0, 3)] # the children inherit this counter
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=new_ids, args=(queue,)) for i in range(0, 2)]
+    for process in processes:
+        process.start()
+    first, second = queue.get(), queue.get()
+    for process in processes:
+        process.join()
+    assert len(set(parent) | set(first) | set(second)) == 9, (parent, first, second)
+
+def random_net(rng, places, transitions, markings=(0, 0, 1, 1, 2), weights=(1, 1, 2)):
+    """ Create a small random P/T net, transition ti has the label li. """
+    net = petrinet.PetriNet()
+    net.name = "random"
+    for i in range(0, places):
+        place = petrinet.Place()
+        place.id = "p%d" % i
+        place.marking = rng.choice(markings)
+        net.places[place.id] = place
+    for i in range(0, transitions):
+        transition = petrinet.Transition()
+        transition.id = "t%d" % i
+        transition.label = "l%d" % i
+        net.transitions[transition.id] = transition
+        edges = [("p%d" % rng.randrange(places), transition.id) for k in range(0, rng.randint(1, 2))]
+        edges += [(transition.id, "p%d" % rng.randrange(places)) for k in range(0, rng.randint(0, 2))]
+        for source, target in edges:
+            edge = petrinet.Edge()
+            edge.source, edge.target = source, target
+            edge.inscription = rng.choice(weights)
+            edge.net = net
+            net.edges.append(edge)
+    return net
+
+def balanced_net(rng, places, transitions):
+    """ Create a small random net whose transitions move tokens between distinct places, mostly safe. """
+    net = petrinet.PetriNet()
+    net.name = "balanced"
+    for i in range(0, places):
+        place = petrinet.Place()
+        place.id = "p%d" % i
+        place.marking = 1 if i % 3 == 0 else 0
+        net.places[place.id] = place
+    for i in range(0, transitions):
+        transition = petrinet.Transition()
+        transition.id = "t%d" % i
+        transition.label = "l%d" % i
+        net.transitions[transition.id] = transition
+        consumed = rng.sample(range(0, places), rng.randint(1, 2))
+        produced = rng.sample(range(0, places), len(consumed))
+        edges = [("p%d" % place, transition.id) for place in consumed]
+        edges += [(transition.id, "p%d" % place) for place in produced]
+        for source, target in edges:
+            edge = petrinet.Edge()
+            edge.source, edge.target = source, target
+            edge.net = net
+            net.edges.append(edge)
+    return net
+
+def configuration_markings(prefix):
+    """ Return the packed markings of all configurations of the prefix (brute force). """
+    net = prefix.net
+    effect = net.effect.to_dense()
+    markings = set()
+    def extend(event, chosen, consumed):
+        if event == len(prefix):
+            counts = np.bincount([prefix.event_transitions[e] for e in chosen], minlength=len(net.transition_ids))
+            markings.add((net.marking + counts @ effect).tobytes())
+            return
+        extend(event + 1, chosen, consumed)
+        # the event needs its causal predecessors and no conflict with the chosen events
+        presets = set(prefix.event_presets[event])
+        causes = set(prefix.condition_producers[c] for c in presets) - {-1}
+        if causes <= set(chosen) and not presets & consumed:
+            extend(event + 1, chosen + [event], consumed | presets)
+    extend(0, [], set())
+    return markings
+
+def test_unfolding():
+    """ The configurations of a complete prefix reach exactly the reachable markings. """
+    tested = 0
+    for seed in range(0, 300):
+        net = balanced_net(random.Random(seed), 7, 6)
+        full = pn_reachability.explore(net, max_states=500)
+        try:
+            prefix = pn_unfolding.unfold(net, max_events=30)
+        except ValueError: # not safe
+            continue
+        if not full.complete or not prefix.complete:
+            continue
+        reachable = set(full.marking(state).astype(np.int64).tobytes() for state in full.markings)
+        assert configuration_markings(prefix) == reachable, seed
+        tested += 1
+    assert tested > 50, tested
+
+def random_lpo(rng, labels, events):
+    """ Create a random LPO with the given labels, arcs only go from lower to higher event numbers. """
+    lpo = partialorder.LPO()
+    lpo.name = "random"
+    for i in range(0, events):
+        event = partialorder.Event()
+        event.id = "e%d" % i
+        event.label = rng.choice(labels)
+        lpo.add_event(event)
+    for i in range(0, events):
+        for j in range(i + 1, events):
+            if rng.random() < 0.35:
+                arc = partialorder.Arc()
+                arc.source, arc.target = "e%d" % i, "e%d" % j
+                arc.user_drawn = True
+                lpo.add_arc(arc)
+    return lpo
+
+def test_duplicate_event_ids():
+    """ Adding an event with an existing id is rejected and keeps the LPO unchanged. """
+    lpo = random_lpo(random.Random(0), ["a", "b"], 5)
+    before = lpo.relation().event_ids
+    positions = dict(lpo.index().positions)
+    event = partialorder.Event()
+    event.id = "e2"
+    try:
+        lpo.add_event(event)
+    except ValueError:
+        pass
+    else:
+        assert False, "duplicate event id is accepted"
+    assert lpo.events["e2"] is not event
+    assert lpo.relation().event_ids == before
+    assert lpo.index().positions == positions
+
+def is_enabled(net, lpo):
+    """ Check by brute force if the LPO is enabled in the ArrayNet.
+
+    For every prefix (downward closed set of events) the marking reached
+    by the prefix must cover the tokens consumed by the minimal events of
+    the rest.
+    """
+    rows, event_ids = lpo_transitive.closure_matrix(lpo)
+    count = len(event_ids)
+    transitions = {label: i for i, label in enumerate(net.transition_labels)}
+    events = [transitions[lpo.events[id].label] for id in event_ids]
+    pre, effect = net.pre.to_dense(), net.effect.to_dense()
+    predecessors = [[i for i in range(0, count) if rows[i] >> j & 1] for j in range(0, count)]
+    for prefix in range(0, 1 << count):
+        if any(not prefix >> p & 1 for i in range(0, count) if prefix >> i & 1 for p in predecessors[i]):
+            continue
+        marking = net.marking.copy()
+        demand = np.zeros(len(net.marking), dtype=np.int64)
+        for i in range(0, count):
+            if prefix >> i & 1:
+                marking += effect[events[i]]
+            elif all(prefix >> p & 1 for p in predecessors[i]):
+                demand += pre[events[i]]
+        if (marking < demand).any():
+            return False
+    return True
+
+def test_validation():
+    """ The token flow check agrees with the brute force check of all prefixes. """
+    found = [0, 0]
+    for seed in range(0, 600):
+        rng = random.Random(seed)
+        net = random_net(rng, 4, 4, markings=(0, 1, 1, 2))
+        lpo = random_lpo(rng, ["l%d" % i for i in range(0, 4)], rng.randint(1, 7))
+        expected = is_enabled(petrinet_matrix.from_petrinet(net), lpo)
+        assert lpo_validation.RunChecker(net).is_executable(lpo) == expected, seed
+        found[expected] += 1
+    assert min(found) > 50, found
+
+def test_stubborn_sets():
+    """ The reduced state space has the deadlocks of the full one and finds every reachable target. """
+    for seed in range(0, 200):
+        rng = random.Random(seed)
+        net = random_net(rng, 6, 6)
+        full = pn_reachability.explore(net, max_states=3000)
+        if not full.complete:
+            continue
+        reduced = pn_stubborn.explore(net)
+        deadlocks = set(full.markings[state] for state in full.deadlocks())
+        assert deadlocks == set(reduced.markings[state] for state in reduced.deadlocks()), seed
+        assert set(reduced.markings.values()) <= set(full.markings.values()), seed
+
+        for packed in rng.sample(list(full.markings.values()), min(3, len(full))):
+            target = np.frombuffer(packed, dtype=full.dtype)
+            assert pn_stubborn.explore(net, target=target).target is not None, seed
+        assert pn_stubborn.explore(net, target=full.marking(full.initial) + 7).target is None, seed
+
+def canonical_graph(graph):
+    """ Return the initial marking, the markings and the edges (as markings) of a reachability graph. """
+    markings = graph.markings
+    edges = set((markings[source], transition, markings[target]) for source, transition, target in graph.edges())
+    return markings[graph.initial], set(markings.values()), edges
+
+def test_parallel_exploration():
+    """ Worker processes exchanging successor records build the graph of one process. """
+    for seed in range(0, 6):
+        rng = random.Random(seed)
+        net = balanced_net(rng, 12, 14)
+        single = pn_reachability.explore(net)
+        for workers in (2, 3):
+            parallel = pn_reachability.explore(net, workers=workers)
+            assert parallel.complete and single.complete, seed
+            assert canonical_graph(parallel) == canonical_graph(single), (seed, workers)
+    try:
+        pn_reachability.explore(net, workers=0)
+    except ValueError:
+        pass
+    else:
+        assert False, "workers=0 is accepted"
+
+def arc_flags(lpo):
+    """ Return the sorted (source, target, user drawn, skeleton) of all arcs of the LPO. """
+    return sorted((arc.source, arc.target, arc.user_drawn, arc.skeleton) for arc in lpo.arcs)
+
+def test_incremental_closure():
+    """ Inserting and deleting arcs gives the arcs of a fresh closure and skeleton. """
+    for seed in range(0, 60):
+        rng = random.Random(seed)
+        count = rng.randint(2, 12)
+        lpo = random_lpo(rng, ["a"], count)
+        lpo_transitive.transitive_closure(lpo)
+        lpo_skeleton.skeleton(lpo)
+        user = [arc for arc in lpo.arcs if arc.user_drawn]
+        for step in range(0, 30):
+            if user and rng.random() < 0.4:
+                lpo_transitive.delete_arc(lpo, user.pop(rng.randrange(len(user))))
+            else:
+                arc = partialorder.Arc()
+                arc.source, arc.target = "e%d" % rng.randrange(count), "e%d" % rng.randrange(count)
+                if any((other.source, other.target) == (arc.source, arc.target) for other in user):
+                    continue # transitive_closure keeps only one arc per pair
+                before = arc_flags(lpo)
+                try:
+                    lpo_transitive.insert_arc(lpo, arc)
+                    user.append(arc)
+                except ValueError: # cycle, the LPO is not changed
+                    assert arc.source == arc.target or lpo.relation().is_before(arc.target, arc.source), seed
+                    assert arc_flags(lpo) == before, seed
+                    continue
+
+            fresh = partialorder.LPO()
+            fresh.name = "fresh"
+            for event in lpo.events.values():
+                fresh.add_event(event)
+            for arc in user:
+                copy = partialorder.Arc()
+                copy.source, copy.target, copy.user_drawn = arc.source, arc.target, True
+                fresh.add_arc(copy)
+            lpo_transitive.transitive_closure(fresh)
+            lpo_skeleton.skeleton(fresh)
+            assert arc_flags(lpo) == arc_flags(fresh), (seed, step)
+
+def test_renderer_batch_names():
+    """ Files with equal names get different images, collisions are reported as errors. """
+    with tempfile.TemporaryDirectory() as directory:
+        files = [os.path.join(directory, "in", "a", "x.pnml"), os.path.join(directory, "in", "b", "x.pnml"),
+                 os.path.join(directory, "in", "a", "x.lpo"), os.path.join(directory, "in2", "a", "x.pnml")]
+        for file in files:
+            os.makedirs(os.path.dirname(file), exist_ok=True)
+            shutil.copy("abcabc.lpo" if file.endswith(".lpo") else "example.pnml", file)
+
+        log = io.StringIO()
+        output = os.path.join(directory, "files")
+        assert renderer_batch.render_all(files[:3], output, 'svg', workers=1, log=log) == (3, 3, 0), log.getvalue()
+        images = [image for root, dirs, names in os.walk(output) for image in names]
+        assert len(images) == 3, images
+
+        log = io.StringIO()
+        output = os.path.join(directory, "directories")
+        paths = [os.path.join(directory, "in"), os.path.join(directory, "in2")]
+        assert renderer_batch.render_all(paths, output, 'svg', workers=1, log=log) == (4, 3, 1), log.getvalue()
+        assert "OutputCollision" in log.getvalue()
+        images = [image for root, dirs, names in os.walk(output) for image in names]
+        assert sorted(images) == ["x.lpo-1.svg", "x.pnml-1.svg", "x.pnml-1.svg"], images
+
+if __name__ == "__main__":
+    test_ids_in_processes()
+    test_stubborn_sets()
+    test_parallel_exploration()
+    test_unfolding()
+    test_duplicate_event_ids()
+    test_validation()
+    test_incremental_closure()
+    test_renderer_batch_names()